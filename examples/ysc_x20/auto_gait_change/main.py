@@ -102,7 +102,8 @@ class DogAutoGait:
         data_trans = self.robot.camera.cv_bridge.cv2_to_imgmsg
 
         while 1:
-            img, depth = self.robot.camera.get_rgb_depth()
+            # annotated and rescaled in place, hence the copies
+            img, depth = self.robot.camera.get_rgb_depth(copy=True)
 
             if img is None or depth is None:
                 time.sleep(.1)
@@ -15,3 +15,4 @@
 from .base import BackendBase
 from .ros1 import Ros1Backend
 from .ros2 import Ros2Backend
+from .memory import MemoryBackend
@@ -13,12 +13,24 @@
 # limitations under the License.
 
 import abc
+import threading
 import time
+from functools import partial
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Optional
 from typing import Tuple
 
+from .clock import Clock
+from .clock import WallClock
+from .columnar import to_columns
+from .graph import TopicGraph
+from .stream import MessageStream
+from .synchronizer import TimeSynchronizer
+from .transform import TransformCache
+
 
 class BackendBase(abc.ABC):
     """
@@ -28,6 +40,12 @@ class BackendBase(abc.ABC):
     def __init__(self):
         self.msg_subscriber = None
         self.has_connect: bool = False
+        # robot time of `now` / `get_time`, ROS time for ROS backends
+        self.clock: Clock = WallClock()
+        # topic -> type -> class cache with added / removed events
+        self.topic_graph: Optional[TopicGraph] = None
+        self._transforms: Optional[TransformCache] = None
+        self._transforms_lock = threading.Lock()
 
     def __del__(self):
         self.close()
@@ -74,3 +92,108 @@ class BackendBase(abc.ABC):
     @abc.abstractmethod
     def get_message_list(self):
         ...
+
+    def batch_transform(self, msgs: List, fmt: str = "columnar"):
+        """
+        Convert a list of messages of the same type at once.
+
+        :param fmt: `columnar` gives a dict of numpy arrays, one per
+                    flattened field with the header stamps as `time`,
+                    other formats are applied message by message
+        """
+        if fmt == "columnar":
+            return to_columns(msgs)
+        return [self.data_transform(msg, fmt=fmt) for msg in msgs]
+
+    def subscribe_synchronized(self, *topics,
+                               callback: Callable = None,
+                               callback_args: Dict = None,
+                               queue_size: int = 10,
+                               slop: float = .2,
+                               policy: str = "approximate",
+                               max_latency: float = None,
+                               **kwargs) -> TimeSynchronizer:
+        """
+        Subscribe several topics and deliver their messages matched by
+        header stamp, see `TimeSynchronizer` for the policies.
+        """
+        kwargs.pop("data_class", None)
+        sync = TimeSynchronizer(
+            topics, queue_size=queue_size, slop=slop, policy=policy,
+            max_latency=max_latency, clock=self.clock
+        )
+        sync._unsubscribe = self.unsubscribe
+        # the subscriptions queue as much as the synchronizer, not to
+        # drop messages before they are matched
+        sync.subs = [
+            self.subscribe(topic, callback=sync.input(inx),
+                           queue_size=queue_size, **kwargs)
+            for inx, topic in enumerate(topics)
+        ]
+        if callable(callback):
+            sync.registerCallback(
+                partial(callback, **callback_args) if callback_args
+                else callback
+            )
+        return sync
+
+    # type of the messages of `/tf` and `/tf_static`
+    tf_message_type = "tf2_msgs/TFMessage"
+
+    def _transform_subscribe_options(self, static: bool = False) -> Dict:
+        return {"queue_size": 100}
+
+    @property
+    def transforms(self) -> TransformCache:
+        """
+        Transform tree of the robot shared by the sensors, subscribed to
+        `/tf` and `/tf_static` on first use.
+        """
+        if self._transforms is not None:
+            return self._transforms
+        with self._transforms_lock:
+            if self._transforms is None:
+                cache = TransformCache(clock=self.clock)
+                data_class = self.get_message_class(self.tf_message_type)
+                for topic, callback, static in (
+                        ("/tf", cache.add_message, False),
+                        ("/tf_static", cache.add_static_message, True)):
+                    cache.subs.append(self.subscribe(
+                        topic, callback=callback, data_class=data_class,
+                        **self._transform_subscribe_options(static)))
+                self._transforms = cache
+        return self._transforms
+
+    def stream(self, topic: str, maxlen: int = 100,
+               policy: str = "latest", **kwargs) -> MessageStream:
+        """
+        Subscribe `topic` as an async iterator, use it with `async with`.
+        """
+        return MessageStream(self, topic, maxlen=maxlen,
+                             policy=policy, **kwargs)
+
+    def advertise(self, name: str, data_class: Callable,
+                  queue_size: int = 1, **kwargs):
+        """
+        Create the publisher of `name` ahead of the first `publish`.
+        """
+        pass
+
+    def publisher_stats(self) -> List[Dict]:
+        """
+        Message count, bytes and publish latency of each publisher.
+        """
+        return []
+
+    def callback_stats(self) -> Dict[str, Dict]:
+        """
+        Calls, depth and duration of the callbacks of each group.
+        """
+        return {}
+
+    def register_sensor(self, kind: str, config):
+        """
+        Called by `Robot` before the driver of a sensor is initialized,
+        backends without a middleware may feed the sensor topics here.
+        """
+        pass
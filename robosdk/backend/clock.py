@@ -0,0 +1,122 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Clocks of the backends.
+
+Every clock exposes three time bases:
+    `monotonic_ns`: steady nanoseconds for durations and rates
+    `wall_ns`: system time
+    `now_ns`: time of the robot, ROS (simulated) time when available,
+              the one used for message stamps
+"""
+
+import time
+from typing import Any
+from typing import Optional
+
+__all__ = ("Clock", "WallClock", "RosClock", "Ros2Clock",
+           "stamp_to_sec", "stamp_to_nsec", "header_stamp")
+
+
+# nanosecond clocks of python 3.7, from the float ones before
+_monotonic_ns = getattr(
+    time, "monotonic_ns", lambda: int(time.monotonic() * 1e9))
+_time_ns = getattr(time, "time_ns", lambda: int(time.time() * 1e9))
+
+
+def stamp_to_nsec(stamp: Any) -> Optional[int]:
+    """ nanoseconds of a ROS1 / ROS2 time stamp, None if not a stamp """
+    secs = getattr(stamp, "secs", None)
+    if secs is not None:
+        return int(secs) * 1000000000 + int(getattr(stamp, "nsecs", 0))
+    secs = getattr(stamp, "sec", None)
+    if secs is not None:
+        return int(secs) * 1000000000 + int(getattr(stamp, "nanosec", 0))
+    return None
+
+
+def stamp_to_sec(stamp: Any) -> Optional[float]:
+    nsec = stamp_to_nsec(stamp)
+    return None if nsec is None else nsec * 1e-9
+
+
+def header_stamp(msg: Any) -> Optional[float]:
+    """ header stamp of `msg` in seconds, None if unset or missing """
+    stamp = stamp_to_nsec(getattr(getattr(msg, "header", None),
+                                  "stamp", None))
+    return stamp * 1e-9 if stamp else None
+
+
+class Clock:
+    """
+    System clock, the robot time is the wall time.
+    """
+
+    @staticmethod
+    def monotonic_ns() -> int:
+        return _monotonic_ns()
+
+    @staticmethod
+    def wall_ns() -> int:
+        return _time_ns()
+
+    def now_ns(self) -> int:
+        return self.wall_ns()
+
+    def now(self) -> float:
+        """ robot time in seconds """
+        return self.now_ns() * 1e-9
+
+    def monotonic(self) -> float:
+        return self.monotonic_ns() * 1e-9
+
+    def wall(self) -> float:
+        return self.wall_ns() * 1e-9
+
+
+class WallClock(Clock):
+    pass
+
+
+class RosClock(Clock):
+    """
+    ROS1 time, follows `/clock` when `/use_sim_time` is set.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def now_ns(self) -> int:
+        # noinspection PyBrodException
+        try:
+            return self.client.get_rostime().to_nsec()
+        except Exception:  # noqa
+            # node not initialized yet
+            return self.wall_ns()
+
+
+class Ros2Clock(Clock):
+    """
+    ROS2 time of a node, simulated when `use_sim_time` is set.
+    """
+
+    def __init__(self, node_getter):
+        self.node_getter = node_getter
+
+    def now_ns(self) -> int:
+        node = self.node_getter()
+        if node is None:
+            return self.wall_ns()
+        return node.get_clock().now().nanoseconds
@@ -0,0 +1,207 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Conversion of lists of same-typed messages to columns of numpy arrays.
+
+Fields are flattened with dotted names (`pose.pose.position.x`), time
+fields become float64 seconds and `header.stamp` is reported as the
+`time` column. Fixed-size numeric arrays (covariances) give 2-D columns,
+everything else (strings, payloads, variable arrays) object columns.
+The layout is compiled once per message class from its declared field
+types, `_slot_types` on ROS1 or `get_fields_and_field_types` on ROS2.
+"""
+
+from operator import attrgetter
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+
+__all__ = ("message_fields", "message_field_types", "compile_columns",
+           "to_columns")
+
+TIME_COLUMN = "time"
+
+_column_builders: Dict[type, List[Tuple[str, Callable]]] = {}
+
+
+# declared scalar types of ROS1 and ROS2 -> dtype of their column, chars
+# are ints on ROS1 and strings on ROS2 and left to object columns
+_scalar_dtypes = {
+    "bool": np.bool_, "boolean": np.bool_,
+    "byte": np.int64, "octet": np.int64,
+    "int8": np.int64, "uint8": np.int64, "int16": np.int64,
+    "uint16": np.int64, "int32": np.int64, "uint32": np.int64,
+    "int64": np.int64, "uint64": np.uint64,
+    "float": np.float64, "double": np.float64,
+    "float32": np.float64, "float64": np.float64,
+}
+_time_types = ("time", "duration",
+               "builtin_interfaces/Time", "builtin_interfaces/Duration")
+# item types of the binary payloads
+_binary_types = ("uint8", "char", "byte", "octet")
+
+
+def message_field_types(msg) -> List[Tuple[str, Optional[str]]]:
+    """ (name, declared type) of the fields of a ROS1, ROS2 or memory
+    message, the type is None if the class does not declare it """
+    get_fields = getattr(msg, "get_fields_and_field_types", None)
+    if callable(get_fields):
+        return list(get_fields().items())
+    names = list(getattr(msg, "__slots__", ()))
+    field_types = list(getattr(msg, "_slot_types", None) or ())
+    if len(field_types) != len(names):
+        field_types = [None] * len(names)
+    return list(zip(names, field_types))
+
+
+def message_fields(msg) -> List[str]:
+    """ field names of a ROS1, ROS2 or memory message """
+    return [name for name, _ in message_field_types(msg)]
+
+
+def _time_attrs(value) -> Tuple[str, str]:
+    if hasattr(value, "secs") and hasattr(value, "nsecs"):
+        return "secs", "nsecs"
+    if hasattr(value, "sec") and hasattr(value, "nanosec"):
+        return "sec", "nanosec"
+    return "", ""
+
+
+def _array_type(field_type: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Item type and fixed size of the arrays `T[N]`, `T[]`, `T[<=N]`,
+    `sequence<T>` and `sequence<T, N>`, (None, None) for other types.
+    """
+    if field_type.startswith("sequence<") and field_type.endswith(">"):
+        return field_type[9:-1].split(",")[0].strip(), None
+    bracket = field_type.find("[")
+    if bracket > 0 and field_type.endswith("]"):
+        size = field_type[bracket + 1:-1]
+        return field_type[:bracket], int(size) if size.isdigit() else None
+    return None, None
+
+
+def _field_kind(field_type: Optional[str], value) -> Tuple[str, Any]:
+    """
+    Kind of the column of a field, decided on its declared type, the
+    value only tells the nested messages and time layouts apart.
+    """
+    if field_type in _time_types or (
+            field_type is None and _time_attrs(value)[0]):
+        return "time", _time_attrs(value)
+    if field_type in _scalar_dtypes:
+        return "scalar", _scalar_dtypes[field_type]
+    item_type, size = _array_type(field_type or "")
+    if item_type is not None:
+        if (item_type in _scalar_dtypes and
+                item_type not in _binary_types):
+            return "array", (size, _scalar_dtypes[item_type])
+        return "object", None
+    if message_fields(value):
+        return "message", None
+    # strings, chars and undeclared fields
+    return "object", None
+
+
+def _layout(msg, prefix: str = "") -> List[Tuple]:
+    """ (column, path, kind, extra) of every leaf of `msg` """
+    columns = []
+    for name, field_type in message_field_types(msg):
+        value = getattr(msg, name)
+        path = f"{prefix}{name}"
+        kind, extra = _field_kind(field_type, value)
+        if kind == "time":
+            column = TIME_COLUMN if path == "header.stamp" else path
+            columns.append((column, path, kind, extra))
+        elif kind == "message":
+            columns.extend(_layout(value, prefix=f"{path}."))
+        else:
+            columns.append((path, path, kind, extra))
+    return columns
+
+
+def compile_columns(msg) -> List[Tuple[str, Callable]]:
+    """
+    Column builders of the class of `msg`, `builder(msgs)` returns the
+    array of the column.
+    """
+    msg_cls = type(msg)
+    builders = _column_builders.get(msg_cls)
+    if builders is None:
+        builders = [(column, _builder(path, kind, extra))
+                    for column, path, kind, extra in _layout(msg)]
+        _column_builders[msg_cls] = builders
+    return builders
+
+
+def _builder(path: str, kind: str, extra: Any) -> Callable:
+    getter = attrgetter(path)
+    if kind == "time":
+        secs = attrgetter(f"{path}.{extra[0]}")
+        nsecs = attrgetter(f"{path}.{extra[1]}")
+
+        def build(msgs):
+            n = len(msgs)
+            s = np.fromiter(map(secs, msgs), dtype=np.int64, count=n)
+            ns = np.fromiter(map(nsecs, msgs), dtype=np.int64, count=n)
+            return s + ns * 1e-9
+    elif kind == "scalar":
+        def build(msgs):
+            return np.fromiter(map(getter, msgs), dtype=extra,
+                               count=len(msgs))
+    elif kind == "array" and extra[0] is not None:
+        size, dtype = extra
+
+        def build(msgs):
+            return np.asarray(list(map(getter, msgs)), dtype=dtype
+                              ).reshape(len(msgs), size)
+    elif kind == "array":
+        dtype = extra[1]
+
+        def build(msgs):
+            return _object_column(
+                (np.asarray(value, dtype=dtype)
+                 for value in map(getter, msgs)), len(msgs))
+    else:
+        def build(msgs):
+            return _object_column(map(getter, msgs), len(msgs))
+    return build
+
+
+def _object_column(values, size: int) -> np.ndarray:
+    # filled item by item, numpy would broadcast nested sequences
+    column = np.empty(size, dtype=object)
+    for inx, value in enumerate(values):
+        column[inx] = value
+    return column
+
+
+def to_columns(msgs: Sequence) -> Dict[str, np.ndarray]:
+    """
+    Columns of a list of messages of the same type.
+    """
+    msgs = list(msgs)
+    if not msgs:
+        return {}
+    msg_cls = type(msgs[0])
+    if any(type(msg) is not msg_cls for msg in msgs):
+        raise ValueError("batch transform requires messages of one type")
+    return {column: build(msgs) for column, build in compile_columns(msgs[0])}
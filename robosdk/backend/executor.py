@@ -0,0 +1,113 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from typing import Callable
+from typing import Dict
+
+from .clock import Clock
+from .clock import header_stamp
+
+__all__ = ("CallbackGroupKind", "CallbackStats", )
+
+
+class CallbackGroupKind:
+    """
+    Callback groups a subscription can be assigned to with the
+    `callback_group` subscribe option.
+
+    reentrant: callbacks of the group run in parallel
+    exclusive: callbacks of the group run one at a time
+    isolated: exclusive group spun by a dedicated executor thread,
+              for heavy sensors such as cameras
+    """
+
+    REENTRANT = "reentrant"
+    EXCLUSIVE = "exclusive"
+    ISOLATED = "isolated"
+
+    all = (REENTRANT, EXCLUSIVE, ISOLATED)
+
+
+class CallbackStats:
+    """
+    Callbacks counters of a group.
+
+    `in_flight` is the number of callbacks running, at most one in the
+    exclusive groups. The messages pending in the middleware queues are
+    not visible to the client libraries, `wait`, the delay between the
+    message stamp and the start of its callback, measures how long they
+    were queued instead.
+    """
+
+    def __init__(self, kind: str = CallbackGroupKind.EXCLUSIVE,
+                 clock: Clock = None):
+        self.kind = kind
+        self.clock = clock or Clock()
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.duration_total = 0.
+        self.duration_max = 0.
+        self.wait_total = 0.
+        self.wait_max = 0.
+        self.wait_count = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, callback: Callable) -> Callable:
+        def _callback(*msgs):
+            stamp = header_stamp(msgs[0]) if msgs else None
+            wait = None if stamp is None else self.clock.now() - stamp
+            with self._lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = callback(*msgs)
+                failed = False
+                return result
+            finally:
+                self._done(time.perf_counter() - start, wait, failed)
+        return _callback
+
+    def _done(self, duration: float, wait: float = None,
+              failed: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            self.errors += failed
+            self.duration_total += duration
+            self.duration_max = max(self.duration_max, duration)
+            if wait is not None and wait >= 0:
+                self.wait_count += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "duration_mean": (self.duration_total / self.calls
+                              if self.calls else 0.),
+            "duration_max": self.duration_max,
+            "wait_mean": (self.wait_total / self.wait_count
+                          if self.wait_count else 0.),
+            "wait_max": self.wait_max,
+        }
@@ -0,0 +1,148 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from pyee import EventEmitter
+from robosdk.common.logger import logging
+from robosdk.common.schema.stream import StreamMgsCls
+
+__all__ = ("TopicGraph", )
+
+
+class TopicGraph(EventEmitter):
+    """
+    Cache of topic -> message type -> message class of a backend,
+    refreshed in background.
+
+    Events, emitted from the refreshing thread:
+        added(stream: StreamMgsCls)
+        removed(stream: StreamMgsCls)
+
+    :param fetch: returns the current {topic: message type} of the graph
+    :param resolve: message class of a message type
+    :param interval: seconds between two background refreshes
+    """
+
+    def __init__(self, fetch: Callable[[], Dict[str, str]],
+                 resolve: Callable[[str], Any],
+                 interval: float = 2.):
+        super(TopicGraph, self).__init__()
+        self.fetch = fetch
+        self.resolve = resolve
+        self.interval = float(interval)
+        self.logger = logging.bind(instance="topicGraph", system=True)
+        self._types: Dict[str, str] = {}
+        self._classes: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._refreshed = threading.Event()
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def get_class(self, msg_type: str) -> Any:
+        """ message class of `msg_type`, resolved once """
+        if not msg_type:
+            return None
+        data_class = self._classes.get(msg_type)
+        if data_class is None:
+            data_class = self.resolve(msg_type)
+            if data_class is not None:
+                self._classes[msg_type] = data_class
+        return data_class
+
+    def _stream(self, name: str, msg_type: str) -> StreamMgsCls:
+        return StreamMgsCls(name=name, msg_type=self.get_class(msg_type))
+
+    def _notify(self, event: str, name: str, msg_type: str):
+        # noinspection PyBrodException
+        try:
+            self.emit(event, self._stream(name, msg_type))
+        except Exception as err:  # noqa
+            self.logger.error(f"topic graph listener of {name} "
+                              f"failure: {err}")
+
+    def refresh(self):
+        """
+        Query the graph once and emit the differences with the cache.
+        """
+        # noinspection PyBrodException
+        try:
+            current = dict(self.fetch() or {})
+        except Exception as err:  # noqa
+            self.logger.debug(f"fail to fetch topics: {err}")
+            return
+        # events are emitted in the order of the snapshots
+        with self._lock:
+            previous, self._types = self._types, current
+            self._refreshed.set()
+            for name, msg_type in previous.items():
+                if current.get(name) != msg_type:
+                    self._notify("removed", name, msg_type)
+            for name, msg_type in current.items():
+                if previous.get(name) != msg_type:
+                    self._notify("added", name, msg_type)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.refresh()
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def get_type(self, topic: str, blocking: bool = False,
+                 timeout: float = None) -> Optional[str]:
+        """
+        Message type of `topic` from the cache, the graph is queried
+        again on a miss, and polled until `timeout` when blocking.
+        """
+        msg_type = self._types.get(topic)
+        if msg_type is not None:
+            return msg_type
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.refresh()
+            msg_type = self._types.get(topic)
+            if msg_type is not None or not blocking:
+                return msg_type
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(min(self.interval, .5))
+
+    def get_topic_class(self, topic: str, blocking: bool = False,
+                        timeout: float = None) -> Any:
+        return self.get_class(
+            self.get_type(topic, blocking=blocking, timeout=timeout))
+
+    def topics(self) -> List[StreamMgsCls]:
+        if not self._refreshed.is_set():
+            self.refresh()
+        return [self._stream(name, msg_type)
+                for name, msg_type in list(self._types.items())]
+
+    def __contains__(self, topic: str) -> bool:
+        return topic in self._types
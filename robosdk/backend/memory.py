@@ -0,0 +1,559 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import array
+import math
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import numpy as np
+from robosdk.common.class_factory import ClassFactory
+from robosdk.common.class_factory import ClassType
+from robosdk.common.config import BaseConfig
+from robosdk.common.config import Config
+from robosdk.common.exceptions import SensorError
+from robosdk.common.schema.stream import StreamMgsCls
+
+from .base import BackendBase
+from .clock import Clock
+from .graph import TopicGraph
+from .memory_msgs import Time
+from .memory_msgs import audio_common_msgs
+from .memory_msgs import geometry_msgs
+from .memory_msgs import get_message_class
+from .memory_msgs import nav_msgs
+from .memory_msgs import sensor_msgs
+from .memory_msgs import std_msgs
+from .memory_msgs import tf2_msgs
+from .numpify import numpify
+from .ros1 import Ros1Backend
+
+__all__ = ("MemoryClock", "MemoryBackend")
+
+
+class MemoryClock(Clock):
+    """
+    Simulated clock of the memory backend.
+
+    :param rate: speed of the simulated time, 2.0 runs twice as fast
+    :param start: initial time stamp in seconds, default the wall time
+    """
+
+    def __init__(self, rate: float = 1.0, start: float = None):
+        if rate <= 0:
+            raise ValueError("clock rate should be positive")
+        self.rate = float(rate)
+        self._start_ns = (self.wall_ns() if start is None
+                          else int(float(start) * 1e9))
+        self._origin_ns = self.monotonic_ns()
+
+    def now_ns(self) -> int:
+        elapsed = self.monotonic_ns() - self._origin_ns
+        return self._start_ns + int(elapsed * self.rate)
+
+    def wall_duration(self, duration: float) -> float:
+        """ wall seconds that elapse while `duration` passes on the clock """
+        return duration / self.rate
+
+    def sleep(self, duration: float):
+        time.sleep(self.wall_duration(duration))
+
+
+class _MemorySubscriber:
+    """
+    Handle returned by `MemoryBackend.subscribe`.
+    """
+
+    def __init__(self, backend, topic: str, callback: Callable = None,
+                 callback_args: Dict = None):
+        self.backend = backend
+        self.topic = topic
+        self.callback = callback
+        self.callback_args = callback_args or {}
+        self.name = topic
+
+    def __call__(self, msg):
+        if self.callback is not None:
+            self.callback(msg, **self.callback_args)
+
+    def registerCallback(self, callback: Callable, *args):  # noqa
+        """ same as `message_filters.Subscriber.registerCallback` """
+        self.callback = (lambda msg: callback(msg, *args)) if args \
+            else callback
+
+    def unregister(self):
+        self.backend.remove_subscriber(self)
+
+
+class _MemoryTopic:
+
+    def __init__(self, name: str, data_class: Any = None):
+        self.name = name
+        self.data_class = data_class
+        self.subscribers: List[_MemorySubscriber] = []
+        self.latest = None
+        self.count = 0
+        self.publishers = 0
+        self.cond = threading.Condition()
+
+    def deliver(self, msg):
+        with self.cond:
+            self.latest = msg
+            self.count += 1
+            if self.data_class is None:
+                self.data_class = type(msg)
+            subscribers = tuple(self.subscribers)
+            self.cond.notify_all()
+        for sub in subscribers:
+            sub(msg)
+
+
+class _SyntheticSource(threading.Thread):
+    """
+    Publish `factory(config, seq, stamp)` on `topic` at `hz` of the
+    backend clock.
+    """
+
+    def __init__(self, backend, topic: str, factory: Callable,
+                 config: Config = None, hz: float = 10.):
+        super(_SyntheticSource, self).__init__(daemon=True)
+        self.backend = backend
+        self.topic = topic
+        self.factory = factory
+        self.config = config if config is not None else Config({})
+        self.hz = float(hz)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        clock = self.backend.clock
+        period = clock.wall_duration(1. / self.hz)
+        next_tick = time.monotonic()
+        seq = 0
+        while not self._stop_event.is_set():
+            msg = self.factory(self.config, seq, clock.now())
+            self.backend.publish(self.topic, msg, type(msg))
+            seq += 1
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _stamped(msg, config: Config, seq: int, stamp: float):
+    msg.header.seq = seq
+    msg.header.stamp = Time.from_sec(stamp)
+    msg.header.frame_id = config.get("frame_id", "") or "base_link"
+    return msg
+
+
+def _yaw_quaternion(yaw: float):
+    return geometry_msgs.Quaternion(
+        x=0., y=0., z=math.sin(yaw / 2.), w=math.cos(yaw / 2.))
+
+
+def _synthetic_image(config: Config, seq: int, stamp: float):
+    width = int(config.get("width", 0) or 640)
+    height = int(config.get("height", 0) or 480)
+    encoding = config.get("encoding", "bgr8")
+    if encoding not in ("rgb8", "bgr8", "mono8"):
+        encoding = "bgr8"
+    channels = 1 if encoding == "mono8" else 3
+    frames = config.get("_frames", None)
+    if frames is None:
+        # a few distinct frames built once, published in turn
+        grad = np.add.outer(np.arange(height), np.arange(width))
+        frames = [
+            np.repeat(((grad + shift * 16) % 256).astype(np.uint8)[..., None],
+                      channels, axis=2).tobytes()
+            for shift in range(8)
+        ]
+        config["_frames"] = frames
+    msg = sensor_msgs.Image(
+        height=height, width=width, encoding=encoding,
+        step=width * channels, data=frames[seq % len(frames)])
+    return _stamped(msg, config, seq, stamp)
+
+
+def _synthetic_depth(config: Config, seq: int, stamp: float):
+    width = int(config.get("width", 0) or 640)
+    height = int(config.get("height", 0) or 480)
+    frame = config.get("_frame", None)
+    if frame is None:
+        rows = np.linspace(3000, 500, height, dtype=np.float32)
+        frame = np.repeat(rows[:, None], width, axis=1).astype(
+            "<u2").tobytes()
+        config["_frame"] = frame
+    msg = sensor_msgs.Image(
+        height=height, width=width, encoding="16UC1",
+        step=width * 2, data=frame)
+    return _stamped(msg, config, seq, stamp)
+
+
+def _synthetic_camera_info(config: Config, seq: int, stamp: float):
+    width = int(config.get("width", 0) or 640)
+    height = int(config.get("height", 0) or 480)
+    focal = width / (2. * math.tan(math.radians(69.) / 2.))
+    cx, cy = width / 2., height / 2.
+    msg = sensor_msgs.CameraInfo(
+        height=height, width=width, distortion_model="plumb_bob",
+        D=[0.] * 5, K=[focal, 0., cx, 0., focal, cy, 0., 0., 1.],
+        R=[1., 0., 0., 0., 1., 0., 0., 0., 1.],
+        P=[focal, 0., cx, 0., 0., focal, cy, 0., 0., 0., 1., 0.])
+    return _stamped(msg, config, seq, stamp)
+
+
+def _synthetic_imu(config: Config, seq: int, stamp: float):
+    yaw_rate = .2
+    msg = sensor_msgs.Imu(
+        orientation=_yaw_quaternion(yaw_rate * stamp),
+        angular_velocity=geometry_msgs.Vector3(
+            x=0., y=0., z=yaw_rate + np.random.normal(0., .01)),
+        linear_acceleration=geometry_msgs.Vector3(
+            x=np.random.normal(0., .05), y=np.random.normal(0., .05),
+            z=9.81 + np.random.normal(0., .05)))
+    return _stamped(msg, config, seq, stamp)
+
+
+def _synthetic_odometry(config: Config, seq: int, stamp: float):
+    # trot along a circle of 2m radius at .5 m/s
+    radius, speed = 2., .5
+    theta = speed / radius * stamp
+    msg = nav_msgs.Odometry(child_frame_id=config.get("base_link", "")
+                            or "base_link")
+    msg.pose.pose.position.x = radius * math.cos(theta)
+    msg.pose.pose.position.y = radius * math.sin(theta)
+    msg.pose.pose.orientation = _yaw_quaternion(theta + math.pi / 2.)
+    msg.twist.twist.linear.x = speed
+    msg.twist.twist.angular.z = speed / radius
+    msg = _stamped(msg, config, seq, stamp)
+    msg.header.frame_id = config.get("frame_id", "") or "odom"
+    return msg
+
+
+def _transform_stamped(parent: str, child: str, translation, rotation,
+                       stamp: float = 0.):
+    trans = geometry_msgs.TransformStamped(child_frame_id=child)
+    trans.header.stamp = Time.from_sec(stamp)
+    trans.header.frame_id = parent
+    trans.transform.translation = geometry_msgs.Vector3(
+        x=translation[0], y=translation[1], z=translation[2])
+    trans.transform.rotation = geometry_msgs.Quaternion(
+        x=rotation[0], y=rotation[1], z=rotation[2], w=rotation[3])
+    return trans
+
+
+def _synthetic_tf(config: Config, seq: int, stamp: float):
+    odom = _synthetic_odometry(config, seq, stamp)
+    pose = odom.pose.pose
+    q = pose.orientation
+    return tf2_msgs.TFMessage(transforms=[_transform_stamped(
+        odom.header.frame_id, odom.child_frame_id,
+        (pose.position.x, pose.position.y, pose.position.z),
+        (q.x, q.y, q.z, q.w), stamp=stamp)])
+
+
+def _synthetic_battery(config: Config, seq: int, stamp: float):
+    percentage = max(0., 1. - (seq % 36000) / 36000.)
+    msg = sensor_msgs.BatteryState(
+        voltage=46. + 8. * percentage, current=-5., percentage=percentage,
+        present=True)
+    return _stamped(msg, config, seq, stamp)
+
+
+def _synthetic_scan(config: Config, seq: int, stamp: float):
+    beams = int(config.get("beams", 0) or 720)
+    ranges = config.get("_ranges", None)
+    if ranges is None:
+        # distances to the walls of a 8x6m room from its center
+        thetas = -math.pi + 2 * math.pi / beams * np.arange(beams)
+        with np.errstate(divide="ignore"):
+            ranges = np.minimum(np.abs(4. / np.cos(thetas)),
+                                np.abs(3. / np.sin(thetas)))
+        ranges = array.array("f", ranges.astype(np.float32).tobytes())
+        config["_ranges"] = ranges
+    msg = sensor_msgs.LaserScan(
+        angle_min=-math.pi, angle_max=math.pi - 2 * math.pi / beams,
+        angle_increment=2 * math.pi / beams, time_increment=1. / 40 / beams,
+        scan_time=1. / 40, range_min=.1, range_max=30.,
+        ranges=ranges, intensities=array.array("f", bytes(4 * beams)))
+    return _stamped(msg, config, seq, stamp)
+
+
+def _synthetic_audio(config: Config, seq: int, stamp: float):
+    sample_rate = int(config.get("sample_rate", 0) or 16000)
+    hz = float(config.get("origin_hz", 0) or 10)
+    samples = int(sample_rate / hz)
+    t = (seq * samples + np.arange(samples)) / sample_rate
+    # one second of 440Hz tone every three seconds
+    tone = (np.sin(2 * math.pi * 440. * t) * 8000 * ((t % 3.) < 1.))
+    noise = np.random.normal(0., 100., samples)
+    data = (tone + noise).astype("<i2").tobytes()
+    return audio_common_msgs.AudioData(data=data)
+
+
+_synthetic_streams = {
+    "camera": {
+        "rgb": (_synthetic_image, 30.),
+        "depth": (_synthetic_depth, 30.),
+        "info": (_synthetic_camera_info, 1.),
+    },
+    "imu": {"data": (_synthetic_imu, 200.)},
+    "odom": {"data": (_synthetic_odometry, 200.)},
+    "battery": {"data": (_synthetic_battery, 10.)},
+    "lidar": {"data": (_synthetic_scan, 40.)},
+    "voice": {"data": (_synthetic_audio, 10.)},
+}
+
+# streams of the drivers which differ from the ones of their kind
+_synthetic_drivers = {
+    "ros_tf_driver": {"data": (_synthetic_tf, 50.)},
+}
+
+
+@ClassFactory.register(ClassType.BACKEND, alias="memory")
+class MemoryBackend(BackendBase):  # noqa
+    """
+    In-process backend without any middleware: topics fan out to the
+    subscribers of the same process, and sensors registered by `Robot`
+    are fed with synthetic data at their `origin_hz`.
+
+    :param clock: time source of stamps and synthetic rates
+    :param synthetic: generate data for registered sensors
+    """
+
+    def __init__(self, clock: MemoryClock = None, synthetic: bool = True):
+        super(MemoryBackend, self).__init__()
+        self.clock = clock or MemoryClock()
+        self.synthetic = synthetic
+        self.node_name = "memory"
+        self._topics: Dict[str, _MemoryTopic] = {}
+        self._topic_lock = threading.RLock()
+        self._sources: Dict[str, _SyntheticSource] = {}
+        # child frame -> transform published on /tf_static
+        self._static_transforms: Dict[str, Any] = {}
+        self.msg_sensor_generator = sensor_msgs
+        self.msg_standard_generator = std_msgs
+        self.msg_geometry_generator = geometry_msgs
+        self.topic_graph = TopicGraph(
+            self._fetch_topic_types, get_message_class,
+            interval=BaseConfig.TOPIC_GRAPH_INTERVAL
+        )
+
+    def connect(self, name: str, **kwargs):
+        if self.has_connect:
+            return
+        self.node_name = name
+        self.has_connect = True
+        self.topic_graph.start()
+        for source in self._sources.values():
+            if not source.is_alive():
+                source.start()
+
+    def close(self):
+        self.topic_graph.stop()
+        for source in self._sources.values():
+            source.stop()
+        self._sources = {}
+        self.has_connect = False
+
+    @property
+    def now(self):
+        return Time(*divmod(self.clock.now_ns(), 1000000000))
+
+    def get_time(self) -> float:
+        return self.clock.now()
+
+    @staticmethod
+    def get_message_class(msg_type):
+        return get_message_class(msg_type)
+
+    def get_message_type(self, msg_topic, blocking=False):
+        topic = self._topics.get(msg_topic)
+        if topic is None or topic.data_class is None:
+            return None
+        return topic.data_class._type  # noqa
+
+    def _get_topic(self, name: str, data_class: Any = None) -> _MemoryTopic:
+        with self._topic_lock:
+            topic = self._topics.get(name)
+            if topic is None:
+                topic = _MemoryTopic(name, data_class=data_class)
+                self._topics[name] = topic
+            elif topic.data_class is None and data_class is not None:
+                topic.data_class = data_class
+        return topic
+
+    def add_subscriber(self, name: str, callback: Callable = None,
+                       callback_args: Dict = None,
+                       data_class: Any = None) -> _MemorySubscriber:
+        if isinstance(data_class, str):
+            data_class = self.get_message_class(data_class)
+        topic = self._get_topic(name, data_class=data_class)
+        sub = _MemorySubscriber(self, name, callback=callback,
+                                callback_args=callback_args)
+        with topic.cond:
+            topic.subscribers.append(sub)
+        return sub
+
+    def remove_subscriber(self, sub: _MemorySubscriber):
+        topic = self._topics.get(sub.topic)
+        if topic is None:
+            return
+        with topic.cond:
+            if sub in topic.subscribers:
+                topic.subscribers.remove(sub)
+
+    def subscribe(self,
+                  *topics,
+                  callback: Callable = None,
+                  callback_args: Any = None,
+                  **kwargs):
+        if not topics:
+            raise SensorError("fail to subscribe, no topic given")
+        if len(topics) == 1:
+            return self.add_subscriber(
+                topics[0], callback=callback, callback_args=callback_args,
+                data_class=kwargs.get("data_class", None)
+            )
+        return self.subscribe_synchronized(
+            *topics, callback=callback, callback_args=callback_args, **kwargs)
+
+    def unsubscribe(self, *topics, filter_ids: List = None):
+        for item in topics:
+            if hasattr(item, "unregister"):
+                item.unregister()
+                continue
+            topic = self._topics.get(item)
+            if topic is None:
+                continue
+            if filter_ids and item not in filter_ids:
+                continue
+            with topic.cond:
+                topic.subscribers = []
+
+    def advertise(self, name: str, data_class: Callable,
+                  queue_size: int = 1, **kwargs):
+        return self._get_topic(name, data_class=data_class)
+
+    def publish(self, name: str,
+                data: Any,
+                data_class: Callable = None,
+                queue_size: int = 1, **kwargs):
+        self._get_topic(name, data_class=data_class).deliver(data)
+
+    def get(self, topic,
+            callback: Callable = None,
+            callback_args: Dict = None,
+            **kwargs):
+        """
+        Latest message of `topic`, waiting up to `timeout` seconds for
+        the first one.
+        """
+        timeout = float(kwargs.get("timeout", 10.))
+        _topic = self._get_topic(topic, data_class=kwargs.get("data_class"))
+        with _topic.cond:
+            if _topic.latest is None:
+                _topic.cond.wait(timeout)
+            msg = _topic.latest
+        if msg is None:
+            raise SensorError(f"no message received from {topic}")
+        if callback:
+            return callback(msg, **(callback_args or {}))
+        return msg
+
+    def _fetch_topic_types(self) -> Dict[str, str]:
+        return {
+            topic.name: topic.data_class._type  # noqa
+            for topic in list(self._topics.values())
+            if topic.count and topic.data_class is not None
+        }
+
+    def get_message_list(self) -> List[StreamMgsCls]:
+        return self.topic_graph.topics()
+
+    def add_synthetic_source(self, topic: str, factory: Callable,
+                             hz: float = 10., config: Config = None):
+        """
+        Publish `factory(config, seq, stamp)` on `topic` at `hz`.
+        """
+        if topic in self._sources:
+            self._sources[topic].stop()
+        source = _SyntheticSource(self, topic, factory, config=config, hz=hz)
+        self._sources[topic] = source
+        if self.has_connect:
+            source.start()
+        return source
+
+    def add_static_transform(self, parent: str, child: str,
+                             translation=(0., 0., 0.),
+                             rotation=(0., 0., 0., 1.)):
+        """
+        Publish the transform of `child` in `parent` on `/tf_static`.
+        """
+        if not child or child == parent:
+            return
+        self._static_transforms[child] = _transform_stamped(
+            parent, child, translation, rotation)
+        if "/tf_static" not in self._sources:
+            self.add_synthetic_source(
+                "/tf_static", hz=1., factory=lambda *_: tf2_msgs.TFMessage(
+                    transforms=list(self._static_transforms.values())))
+
+    def register_sensor(self, kind: str, config: Config):
+        if not self.synthetic:
+            return
+        data = config.get("data", None) or {}
+        driver = (config.get("driver", None) or {}).get("name", "")
+        if driver == "ros_tf_driver":
+            self.add_static_transform(
+                data.get("map_frame", "") or "map",
+                data.get("frame_id", "") or "odom")
+        elif kind.lower() == "lidar":
+            self.add_static_transform(
+                "base_link", data.get("base_link", "") or "laser")
+        streams = _synthetic_drivers.get(driver, None)
+        if streams is None:
+            streams = _synthetic_streams.get(kind.lower(), {})
+        for stream, (factory, hz) in streams.items():
+            stream_cfg = config.get(stream, None)
+            if not isinstance(stream_cfg, dict) or not stream_cfg.get(
+                    "target", None):
+                continue
+            stream_cfg = Config(stream_cfg)
+            self.add_synthetic_source(
+                stream_cfg.target, factory,
+                hz=float(stream_cfg.get("origin_hz", 0) or hz),
+                config=stream_cfg
+            )
+
+    @classmethod
+    def data_transform(cls, msg, fmt: str = "raw"):
+        if fmt == "json":
+            return Ros1Backend.data_transform(msg, fmt=fmt)
+        elif fmt == "numpy":
+            data = numpify(msg)
+            if data is None:
+                raise SensorError(
+                    f"numpy transform of {type(msg).__name__} unsupported")
+            return data
+        return msg
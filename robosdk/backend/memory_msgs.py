@@ -0,0 +1,378 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Lightweight message classes for the in-process `memory` backend.
+
+They mirror the layout of the ROS1 messages used by the sensors and
+controls (`__slots__`, `_slot_types` and `_type` as genpy does), so
+that drivers, `data_transform` and the numpy conversions work on them
+unchanged.
+"""
+
+from types import SimpleNamespace
+from typing import Dict
+
+__all__ = ("Time", "Duration", "Message", "get_message_class",
+           "std_msgs", "geometry_msgs", "sensor_msgs", "nav_msgs",
+           "audio_common_msgs", "tf2_msgs")
+
+_registry: Dict[str, type] = {}
+
+_primitive_defaults = {
+    "bool": False, "byte": 0, "char": 0, "int8": 0, "uint8": 0,
+    "int16": 0, "uint16": 0, "int32": 0, "uint32": 0, "int64": 0,
+    "uint64": 0, "float32": 0.0, "float64": 0.0, "string": "",
+}
+
+
+class Time:
+    """
+    Time stamp with the attributes and helpers of `rospy.Time`.
+    """
+
+    __slots__ = ("secs", "nsecs")
+
+    def __init__(self, secs: int = 0, nsecs: int = 0):
+        self.secs = int(secs)
+        self.nsecs = int(nsecs)
+
+    @classmethod
+    def from_sec(cls, float_secs: float):
+        secs = int(float_secs)
+        return cls(secs, int(round((float_secs - secs) * 1e9)))
+
+    def to_sec(self) -> float:
+        return self.secs + self.nsecs * 1e-9
+
+    def to_nsec(self) -> int:
+        return self.secs * 1000000000 + self.nsecs
+
+    def __eq__(self, other):
+        return (isinstance(other, Time) and
+                self.to_nsec() == other.to_nsec())
+
+    def __lt__(self, other):
+        return self.to_nsec() < other.to_nsec()
+
+    def __hash__(self):
+        return hash(self.to_nsec())
+
+    def __repr__(self):
+        return f"{type(self).__name__}[{self.to_nsec()}]"
+
+
+class Duration(Time):
+    pass
+
+
+def get_message_class(msg_type: str):
+    """
+    Class registered for `package/Type`, None if unknown.
+    """
+    if msg_type == "Header":
+        msg_type = "std_msgs/Header"
+    return _registry.get(msg_type)
+
+
+def _default(field_type: str):
+    if field_type in _primitive_defaults:
+        return _primitive_defaults[field_type]
+    if field_type == "time":
+        return Time()
+    if field_type == "duration":
+        return Duration()
+    bracket = field_type.find("[")
+    if bracket >= 0:
+        item_type, size = field_type[:bracket], field_type[bracket + 1:-1]
+        if item_type in ("uint8", "char"):
+            return bytes(int(size)) if size else b""
+        if not size:
+            return []
+        return [_default(item_type) for _ in range(int(size))]
+    return get_message_class(field_type)()
+
+
+class Message:
+    """
+    Base of the memory messages, unset fields get the ROS defaults.
+    """
+
+    __slots__ = ()
+    _type = ""
+    _slot_types = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls._type:
+            _registry[cls._type] = cls
+
+    def __init__(self, **kwargs):
+        for name, field_type in zip(self.__slots__, self._slot_types):
+            if name in kwargs:
+                value = kwargs.pop(name)
+            else:
+                value = _default(field_type)
+            setattr(self, name, value)
+        if kwargs:
+            raise TypeError(f"{self._type} has no fields {list(kwargs)}")
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__
+        )
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}"
+                           for name in self.__slots__)
+        return f"{self._type}({values})"
+
+
+# std_msgs
+
+class Header(Message):
+    _type = "std_msgs/Header"
+    __slots__ = ("seq", "stamp", "frame_id")
+    _slot_types = ["uint32", "time", "string"]
+
+
+class String(Message):
+    _type = "std_msgs/String"
+    __slots__ = ("data", )
+    _slot_types = ["string"]
+
+
+class Bool(Message):
+    _type = "std_msgs/Bool"
+    __slots__ = ("data", )
+    _slot_types = ["bool"]
+
+
+class Float32(Message):
+    _type = "std_msgs/Float32"
+    __slots__ = ("data", )
+    _slot_types = ["float32"]
+
+
+# geometry_msgs
+
+class Point(Message):
+    _type = "geometry_msgs/Point"
+    __slots__ = ("x", "y", "z")
+    _slot_types = ["float64", "float64", "float64"]
+
+
+class Vector3(Message):
+    _type = "geometry_msgs/Vector3"
+    __slots__ = ("x", "y", "z")
+    _slot_types = ["float64", "float64", "float64"]
+
+
+class Quaternion(Message):
+    _type = "geometry_msgs/Quaternion"
+    __slots__ = ("x", "y", "z", "w")
+    _slot_types = ["float64", "float64", "float64", "float64"]
+
+
+class Pose(Message):
+    _type = "geometry_msgs/Pose"
+    __slots__ = ("position", "orientation")
+    _slot_types = ["geometry_msgs/Point", "geometry_msgs/Quaternion"]
+
+
+class PoseStamped(Message):
+    _type = "geometry_msgs/PoseStamped"
+    __slots__ = ("header", "pose")
+    _slot_types = ["std_msgs/Header", "geometry_msgs/Pose"]
+
+
+class PoseWithCovariance(Message):
+    _type = "geometry_msgs/PoseWithCovariance"
+    __slots__ = ("pose", "covariance")
+    _slot_types = ["geometry_msgs/Pose", "float64[36]"]
+
+
+class PoseWithCovarianceStamped(Message):
+    _type = "geometry_msgs/PoseWithCovarianceStamped"
+    __slots__ = ("header", "pose")
+    _slot_types = ["std_msgs/Header", "geometry_msgs/PoseWithCovariance"]
+
+
+class Twist(Message):
+    _type = "geometry_msgs/Twist"
+    __slots__ = ("linear", "angular")
+    _slot_types = ["geometry_msgs/Vector3", "geometry_msgs/Vector3"]
+
+
+class TwistWithCovariance(Message):
+    _type = "geometry_msgs/TwistWithCovariance"
+    __slots__ = ("twist", "covariance")
+    _slot_types = ["geometry_msgs/Twist", "float64[36]"]
+
+
+class Transform(Message):
+    _type = "geometry_msgs/Transform"
+    __slots__ = ("translation", "rotation")
+    _slot_types = ["geometry_msgs/Vector3", "geometry_msgs/Quaternion"]
+
+
+class TransformStamped(Message):
+    _type = "geometry_msgs/TransformStamped"
+    __slots__ = ("header", "child_frame_id", "transform")
+    _slot_types = ["std_msgs/Header", "string", "geometry_msgs/Transform"]
+
+
+# sensor_msgs
+
+class RegionOfInterest(Message):
+    _type = "sensor_msgs/RegionOfInterest"
+    __slots__ = ("x_offset", "y_offset", "height", "width", "do_rectify")
+    _slot_types = ["uint32", "uint32", "uint32", "uint32", "bool"]
+
+
+class Image(Message):
+    _type = "sensor_msgs/Image"
+    __slots__ = ("header", "height", "width", "encoding",
+                 "is_bigendian", "step", "data")
+    _slot_types = ["std_msgs/Header", "uint32", "uint32", "string",
+                   "uint8", "uint32", "uint8[]"]
+
+
+class CompressedImage(Message):
+    _type = "sensor_msgs/CompressedImage"
+    __slots__ = ("header", "format", "data")
+    _slot_types = ["std_msgs/Header", "string", "uint8[]"]
+
+
+class CameraInfo(Message):
+    _type = "sensor_msgs/CameraInfo"
+    __slots__ = ("header", "height", "width", "distortion_model", "D", "K",
+                 "R", "P", "binning_x", "binning_y", "roi")
+    _slot_types = ["std_msgs/Header", "uint32", "uint32", "string",
+                   "float64[]", "float64[9]", "float64[9]", "float64[12]",
+                   "uint32", "uint32", "sensor_msgs/RegionOfInterest"]
+
+
+class Imu(Message):
+    _type = "sensor_msgs/Imu"
+    __slots__ = ("header", "orientation", "orientation_covariance",
+                 "angular_velocity", "angular_velocity_covariance",
+                 "linear_acceleration", "linear_acceleration_covariance")
+    _slot_types = ["std_msgs/Header", "geometry_msgs/Quaternion",
+                   "float64[9]", "geometry_msgs/Vector3", "float64[9]",
+                   "geometry_msgs/Vector3", "float64[9]"]
+
+
+class LaserScan(Message):
+    _type = "sensor_msgs/LaserScan"
+    __slots__ = ("header", "angle_min", "angle_max", "angle_increment",
+                 "time_increment", "scan_time", "range_min", "range_max",
+                 "ranges", "intensities")
+    _slot_types = ["std_msgs/Header", "float32", "float32", "float32",
+                   "float32", "float32", "float32", "float32",
+                   "float32[]", "float32[]"]
+
+
+class PointField(Message):
+    INT8, UINT8, INT16, UINT16, INT32, UINT32, FLOAT32, FLOAT64 = range(1, 9)
+
+    _type = "sensor_msgs/PointField"
+    __slots__ = ("name", "offset", "datatype", "count")
+    _slot_types = ["string", "uint32", "uint8", "uint32"]
+
+
+class PointCloud2(Message):
+    _type = "sensor_msgs/PointCloud2"
+    __slots__ = ("header", "height", "width", "fields", "is_bigendian",
+                 "point_step", "row_step", "data", "is_dense")
+    _slot_types = ["std_msgs/Header", "uint32", "uint32",
+                   "sensor_msgs/PointField[]", "bool", "uint32", "uint32",
+                   "uint8[]", "bool"]
+
+
+class BatteryState(Message):
+    _type = "sensor_msgs/BatteryState"
+    __slots__ = ("header", "voltage", "current", "charge", "capacity",
+                 "design_capacity", "percentage", "power_supply_status",
+                 "power_supply_health", "power_supply_technology",
+                 "present", "cell_voltage", "location", "serial_number")
+    _slot_types = ["std_msgs/Header", "float32", "float32", "float32",
+                   "float32", "float32", "float32", "uint8", "uint8",
+                   "uint8", "bool", "float32[]", "string", "string"]
+
+
+# nav_msgs
+
+class MapMetaData(Message):
+    _type = "nav_msgs/MapMetaData"
+    __slots__ = ("map_load_time", "resolution", "width", "height", "origin")
+    _slot_types = ["time", "float32", "uint32", "uint32",
+                   "geometry_msgs/Pose"]
+
+
+class OccupancyGrid(Message):
+    _type = "nav_msgs/OccupancyGrid"
+    __slots__ = ("header", "info", "data")
+    _slot_types = ["std_msgs/Header", "nav_msgs/MapMetaData", "int8[]"]
+
+
+class Odometry(Message):
+    _type = "nav_msgs/Odometry"
+    __slots__ = ("header", "child_frame_id", "pose", "twist")
+    _slot_types = ["std_msgs/Header", "string",
+                   "geometry_msgs/PoseWithCovariance",
+                   "geometry_msgs/TwistWithCovariance"]
+
+
+# audio_common_msgs
+
+class AudioData(Message):
+    _type = "audio_common_msgs/AudioData"
+    __slots__ = ("data", )
+    _slot_types = ["uint8[]"]
+
+
+class AudioInfo(Message):
+    _type = "audio_common_msgs/AudioInfo"
+    __slots__ = ("channels", "sample_rate", "sample_format",
+                 "bitrate", "coding_format")
+    _slot_types = ["uint8", "uint32", "string", "uint32", "string"]
+
+
+# tf2_msgs
+
+class TFMessage(Message):
+    _type = "tf2_msgs/TFMessage"
+    __slots__ = ("transforms", )
+    _slot_types = ["geometry_msgs/TransformStamped[]"]
+
+
+std_msgs = SimpleNamespace(
+    Header=Header, String=String, Bool=Bool, Float32=Float32)
+geometry_msgs = SimpleNamespace(
+    Point=Point, Vector3=Vector3, Quaternion=Quaternion, Pose=Pose,
+    PoseStamped=PoseStamped, PoseWithCovariance=PoseWithCovariance,
+    PoseWithCovarianceStamped=PoseWithCovarianceStamped, Twist=Twist,
+    TwistWithCovariance=TwistWithCovariance, Transform=Transform,
+    TransformStamped=TransformStamped)
+sensor_msgs = SimpleNamespace(
+    RegionOfInterest=RegionOfInterest, Image=Image,
+    CompressedImage=CompressedImage, CameraInfo=CameraInfo, Imu=Imu,
+    LaserScan=LaserScan, PointField=PointField, PointCloud2=PointCloud2,
+    BatteryState=BatteryState)
+nav_msgs = SimpleNamespace(
+    MapMetaData=MapMetaData, OccupancyGrid=OccupancyGrid, Odometry=Odometry)
+audio_common_msgs = SimpleNamespace(AudioData=AudioData, AudioInfo=AudioInfo)
+tf2_msgs = SimpleNamespace(TFMessage=TFMessage)
@@ -0,0 +1,190 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Conversion of sensor messages to numpy arrays without `ros_numpy`.
+
+Payloads are wrapped with `np.frombuffer` / `np.ndarray(buffer=...)`
+so the returned arrays are views over the message memory whenever the
+message exposes a buffer (`bytes` in ROS1, `array.array` in ROS2).
+Arrays viewing immutable `bytes` are read-only.
+"""
+
+import re
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+import numpy as np
+
+__all__ = ("get_message_type_name", "parse_image_encoding",
+           "point_cloud_dtype", "image_to_numpy", "scan_to_numpy",
+           "point_cloud2_to_numpy", "occupancy_grid_to_numpy", "numpify")
+
+_image_encodings = {
+    "rgb8": (np.uint8, 3), "rgba8": (np.uint8, 4),
+    "rgb16": (np.uint16, 3), "rgba16": (np.uint16, 4),
+    "bgr8": (np.uint8, 3), "bgra8": (np.uint8, 4),
+    "bgr16": (np.uint16, 3), "bgra16": (np.uint16, 4),
+    "mono8": (np.uint8, 1), "mono16": (np.uint16, 1),
+    "yuv422": (np.uint8, 2), "uyvy": (np.uint8, 2), "yuyv": (np.uint8, 2),
+}
+_cv_encoding = re.compile(r"^(8|16|32|64)(U|S|F)C(\d+)$")
+_cv_depth = {
+    ("8", "U"): np.uint8, ("8", "S"): np.int8,
+    ("16", "U"): np.uint16, ("16", "S"): np.int16,
+    ("32", "S"): np.int32, ("32", "F"): np.float32,
+    ("64", "F"): np.float64,
+}
+
+# sensor_msgs/PointField datatype constants
+_point_field_types = {
+    1: np.int8, 2: np.uint8, 3: np.int16, 4: np.uint16,
+    5: np.int32, 6: np.uint32, 7: np.float32, 8: np.float64,
+}
+
+
+def get_message_type_name(msg: Any) -> str:
+    """
+    `package/Type` of a ROS1 (`_type`) or ROS2 (module path) message.
+    """
+    name = getattr(msg, "_type", None)
+    if isinstance(name, str):
+        return name
+    cls = type(msg)
+    return f"{cls.__module__.split('.')[0]}/{cls.__name__}"
+
+
+def _as_buffer(data, dtype) -> np.ndarray:
+    """ view over `data` if it supports the buffer protocol """
+    if isinstance(data, np.ndarray):
+        return data.astype(dtype, copy=False)
+    try:
+        return np.frombuffer(data, dtype=dtype)
+    except (TypeError, ValueError):
+        return np.asarray(data, dtype=dtype)
+
+
+def _byte_order(dtype, is_bigendian: bool) -> np.dtype:
+    dtype = np.dtype(dtype)
+    return dtype.newbyteorder(">" if is_bigendian else "<")
+
+
+def parse_image_encoding(encoding: str):
+    """
+    :return: (dtype, channels) of a sensor_msgs/Image encoding
+    """
+    encoding = str(encoding).strip()
+    if encoding in _image_encodings:
+        return _image_encodings[encoding]
+    if encoding.startswith("bayer_"):
+        return np.uint16 if encoding.endswith("16") else np.uint8, 1
+    found = _cv_encoding.match(encoding.upper())
+    if found is None or (found.group(1), found.group(2)) not in _cv_depth:
+        raise ValueError(f"unsupported image encoding: {encoding}")
+    depth, kind, channels = found.groups()
+    return _cv_depth[(depth, kind)], int(channels)
+
+
+def image_to_numpy(msg) -> np.ndarray:
+    """
+    sensor_msgs/Image to an array of (height, width[, channels]),
+    row padding (`step`) is honored through strides.
+    """
+    dtype, channels = parse_image_encoding(msg.encoding)
+    dtype = _byte_order(dtype, getattr(msg, "is_bigendian", False))
+    height, width = int(msg.height), int(msg.width)
+    pixel = dtype.itemsize * channels
+    step = int(msg.step) or width * pixel
+    raw = _as_buffer(msg.data, np.uint8)
+    if height and raw.size < step * (height - 1) + width * pixel:
+        raise ValueError(f"image buffer of {raw.size} bytes is too small "
+                         f"for {height}x{width} {msg.encoding}")
+    shape, strides = (height, width), (step, pixel)
+    if channels > 1:
+        shape, strides = shape + (channels,), strides + (dtype.itemsize,)
+    return np.ndarray(shape=shape, dtype=dtype, buffer=raw,
+                      offset=0, strides=strides)
+
+
+def scan_to_numpy(msg) -> Dict[str, np.ndarray]:
+    """
+    sensor_msgs/LaserScan ranges and intensities as float32 arrays.
+    """
+    intensities = getattr(msg, "intensities", None)
+    return {
+        "ranges": _as_buffer(msg.ranges, np.float32),
+        "intensities": _as_buffer(
+            () if intensities is None else intensities, np.float32),
+    }
+
+
+def point_cloud_dtype(fields, point_step: int,
+                      is_bigendian: bool = False) -> np.dtype:
+    """
+    Structured dtype of the sensor_msgs/PointField layout.
+    """
+    names, formats, offsets = [], [], []
+    for field in sorted(fields, key=lambda f: f.offset):
+        dtype = _byte_order(_point_field_types[int(field.datatype)],
+                            is_bigendian)
+        count = int(getattr(field, "count", 1) or 1)
+        names.append(field.name)
+        formats.append(dtype if count == 1 else (dtype, (count,)))
+        offsets.append(int(field.offset))
+    return np.dtype({"names": names, "formats": formats,
+                     "offsets": offsets, "itemsize": int(point_step)})
+
+
+def point_cloud2_to_numpy(msg) -> np.ndarray:
+    """
+    sensor_msgs/PointCloud2 to a structured array of (height, width),
+    or (width, ) for unorganized clouds.
+    """
+    dtype = point_cloud_dtype(msg.fields, msg.point_step,
+                              getattr(msg, "is_bigendian", False))
+    height, width = int(msg.height), int(msg.width)
+    row_step = int(msg.row_step) or width * dtype.itemsize
+    raw = _as_buffer(msg.data, np.uint8)
+    cloud = np.ndarray(shape=(height, width), dtype=dtype, buffer=raw,
+                       offset=0, strides=(row_step, dtype.itemsize))
+    return cloud[0] if height == 1 else cloud
+
+
+def occupancy_grid_to_numpy(msg) -> np.ndarray:
+    """
+    nav_msgs/OccupancyGrid to an int8 array of (height, width),
+    -1 stands for unknown cells.
+    """
+    height, width = int(msg.info.height), int(msg.info.width)
+    return _as_buffer(msg.data, np.int8).reshape((height, width))
+
+
+_numpy_converters: Dict[str, Callable] = {
+    "sensor_msgs/Image": image_to_numpy,
+    "sensor_msgs/LaserScan": scan_to_numpy,
+    "sensor_msgs/PointCloud2": point_cloud2_to_numpy,
+    "nav_msgs/OccupancyGrid": occupancy_grid_to_numpy,
+}
+
+
+def numpify(msg) -> Optional[Any]:
+    """
+    Convert `msg` natively, None if its type is not supported here.
+    """
+    converter = _numpy_converters.get(get_message_type_name(msg))
+    if converter is None:
+        return None
+    return converter(msg)
@@ -0,0 +1,200 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+__all__ = ("PublisherStats", "PublisherPool")
+
+
+class PublisherStats:
+    """
+    Counters of one pooled publisher.
+    """
+
+    __slots__ = ("count", "bytes", "errors", "latency_total",
+                 "latency_max", "created", "last_used")
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.errors = 0
+        self.latency_total = 0.
+        self.latency_max = 0.
+        self.created = time.monotonic()
+        self.last_used = self.created
+
+    def update(self, latency: float, nbytes: int = 0):
+        self.count += 1
+        self.bytes += nbytes
+        self.latency_total += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+        self.last_used = time.monotonic()
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "bytes": self.bytes,
+            "errors": self.errors,
+            "latency_mean": (self.latency_total / self.count
+                             if self.count else 0.),
+            "latency_max": self.latency_max,
+            "idle": time.monotonic() - self.last_used,
+        }
+
+
+class _PoolEntry:
+    __slots__ = ("publisher", "stats", "lock", "closed")
+
+    def __init__(self, publisher):
+        self.publisher = publisher
+        self.stats = PublisherStats()
+        self.lock = threading.Lock()
+        # set under `lock` once the entry is evicted or released
+        self.closed = False
+
+
+class PublisherPool:
+    """
+    Publishers reused by topic, message type and options.
+
+    :param factory: `factory(name, data_class, queue_size, **options)`
+                    creates a publisher
+    :param idle_timeout: seconds without publishing before a publisher
+                         is evicted, 0 to keep publishers forever
+    :param closer: `closer(publisher)` releases an evicted publisher
+    :param sizeof: `sizeof(publisher, data)` returns the bytes sent
+    """
+
+    def __init__(self, factory: Callable,
+                 idle_timeout: float = 300.,
+                 closer: Callable = None,
+                 sizeof: Callable = None):
+        self.factory = factory
+        self.idle_timeout = float(idle_timeout)
+        self.closer = closer
+        self.sizeof = sizeof
+        self._entries: Dict[Tuple, _PoolEntry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(name: str, data_class: Any,
+                queue_size: int = 1, **options) -> Tuple:
+        type_name = getattr(data_class, "_type", None) or getattr(
+            data_class, "__qualname__", str(data_class))
+        return (name, type_name, queue_size,
+                tuple(sorted((k, repr(v)) for k, v in options.items())))
+
+    def _get_entry(self, name: str, data_class: Any,
+                   queue_size: int = 1, **options) -> _PoolEntry:
+        key = self.get_key(name, data_class, queue_size, **options)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _PoolEntry(self.factory(
+                    name, data_class, queue_size=queue_size, **options))
+                self._entries[key] = entry
+        return entry
+
+    def acquire(self, name: str, data_class: Any,
+                queue_size: int = 1, **options):
+        """
+        Publisher of the key, created if missing, e.g. to warm the pool
+        up before the first message.
+        """
+        return self._get_entry(
+            name, data_class, queue_size=queue_size, **options).publisher
+
+    def publish(self, name: str, data: Any, data_class: Any,
+                queue_size: int = 1, **options):
+        while True:
+            entry = self._get_entry(
+                name, data_class, queue_size=queue_size, **options)
+            with entry.lock:
+                if entry.closed:
+                    # evicted since it was looked up, a new one is created
+                    continue
+                start = time.perf_counter()
+                try:
+                    entry.publisher.publish(data)
+                except Exception:  # noqa
+                    entry.stats.errors += 1
+                    raise
+                latency = time.perf_counter() - start
+                nbytes = (self.sizeof(entry.publisher, data)
+                          if self.sizeof else 0)
+                entry.stats.update(latency, nbytes)
+                return
+
+    def evict_idle(self, idle_timeout: float = None) -> List[Tuple]:
+        """
+        Close the publishers idle for more than `idle_timeout` seconds.
+
+        :return: keys of the evicted publishers
+        """
+        timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        if timeout <= 0:
+            return []
+        deadline = time.monotonic() - timeout
+        with self._lock:
+            evicted = [key for key, entry in self._entries.items()
+                       if entry.stats.last_used < deadline]
+            entries = [self._entries.pop(key) for key in evicted]
+        for entry in entries:
+            self._close(entry)
+        return evicted
+
+    def release(self, *names: str):
+        """
+        Close the publishers of `names`, or all of them if empty.
+        """
+        with self._lock:
+            keys = [key for key in self._entries
+                    if not names or key[0] in names]
+            entries = [self._entries.pop(key) for key in keys]
+        for entry in entries:
+            self._close(entry)
+
+    def _close(self, entry: _PoolEntry):
+        # waits for a publish in progress, later ones see `closed`
+        with entry.lock:
+            entry.closed = True
+        if self.closer is None:
+            return
+        # noinspection PyBrodException
+        try:
+            self.closer(entry.publisher)
+        except Exception:  # noqa
+            pass
+
+    def stats(self) -> List[Dict]:
+        return [
+            dict(topic=key[0], msg_type=key[1], **entry.stats.to_dict())
+            for key, entry in list(self._entries.items())
+        ]
+
+    def __contains__(self, name: str) -> bool:
+        return any(key[0] == name for key in list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
@@ -14,8 +14,8 @@
 
 import base64
 from copy import deepcopy
-from datetime import datetime
 from functools import partial
+from operator import attrgetter
 from threading import Thread
 from typing import Any
 from typing import Callable
@@ -25,6 +25,7 @@ from typing import List
 from numpy import ndarray
 from robosdk.common.class_factory import ClassFactory
 from robosdk.common.class_factory import ClassType
+from robosdk.common.config import BaseConfig
 from robosdk.common.constant import BackendStats
 from robosdk.common.exceptions import SensorError
 from robosdk.common.schema.stream import StreamMgsCls
@@ -32,6 +33,10 @@ from robosdk.utils.lazy_imports import LazyImport
 from robosdk.utils.util import parse_kwargs
 
 from .base import BackendBase
+from .clock import RosClock
+from .graph import TopicGraph
+from .numpify import numpify
+from .publisher import PublisherPool
 
 
 @ClassFactory.register(ClassType.BACKEND, alias="ros1")
@@ -47,11 +52,20 @@ class Ros1Backend(BackendBase):  # noqa
                            'float32', 'float64', 'string']
     ros_header_types = ['Header', 'std_msgs/Header', 'roslib/Header']
 
+    # converters compiled per message class, see `data_transform`
+    _msg_converters: Dict = {}
+
     def __init__(self):
         super(Ros1Backend, self).__init__()
         self._sub = {}
-        self._pub = {}
+        self._pub = PublisherPool(
+            self._create_publisher,
+            idle_timeout=BaseConfig.PUBLISHER_IDLE_TIMEOUT,
+            closer=lambda pub: pub.unregister(),
+            sizeof=self._published_bytes
+        )
         self.client = LazyImport("rospy")
+        self.clock = RosClock(self.client)
         self.node_name: str = "ros1"
         self.subscriber_stats = None
         self.msg_handle = LazyImport("rostopic")
@@ -60,6 +74,10 @@ class Ros1Backend(BackendBase):  # noqa
         self.msg_sensor_generator = LazyImport("sensor_msgs.msg")
         self.msg_standard_generator = LazyImport("std_msgs.msg")
         self.msg_geometry_generator = LazyImport("geometry_msgs.msg")
+        self.topic_graph = TopicGraph(
+            self._fetch_topic_types, self.get_message_class,
+            interval=BaseConfig.TOPIC_GRAPH_INTERVAL
+        )
 
     def connect(self, name: str,
                 anonymous: bool = True,
@@ -87,20 +105,27 @@ class Ros1Backend(BackendBase):  # noqa
         self.subscriber_stats.publish(
             BackendStats.CONNECTING.value
         )
+        self.topic_graph.start()
         Thread(target=self._spin, daemon=True).start()
 
     def _spin(self):
         rate = self.client.Rate(10)
+        loops = 0
         while not self.client.is_shutdown():
             self.subscriber_stats.publish(
                 BackendStats.CONNECTED.value
             )
+            loops += 1
+            if loops % 10 == 0:
+                self._pub.evict_idle()
             rate.sleep()
 
     def close(self):
         # noinspection PyBrodException
         try:
+            self.topic_graph.stop()
             self.unsubscribe(*self._sub.keys())
+            self._pub.release()
             self.subscriber_stats.publish(
                 BackendStats.CLOSED.value
             )
@@ -110,21 +135,23 @@ class Ros1Backend(BackendBase):  # noqa
 
     @property
     def now(self):
-        return self.client.Time.from_sec(
-            datetime.now().utcnow().timestamp()
-        )
+        return self.client.Time(*divmod(self.clock.now_ns(), 1000000000))
 
-    def get_time(self):
-        return self.now.secs
+    def get_time(self) -> float:
+        return self.clock.now()
 
     def get_message_class(self, msg_type):
         return self.msg_lib.get_message_class(msg_type)
 
     def get_message_type(self, msg_topic, blocking=False):
-        msg_type, _, _ = self.msg_handle.get_topic_type(
-            msg_topic, blocking=blocking
-        )
-        return msg_type
+        return self.topic_graph.get_type(msg_topic, blocking=blocking)
+
+    def _fetch_topic_types(self) -> Dict[str, str]:
+        return {
+            name: msg_type
+            for name, msg_type in self.client.get_published_topics()
+            if name not in self.ros_system_topic
+        }
 
     def _msg_subscribe(self,
                        name: str,
@@ -142,15 +169,11 @@ class Ros1Backend(BackendBase):  # noqa
         return sub
 
     def get_data_cls(self, topic: str, data_class: Any = ""):
+        if isinstance(data_class, str) and data_class:
+            return self.topic_graph.get_class(data_class)
         if callable(data_class):
-            if isinstance(data_class, str):
-                data_class = self.get_message_class(data_class)
-        else:
-            msg_type = self.get_message_type(topic, blocking=True)
-            if msg_type is None:
-                return None
-            data_class = self.get_message_class(msg_type)
-        return data_class
+            return data_class
+        return self.topic_graph.get_topic_class(topic, blocking=True)
 
     def get(self, topic,
             callback: Callable = None,
@@ -177,6 +200,10 @@ class Ros1Backend(BackendBase):  # noqa
                   **kwargs):
         if not kwargs:
             kwargs = {}
+        if len(topics) > 1:
+            return self.subscribe_synchronized(
+                *topics, callback=callback, callback_args=callback_args,
+                **kwargs)
         queue_size = int(kwargs.get("queue_size", 1))
         all_msg = []
         d: Dict = deepcopy(dict(**kwargs))
@@ -186,15 +213,9 @@ class Ros1Backend(BackendBase):  # noqa
             d = parse_kwargs(self._msg_subscribe, **d)
             self._sub[name] = self._msg_subscribe(**d)
             all_msg.append(self._sub[name])
-        sub = None
-        if len(all_msg) == 1:
-            sub = all_msg[0]
-        elif len(all_msg) > 1:
-            slop = float(kwargs.get("slop", 0.2))
-            sub = self.msg_subscriber.ApproximateTimeSynchronizer(
-                all_msg, queue_size, slop)
-        if sub is None:
+        if not all_msg:
             raise SensorError(f"fail to subscribe {topics}")
+        sub = all_msg[0]
         if callable(callback) and hasattr(sub, "registerCallback"):
             if callback_args:
                 kwargs["callback_args"] = callback_args
@@ -202,20 +223,37 @@ class Ros1Backend(BackendBase):  # noqa
             sub.registerCallback(partial(callback, **d))
         return sub
 
+    def _create_publisher(self, name: str, data_class: Callable,
+                          queue_size: int = 1, **kwargs):
+        return self.client.Publisher(
+            name, data_class, queue_size=queue_size, **kwargs)
+
+    @staticmethod
+    def _published_bytes(publisher, data) -> int:
+        # rospy counts the serialized bytes in the shared topic impl
+        impl = getattr(publisher, "impl", None)
+        sent = getattr(impl, "message_data_sent", None)
+        if sent is None:
+            return 0
+        last = getattr(publisher, "_robosdk_data_sent", 0)
+        publisher._robosdk_data_sent = sent
+        return max(sent - last, 0)
+
+    def advertise(self, name: str,
+                  data_class: Callable,
+                  queue_size: int = 1, **kwargs):
+        return self._pub.acquire(
+            name, data_class, queue_size=queue_size, **kwargs)
+
     def publish(self, name: str,
                 data: Any,
                 data_class: Callable,
                 queue_size: int = 1, **kwargs):
-        if not kwargs:
-            kwargs = {}
-        key_id = hash(str(kwargs))
-        key_name = (name, key_id)
-        if name not in self._pub:
-            self._pub[key_name] = self.client.Publisher(
-                name,
-                data_class,
-                queue_size=queue_size, **kwargs)
-        self._pub[key_name].publish(data)
+        self._pub.publish(
+            name, data, data_class, queue_size=queue_size, **kwargs)
+
+    def publisher_stats(self) -> List[Dict]:
+        return self._pub.stats()
 
     def unsubscribe(self, *topics, filter_ids: List = None):
         for topic, sub in self._sub.items():
@@ -229,18 +267,7 @@ class Ros1Backend(BackendBase):  # noqa
             del self._sub[topic]
 
     def get_message_list(self) -> List[StreamMgsCls]:
-        pubs, _ = self.msg_handle.get_topic_list()
-
-        all_data = []
-        for msg, msg_type, publisher in pubs:
-            if msg in self.ros_system_topic:
-                continue
-            data = StreamMgsCls(
-                name=msg,
-                msg_type=self.get_message_class(msg_type)
-            )
-            all_data.append(data)
-        return all_data
+        return self.topic_graph.topics()
 
     @staticmethod
     def _get_message_fields(message):
@@ -259,14 +286,6 @@ class Ros1Backend(BackendBase):  # noqa
         }
         return field_value
 
-    @classmethod
-    def _convert_from_ros_array(cls, field_type, field_value,
-                                binary_array_as_bytes=True):
-        # use index to raise ValueError if '[' not present
-        list_type = field_type[:field_type.index('[')]
-        return [cls._convert_from_ros_type(
-            list_type, value, binary_array_as_bytes) for value in field_value]
-
     @staticmethod
     def _is_ros_binary_type(field_type):
         """ Checks if the field is a binary array one, fixed size or not"""
@@ -287,28 +306,100 @@ class Ros1Backend(BackendBase):  # noqa
             return list_type in cls.ros_primitive_types
 
     @classmethod
-    def _convert_from_ros_type(cls, field_type, field_value,
-                               binary_array_as_bytes=True):
+    def _compile_binary_converter(cls, binary_array_as_bytes=True):
+        if binary_array_as_bytes:
+            return cls._convert_from_ros_binary
+
+        def convert(field_value):
+            if isinstance(field_value, str):
+                return [ord(v) for v in field_value]
+            return list(field_value)
+        return convert
+
+    @classmethod
+    def _compile_array_converter(cls, field_type,
+                                 binary_array_as_bytes=True):
+        # use index to raise ValueError if '[' not present
+        list_type = field_type[:field_type.index('[')]
+        item_converter = cls._compile_field_converter(
+            list_type, binary_array_as_bytes)
+
+        def convert(field_value):
+            return [item_converter(value) for value in field_value]
+        return convert
+
+    @classmethod
+    def _compile_nested_converter(cls, binary_array_as_bytes=True):
+        """
+        The class of a nested message is only known once the first
+        value arrives, bind its converter then and keep it.
+        """
+        bound = None
+
+        def convert(field_value):
+            nonlocal bound
+            if bound is None:
+                bound = cls._get_message_converter(
+                    type(field_value), binary_array_as_bytes)
+            return bound(field_value)
+        return convert
+
+    @classmethod
+    def _compile_field_converter(cls, field_type,
+                                 binary_array_as_bytes=True) -> Callable:
         if field_type in cls.ros_primitive_types:
-            field_value = str(field_value)
+            return str
         elif field_type in cls.ros_time_types:
-            field_value = cls._convert_from_ros_time(field_value)
+            return cls._convert_from_ros_time
         elif cls._is_ros_binary_type(field_type):
-            if binary_array_as_bytes:
-                field_value = cls._convert_from_ros_binary(field_value)
-            elif type(field_value) == str:
-                field_value = [ord(v) for v in field_value]
-            else:
-                field_value = list(field_value)
+            return cls._compile_binary_converter(binary_array_as_bytes)
         elif cls._is_field_type_a_primitive_array(field_type):
-            field_value = list(field_value)
+            return list
         elif cls._is_field_type_an_array(field_type):
-            field_value = cls._convert_from_ros_array(
-                field_type, field_value, binary_array_as_bytes)
+            return cls._compile_array_converter(
+                field_type, binary_array_as_bytes)
+        return cls._compile_nested_converter(binary_array_as_bytes)
+
+    @classmethod
+    def _compile_message_converter(
+            cls, msg_cls, binary_array_as_bytes=False) -> Callable:
+        """
+        Resolve the conversion of every field of `msg_cls` once, the
+        returned function only fetches and converts the values.
+        """
+        fields = tuple(cls._get_message_fields(msg_cls))
+        names = tuple(name for name, _ in fields)
+        converters = tuple(
+            cls._compile_field_converter(field_type, binary_array_as_bytes)
+            for _, field_type in fields
+        )
+        if not names:
+            return lambda message: {}
+        if len(names) == 1:
+            getter = attrgetter(names[0])
+
+            def get_values(message):
+                return getter(message),
         else:
-            field_value = cls._convert_ros_message_to_dictionary(
-                field_value, binary_array_as_bytes)
-        return field_value
+            get_values = attrgetter(*names)
+
+        def convert(message) -> Dict:
+            return {
+                name: converter(value) for name, converter, value in
+                zip(names, converters, get_values(message))
+            }
+        return convert
+
+    @classmethod
+    def _get_message_converter(
+            cls, msg_cls, binary_array_as_bytes=False) -> Callable:
+        key = (msg_cls, binary_array_as_bytes)
+        converter = cls._msg_converters.get(key)
+        if converter is None:
+            converter = cls._compile_message_converter(
+                msg_cls, binary_array_as_bytes)
+            cls._msg_converters[key] = converter
+        return converter
 
     @classmethod
     def _convert_ros_message_to_dictionary(
@@ -316,17 +407,19 @@ class Ros1Backend(BackendBase):  # noqa
         """
         Takes in a ROS message and returns a Python dictionary.
         """
-
-        dictionary = {}
-        message_fields = cls._get_message_fields(message)
-        for field_name, field_type in message_fields:
-            field_value = getattr(message, field_name)
-            dictionary[field_name] = cls._convert_from_ros_type(
-                field_type, field_value, binary_array_as_bytes)
-        return dictionary
+        converter = cls._get_message_converter(
+            type(message), binary_array_as_bytes)
+        return converter(message)
 
     @staticmethod
     def _convert_ros_message_to_nparray(message) -> ndarray:
+        """
+        Image, LaserScan, PointCloud2 and OccupancyGrid are viewed over
+        the message buffer natively, others fall back to `ros_numpy`.
+        """
+        data = numpify(message)
+        if data is not None:
+            return data
         ros_numpy = LazyImport("ros_numpy")
 
         return ros_numpy.numpify(message)
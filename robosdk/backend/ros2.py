@@ -13,17 +13,30 @@
 # limitations under the License.
 
 import base64
-from datetime import datetime
+from functools import partial
+from operator import attrgetter
+from threading import Event
+from threading import Lock
 from threading import Thread
+from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import List
 
 from robosdk.common.class_factory import ClassFactory
 from robosdk.common.class_factory import ClassType
+from robosdk.common.config import BaseConfig
+from robosdk.common.exceptions import SensorError
 from robosdk.common.schema.stream import StreamMgsCls
 from robosdk.utils.lazy_imports import LazyImport
 
 from .base import BackendBase
+from .clock import Ros2Clock
+from .executor import CallbackGroupKind
+from .executor import CallbackStats
+from .graph import TopicGraph
+from .numpify import numpify
+from .publisher import PublisherPool
 
 
 @ClassFactory.register(ClassType.BACKEND, alias="ros2")
@@ -32,10 +45,15 @@ class Ros2Backend(BackendBase):  # noqa
     ROS2 backend.
     """
     ros_primitive_types = [
-        "bool", "byte", "char", "float32", "float64", "int8", "uint8",
-        "int16", "uint16", "int32", "uint32", "int64", "uint64", "string"
+        "bool", "boolean", "byte", "char", "octet", "float", "double",
+        "long double", "float32", "float64", "int8", "uint8", "int16",
+        "uint16", "int32", "uint32", "int64", "uint64", "string", "wstring"
     ]
-    ros_time_types = ["time", "duration"]
+    ros_binary_types = ["uint8", "char", "octet", "byte"]
+    ros_time_types = ["builtin_interfaces/Time", "builtin_interfaces/Duration"]
+
+    # converters compiled per message class, see `data_transform`
+    _msg_converters: Dict = {}
 
     def __init__(self):
 
@@ -44,10 +62,30 @@ class Ros2Backend(BackendBase):  # noqa
         self.msg_lib = LazyImport("rosidl_runtime_py.utilities")
 
         self._sub = {}
+        self._pub = PublisherPool(
+            self._create_publisher,
+            idle_timeout=BaseConfig.PUBLISHER_IDLE_TIMEOUT,
+            closer=lambda pub: self._node.destroy_publisher(pub)
+        )
         self._ctx = self.client.Context()
         self._exec = None
         self._node = None
+        self.node_name = "ros2"
+        self.executors = LazyImport("rclpy.executors")
+        self.callback_groups = LazyImport("rclpy.callback_groups")
+        # name -> {"group", "node", "stats"} of the callback groups
+        self._groups: Dict[str, Dict] = {}
+        self._group_lock = Lock()
+        self._isolated_exec: List = []
+        self._sub_nodes: Dict = {}
         super(Ros2Backend, self).__init__()
+        self.msg_subscriber = LazyImport("message_filters")
+        self.clock = Ros2Clock(lambda: self._node)
+        self.time_msgs = LazyImport("builtin_interfaces.msg")
+        self.topic_graph = TopicGraph(
+            self._fetch_topic_types, self.get_message_class,
+            interval=BaseConfig.TOPIC_GRAPH_INTERVAL
+        )
 
     def connect(self, name: str,
                 anonymous: bool = True,
@@ -63,79 +101,263 @@ class Ros2Backend(BackendBase):  # noqa
         except Exception:  # noqa
             pass
 
+        self.node_name = name
         self._node = self.client.create_node(name, context=self._ctx)
-        self._exec = self.client.executor.MultiThreadExecutor(
+        self._exec = self.executors.MultiThreadedExecutor(
+            num_threads=BaseConfig.ROS2_EXECUTOR_THREADS or None,
             context=self._ctx
         )
         self._exec.add_node(self._node)
+        # close the idle publishers every second, as the ROS1 spin does
+        self._node.create_timer(1., self._pub.evict_idle)
         self.has_connect = True
-        spinner = Thread(target=self._spin)
-        spinner.daemon = True
-        spinner.start()
+        self.topic_graph.start()
+        Thread(target=self._spin, args=(self._exec,), daemon=True).start()
 
-    def _spin(self):
-        while self._ctx and self._ctx.ok():
-            self._exec.spin_once(timeout_sec=1)
+    @staticmethod
+    def _spin(executor):
+        # noinspection PyBrodException
+        try:
+            executor.spin()
+        except Exception:  # noqa
+            # raised by rclpy when the context is shut down
+            pass
+
+    def _get_callback_group(self, name: str,
+                            kind: str = CallbackGroupKind.EXCLUSIVE,
+                            threads: int = 1) -> Dict:
+        """
+        Callback group `name`, created on first use. Isolated groups get
+        a node and an executor of `threads` threads of their own.
+        """
+        with self._group_lock:
+            entry = self._groups.get(name)
+            if entry is not None:
+                return entry
+            if kind not in CallbackGroupKind.all:
+                raise SensorError(f"unknown callback group kind {kind}, "
+                                  f"should be one of {CallbackGroupKind.all}")
+            node = self._node
+            if kind == CallbackGroupKind.REENTRANT or threads > 1:
+                group = self.callback_groups.ReentrantCallbackGroup()
+            else:
+                group = self.callback_groups.MutuallyExclusiveCallbackGroup()
+            if kind == CallbackGroupKind.ISOLATED:
+                node = self.client.create_node(
+                    f"{self.node_name}_isolated_{len(self._isolated_exec)}",
+                    context=self._ctx
+                )
+                if threads > 1:
+                    executor = self.executors.MultiThreadedExecutor(
+                        num_threads=threads, context=self._ctx)
+                else:
+                    executor = self.executors.SingleThreadedExecutor(
+                        context=self._ctx)
+                executor.add_node(node)
+                self._isolated_exec.append(executor)
+                Thread(target=self._spin, args=(executor,),
+                       daemon=True).start()
+            entry = {
+                "group": group, "node": node,
+                "stats": CallbackStats(kind=kind, clock=self.clock)
+            }
+            self._groups[name] = entry
+        return entry
+
+    def callback_stats(self) -> Dict[str, Dict]:
+        return {
+            name: entry["stats"].to_dict()
+            for name, entry in list(self._groups.items())
+        }
 
     def close(self):
 
         # noinspection PyBrodException
         try:
+            self.topic_graph.stop()
+            self._pub.release()
+            for executor in self._isolated_exec:
+                executor.shutdown()
             self._exec.shutdown()
             self._ctx.shutdown()
         except:  # noqa
             pass
 
+    @property
     def now(self):
-        """ convert datetime to ros time from timestamp """
-        now = datetime.now().utcnow().timestamp()
-        return self.client.Time(seconds=now).to_msg()
+        """ ros time as builtin_interfaces/Time """
+        sec, nanosec = divmod(self.clock.now_ns(), 1000000000)
+        return self.time_msgs.Time(sec=sec, nanosec=nanosec)
+
+    tf_message_type = "tf2_msgs/msg/TFMessage"
+
+    def _transform_subscribe_options(self, static: bool = False) -> Dict:
+        qos = LazyImport("rclpy.qos")
+        durability = (qos.DurabilityPolicy.TRANSIENT_LOCAL if static
+                      else qos.DurabilityPolicy.VOLATILE)
+        # static transforms are latched by their publishers
+        return {"qos_profile": qos.QoSProfile(depth=100,
+                                              durability=durability)}
 
     def get_message_class(self, msg_type):
         return self.msg_lib.get_message(msg_type)
 
-    def get_message_type(self, msg_topic):
-        msg_type, _, _ = self.msg_listen.get_topic_type(msg_topic)
-        return msg_type
+    def get_message_type(self, msg_topic, blocking=False):
+        return self.topic_graph.get_type(msg_topic, blocking=blocking)
 
-    def get_time(self) -> float:
-        return self._node.get_clock().now().tomsg().sec
+    def _fetch_topic_types(self) -> Dict[str, str]:
+        return {
+            name: types[0]
+            for name, types in self._node.get_topic_names_and_types()
+            if types
+        }
 
-    def get(self, topic, **kwargs):
+    def get_time(self) -> float:
+        return self.clock.now()
+
+    def get_data_cls(self, topic: str, data_class: Any = ""):
+        if isinstance(data_class, str) and data_class:
+            return self.topic_graph.get_class(data_class)
+        if callable(data_class):
+            return data_class
+        return self.topic_graph.get_topic_class(topic, blocking=True)
+
+    def get(self, topic,
+            callback: Callable = None,
+            callback_args: Dict = None,
+            **kwargs):
         """
-        Get a topic.
+        Get one message of a topic.
         """
-        msg_type = self.get_message_type(topic)
-        msg_cls = self.get_message_class(msg_type)
-        return self._node.create_subscription(
-            msg_cls, topic, self._sub[topic], **kwargs
-        )
+        received = []
+        done = Event()
 
-    def subscribe(self, name: str, **kwargs):
+        def _on_message(msg):
+            if not received:
+                received.append(msg)
+                done.set()
+
+        sub = self.subscribe(topic, callback=_on_message, **kwargs)
+        try:
+            if not done.wait(kwargs.get("timeout", None)):
+                raise SensorError(f"no message received from {topic}")
+        finally:
+            self.unsubscribe(sub)
+        if callback:
+            return callback(received[0], **(callback_args or {}))
+        return received[0]
+
+    def _msg_subscribe(self, name: str, data_class: Any = None,
+                       queue_size: int = 1, callback: Callable = None,
+                       group: Dict = None, **kwargs):
+        data_class = self.get_data_cls(topic=name, data_class=data_class)
+        if data_class is None:
+            raise SensorError(f"fail to define data class for {name}")
+        qos_profile = kwargs.get("qos_profile", queue_size)
+        node = group["node"] if group else self._node
+        callback_group = group["group"] if group else None
+        if callback is None:
+            sub = self.msg_subscriber.Subscriber(
+                node, data_class, name, qos_profile=qos_profile,
+                callback_group=callback_group)
+        else:
+            sub = node.create_subscription(
+                data_class, name, callback, qos_profile,
+                callback_group=callback_group)
+        self._sub_nodes[getattr(sub, "sub", sub)] = node
+        return sub
+
+    def subscribe(self,
+                  *topics,
+                  callback: Callable = None,
+                  callback_args: Dict = None,
+                  **kwargs):
         """
-        Subscribe a topic.
+        Subscribe topics, messages of several topics are synchronized
+        by `subscribe_synchronized`.
+
+        Callbacks run in the callback group `callback_group_name`
+        (default the topics) of kind `callback_group`, see
+        `CallbackGroupKind`, isolated groups are spun by
+        `executor_threads` threads.
         """
-        msg_type = self.get_message_type(name)
-        msg_cls = self.get_message_class(msg_type)
-        self._sub[name] = self.client.create_subscription(
-            msg_cls, name, self._sub[name], **kwargs
+        if not topics:
+            raise SensorError("fail to subscribe, no topic given")
+        if len(topics) > 1:
+            kwargs.setdefault("callback_group_name", ",".join(topics))
+            return self.subscribe_synchronized(
+                *topics, callback=callback, callback_args=callback_args,
+                **kwargs)
+        if callable(callback) and callback_args:
+            callback = partial(callback, **callback_args)
+        queue_size = int(kwargs.pop("queue_size", 1))
+        kind = kwargs.get("callback_group", CallbackGroupKind.EXCLUSIVE)
+        group_name = kwargs.get("callback_group_name", "") or (
+            kind if kind == CallbackGroupKind.REENTRANT else topics[0])
+        group = self._get_callback_group(
+            group_name, kind=kind,
+            threads=int(kwargs.get("executor_threads", 1)))
+        if callable(callback):
+            callback = group["stats"].wrap(callback)
+        sub = self._msg_subscribe(
+            topics[0], queue_size=queue_size, callback=callback,
+            data_class=kwargs.get("data_class", None),
+            qos_profile=kwargs.get("qos_profile", queue_size),
+            group=group
         )
+        self._sub[topics[0]] = sub
+        return sub
 
     def unsubscribe(self, *topics, filter_ids: List = None):
         """
-        Unsubscribe a topic.
+        Unsubscribe topics, given by names or subscriptions.
         """
         for topic in topics:
-            if topic in self._sub:
-                self._sub.pop(topic)
-
-    def publish(self, *args, **kwargs):
+            if isinstance(topic, str):
+                if filter_ids and topic not in filter_ids:
+                    continue
+                sub = self._sub.pop(topic, None)
+            else:
+                sub = topic
+                for name, item in list(self._sub.items()):
+                    if item is sub:
+                        self._sub.pop(name)
+            if sub is None:
+                continue
+            sub = getattr(sub, "sub", sub)
+            node = self._sub_nodes.pop(sub, self._node)
+            # noinspection PyBrodException
+            try:
+                node.destroy_subscription(sub)
+            except Exception:  # noqa
+                pass
+
+    def _create_publisher(self, name: str, data_class: Callable,
+                          queue_size: int = 1, **kwargs):
+        qos_profile = kwargs.pop("qos_profile", queue_size)
+        return self._node.create_publisher(
+            data_class, name, qos_profile, **kwargs)
+
+    def advertise(self, name: str,
+                  data_class: Callable,
+                  queue_size: int = 1, **kwargs):
+        return self._pub.acquire(
+            name, data_class, queue_size=queue_size, **kwargs)
+
+    def publish(self, name: str,
+                data,
+                data_class: Callable,
+                queue_size: int = 1, **kwargs):
         """Publish a ros2 topic."""
-        self._node.create_publisher(*args, **kwargs)
+        self._pub.publish(
+            name, data, data_class, queue_size=queue_size, **kwargs)
+
+    def publisher_stats(self) -> List[Dict]:
+        return self._pub.stats()
 
     def get_message_list(self) -> List[StreamMgsCls]:
         """ get all topic lists """
-        return self.msg_listen.get_topic_names_and_types()
+        return self.topic_graph.topics()
 
     @classmethod
     def data_transform(cls, msg, fmt: str = "raw"):
@@ -146,21 +368,6 @@ class Ros2Backend(BackendBase):  # noqa
         # todo: more formats should be supported
         return msg
 
-    @classmethod
-    def _convert_ros_message_to_dictionary(
-            cls, message, binary_array_as_bytes=False) -> Dict:
-        """
-        Takes in a ROS message and returns a Python dictionary.
-        """
-
-        dictionary = {}
-        message_fields = cls._get_message_fields(message)
-        for field_name, field_type in message_fields:
-            field_value = getattr(message, field_name)
-            dictionary[field_name] = cls._convert_from_ros_type(
-                field_type, field_value, binary_array_as_bytes)
-        return dictionary
-
     @classmethod
     def _convert_ros_array_to_list(cls, msg):
         """
@@ -173,6 +380,9 @@ class Ros2Backend(BackendBase):  # noqa
         """
         Convert ROS message to numpy array.
         """
+        data = numpify(msg)
+        if data is not None:
+            return data
         import numpy as np
         msg_dict = {}
         for field in msg.get_fields_and_field_types().keys():
@@ -197,33 +407,18 @@ class Ros2Backend(BackendBase):  # noqa
         return hasattr(msg, "data")
 
     @classmethod
-    def _convert_from_ros_type(cls, field_type, field_value,
-                               binary_array_as_bytes=True):
-        if field_type in cls.ros_primitive_types:
-            field_value = str(field_value)
-        elif field_type in cls.ros_time_types:
-            field_value = cls._convert_from_ros_time(field_value)
-        elif cls._is_ros_binary_type(field_type):
-            if binary_array_as_bytes:
-                field_value = cls._convert_from_ros_binary(field_value)
-            elif type(field_value) == str:
-                field_value = [ord(v) for v in field_value]
-            else:
-                field_value = list(field_value)
-        elif cls._is_field_type_a_primitive_array(field_type):
-            field_value = cls._convert_from_ros_array(
-                field_type, field_value, binary_array_as_bytes)
-        else:
-            field_value = cls._convert_ros_message_to_dictionary(
-                field_value, binary_array_as_bytes)
-        return field_value
+    def _get_message_fields(cls, message):
+        return message.get_fields_and_field_types().items()
 
     @classmethod
     def _convert_from_ros_time(cls, field_value):
         """
-        Convert ROS time to string.
+        Convert ROS time to the same layout as ROS1.
         """
-        return str(field_value)
+        return {
+            'secs': field_value.sec,
+            'nsecs': field_value.nanosec
+        }
 
     @classmethod
     def _convert_from_ros_binary(cls, field_value):
@@ -233,38 +428,146 @@ class Ros2Backend(BackendBase):  # noqa
         field_value = base64.b64encode(field_value).decode('utf-8')
         return field_value
 
+    @staticmethod
+    def _convert_from_ros_sequence(field_value):
+        """
+        Convert ROS sequence (list, array.array or numpy array) to list.
+        """
+        if hasattr(field_value, "tolist"):
+            return field_value.tolist()
+        return list(field_value)
+
+    @classmethod
+    def _get_array_item_type(cls, field_type):
+        """
+        Get the item type of `sequence<T>`, `sequence<T, N>` and `T[N]`,
+        None if the field type is not an array.
+        """
+        if field_type.startswith('sequence<') and field_type.endswith('>'):
+            return field_type[9:-1].split(',')[0].strip()
+        bracket_index = field_type.find('[')
+        if bracket_index > 0 and field_type.endswith(']'):
+            return field_type[:bracket_index]
+        return None
+
+    @classmethod
+    def _is_ros_primitive_type(cls, field_type):
+        """
+        Check if the field type is a primitive, bounded strings included.
+        """
+        return (field_type in cls.ros_primitive_types or
+                field_type.startswith(('string<', 'wstring<')))
+
     @classmethod
     def _is_ros_binary_type(cls, field_type):
         """
         Check if the field type is a ROS binary type.
         """
-        return field_type.startswith('uint8[') or field_type.startswith(
-            'char[')
+        return cls._get_array_item_type(field_type) in cls.ros_binary_types
 
     @classmethod
-    def _is_field_type_a_primitive_array(cls, field_type):
+    def _compile_binary_converter(cls, binary_array_as_bytes=True):
+        if binary_array_as_bytes:
+            def convert(field_value):
+                return cls._convert_from_ros_binary(bytes(field_value))
+            return convert
+
+        def convert(field_value):
+            if isinstance(field_value, str):
+                return [ord(v) for v in field_value]
+            return cls._convert_from_ros_sequence(field_value)
+        return convert
+
+    @classmethod
+    def _compile_array_converter(cls, field_type,
+                                 binary_array_as_bytes=True):
+        item_converter = cls._compile_field_converter(
+            cls._get_array_item_type(field_type), binary_array_as_bytes)
+
+        def convert(field_value):
+            return [item_converter(value) for value in field_value]
+        return convert
+
+    @classmethod
+    def _compile_nested_converter(cls, binary_array_as_bytes=True):
         """
-        Check if the field type is a primitive array.
+        The class of a nested message is only known once the first
+        value arrives, bind its converter then and keep it.
         """
-        return field_type.startswith('[') and field_type.endswith(']')
+        bound = None
+
+        def convert(field_value):
+            nonlocal bound
+            if bound is None:
+                bound = cls._get_message_converter(
+                    type(field_value), binary_array_as_bytes)
+            return bound(field_value)
+        return convert
+
+    @classmethod
+    def _compile_field_converter(cls, field_type,
+                                 binary_array_as_bytes=True) -> Callable:
+        item_type = cls._get_array_item_type(field_type)
+        if cls._is_ros_primitive_type(field_type):
+            return str
+        elif field_type in cls.ros_time_types:
+            return cls._convert_from_ros_time
+        elif cls._is_ros_binary_type(field_type):
+            return cls._compile_binary_converter(binary_array_as_bytes)
+        elif item_type is not None and cls._is_ros_primitive_type(item_type):
+            return cls._convert_from_ros_sequence
+        elif item_type is not None:
+            return cls._compile_array_converter(
+                field_type, binary_array_as_bytes)
+        return cls._compile_nested_converter(binary_array_as_bytes)
 
     @classmethod
-    def _convert_from_ros_array(cls, field_type, field_value,
-                                binary_array_as_bytes):
+    def _compile_message_converter(
+            cls, msg_cls, binary_array_as_bytes=False) -> Callable:
         """
-        Convert ROS array to list.
+        Resolve the conversion of every field of `msg_cls` once, the
+        returned function only fetches and converts the values.
         """
-        if field_type.startswith('['):
-            field_type = field_type[1:]
-        if field_type.endswith(']'):
-            field_type = field_type[:-1]
-        if cls._is_ros_binary_type(field_type):
-            if binary_array_as_bytes:
-                field_value = cls._convert_from_ros_binary(field_value)
-            elif type(field_value) == str:
-                field_value = [ord(v) for v in field_value]
-            else:
-                field_value = list(field_value)
+        fields = tuple(cls._get_message_fields(msg_cls))
+        names = tuple(name for name, _ in fields)
+        converters = tuple(
+            cls._compile_field_converter(field_type, binary_array_as_bytes)
+            for _, field_type in fields
+        )
+        if not names:
+            return lambda message: {}
+        if len(names) == 1:
+            getter = attrgetter(names[0])
+
+            def get_values(message):
+                return getter(message),
         else:
-            field_value = list(field_value)
-        return field_value
+            get_values = attrgetter(*names)
+
+        def convert(message) -> Dict:
+            return {
+                name: converter(value) for name, converter, value in
+                zip(names, converters, get_values(message))
+            }
+        return convert
+
+    @classmethod
+    def _get_message_converter(
+            cls, msg_cls, binary_array_as_bytes=False) -> Callable:
+        key = (msg_cls, binary_array_as_bytes)
+        converter = cls._msg_converters.get(key)
+        if converter is None:
+            converter = cls._compile_message_converter(
+                msg_cls, binary_array_as_bytes)
+            cls._msg_converters[key] = converter
+        return converter
+
+    @classmethod
+    def _convert_ros_message_to_dictionary(
+            cls, message, binary_array_as_bytes=False) -> Dict:
+        """
+        Takes in a ROS message and returns a Python dictionary.
+        """
+        converter = cls._get_message_converter(
+            type(message), binary_array_as_bytes)
+        return converter(message)
@@ -0,0 +1,145 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any
+from typing import List
+
+__all__ = ("MessageStream", )
+
+
+class MessageStream:
+    """
+    Async iterator over the messages of a topic, e.g. ::
+
+        async with backend.stream("/odom", maxlen=10) as it:
+            async for msg in it:
+                ...
+
+    Messages are buffered from the middleware threads and handed to the
+    event loop with one `call_soon_threadsafe` per batch.
+
+    :param backend: backend to subscribe from
+    :param topic: topic name
+    :param maxlen: size of the buffer
+    :param policy: what to drop when the buffer is full,
+                   `latest` keeps the newest messages,
+                   `oldest` rejects the incoming ones
+    """
+
+    policies = ("latest", "oldest")
+
+    def __init__(self, backend, topic: str, maxlen: int = 100,
+                 policy: str = "latest", **kwargs):
+        if policy not in self.policies:
+            raise ValueError(f"stream policy should be one of {self.policies}")
+        self.backend = backend
+        self.topic = topic
+        self.maxlen = max(1, int(maxlen))
+        self.policy = policy
+        self.dropped = 0
+        self.received = 0
+        self._kwargs = kwargs
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._ready = None
+        self._scheduled = False
+        self._closed = True
+        self._sub = None
+
+    def _on_message(self, msg):
+        with self._lock:
+            if self._closed:
+                return
+            self.received += 1
+            if len(self._buffer) >= self.maxlen:
+                self.dropped += 1
+                if self.policy == "oldest":
+                    return
+                self._buffer.popleft()
+            self._buffer.append(msg)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup)
+        except RuntimeError:  # event loop closed
+            pass
+
+    def _wakeup(self):
+        with self._lock:
+            self._scheduled = False
+        self._ready.set()
+
+    async def open(self):
+        # the running loop, get_running_loop needs python 3.7
+        self._loop = asyncio.get_event_loop()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._sub = self.backend.subscribe(
+            self.topic, callback=self._on_message, **self._kwargs)
+        return self
+
+    async def close(self):
+        with self._lock:
+            self._closed = True
+        if self._ready is not None:
+            self._ready.set()
+        sub, self._sub = self._sub, None
+        if sub is None:
+            return
+        if hasattr(sub, "unregister"):
+            sub.unregister()
+        else:
+            self.backend.unsubscribe(sub)
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        while True:
+            with self._lock:
+                if self._buffer:
+                    return self._buffer.popleft()
+                if self._closed:
+                    raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+
+    async def get_batch(self) -> List[Any]:
+        """
+        All buffered messages, waiting for at least one.
+        """
+        while True:
+            with self._lock:
+                if self._buffer:
+                    batch = list(self._buffer)
+                    self._buffer.clear()
+                    return batch
+                if self._closed:
+                    return []
+            self._ready.clear()
+            await self._ready.wait()
+
+    def __len__(self):
+        return len(self._buffer)
@@ -0,0 +1,224 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import threading
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+
+from .clock import Clock
+from .clock import stamp_to_nsec
+
+__all__ = ("TimeSynchronizer", )
+
+
+class _StampBuffer:
+    """
+    Ring buffer of (stamp ns, receive ns, message) ordered by stamp.
+    """
+
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self.stamps: List[int] = []
+        self.items: List = []
+
+    def __len__(self):
+        return len(self.stamps)
+
+    def add(self, stamp: int, item) -> int:
+        """ insert `item`, return the number of dropped entries """
+        inx = bisect.bisect_right(self.stamps, stamp)
+        self.stamps.insert(inx, stamp)
+        self.items.insert(inx, item)
+        dropped = len(self.stamps) - self.maxlen
+        if dropped > 0:
+            del self.stamps[:dropped]
+            del self.items[:dropped]
+        return max(dropped, 0)
+
+    def nearest(self, stamp: int) -> int:
+        """ index of the entry closest to `stamp`, -1 if empty """
+        if not self.stamps:
+            return -1
+        inx = bisect.bisect_left(self.stamps, stamp)
+        if inx == len(self.stamps):
+            return inx - 1
+        if inx and stamp - self.stamps[inx - 1] <= self.stamps[inx] - stamp:
+            return inx - 1
+        return inx
+
+    def drop_until(self, stamp: int, inclusive: bool = True) -> int:
+        """ remove the entries older than `stamp` """
+        if inclusive:
+            inx = bisect.bisect_right(self.stamps, stamp)
+        else:
+            inx = bisect.bisect_left(self.stamps, stamp)
+        del self.stamps[:inx]
+        del self.items[:inx]
+        return inx
+
+
+class TimeSynchronizer:
+    """
+    Synchronize the messages of N topics by header stamp, e.g. rgb and
+    depth images, several cameras or lidar scans with odometry.
+
+    Policies:
+        exact: emit messages with the same stamp
+        approximate: emit, on each arrival, the closest message of
+                     every topic if all are within `slop` seconds of the
+                     new one; matched and older messages are consumed
+        latest: emit the latest message of every topic whenever they
+                are all within `slop` seconds, nothing is consumed
+
+    The callback receives one message per topic, in the order of the
+    inputs. Messages older than `max_latency` seconds behind the newest
+    stamp are dropped. Messages without header are stamped on receipt.
+
+    :param topics: names of the inputs, or their count
+    :param queue_size: length of the ring buffer of every input
+    """
+
+    policies = ("exact", "approximate", "latest")
+
+    def __init__(self, topics, queue_size: int = 10, slop: float = .1,
+                 policy: str = "approximate", max_latency: float = None,
+                 clock: Clock = None):
+        if policy not in self.policies:
+            raise ValueError(
+                f"synchronize policy should be one of {self.policies}")
+        if isinstance(topics, int):
+            topics = [str(inx) for inx in range(topics)]
+        self.topics: List[str] = list(topics)
+        self.policy = policy
+        self.slop = int(float(slop) * 1e9)
+        self.max_latency = (None if max_latency is None
+                            else int(float(max_latency) * 1e9))
+        self.clock = clock or Clock()
+        self.subs: List = []
+        self.callbacks: List[Callable] = []
+        self._unsubscribe: Callable = None
+        self._buffers = [_StampBuffer(max(1, int(queue_size)))
+                         for _ in self.topics]
+        self._newest = 0
+        self._lock = threading.Lock()
+        self.received = [0] * len(self.topics)
+        self.dropped = 0
+        self.matched = 0
+        self.latency_total = 0.
+        self.latency_max = 0.
+        self.skew_total = 0.
+        self.skew_max = 0.
+
+    def registerCallback(self, callback: Callable, *args):  # noqa
+        """ same as `message_filters.Synchronizer.registerCallback` """
+        self.callbacks.append(
+            (lambda *msgs: callback(*msgs, *args)) if args else callback)
+
+    def input(self, index: int) -> Callable:
+        """ callback feeding the messages of the `index`-th topic """
+        def _add(msg):
+            self.add(index, msg)
+        return _add
+
+    def add(self, index: int, msg):
+        receive = Clock.monotonic_ns()
+        stamp = stamp_to_nsec(
+            getattr(getattr(msg, "header", None), "stamp", None))
+        if not stamp:
+            stamp = self.clock.now_ns()
+        with self._lock:
+            self.received[index] += 1
+            overflow = self._buffers[index].add(stamp, (receive, msg))
+            if self.policy != "latest":
+                # superseded messages are not lost under `latest`
+                self.dropped += overflow
+            if stamp > self._newest:
+                self._newest = stamp
+            if self.max_latency is not None:
+                deadline = self._newest - self.max_latency
+                for buffer in self._buffers:
+                    self.dropped += buffer.drop_until(
+                        deadline, inclusive=False)
+            matched = self._match(stamp)
+            if matched is not None:
+                self._update_stats(matched)
+        if matched is None:
+            return
+        msgs = [msg for _, (_, msg) in matched]
+        for callback in self.callbacks:
+            callback(*msgs)
+
+    def _match(self, stamp: int):
+        if not all(self._buffers):
+            return None
+        if self.policy == "latest":
+            found = [(b.stamps[-1], b.items[-1]) for b in self._buffers]
+            stamps = [s for s, _ in found]
+            if max(stamps) - min(stamps) > self.slop:
+                return None
+            return found
+        slop = 0 if self.policy == "exact" else self.slop
+        found = []
+        for buffer in self._buffers:
+            pos = buffer.nearest(stamp)
+            if abs(buffer.stamps[pos] - stamp) > slop:
+                return None
+            found.append((buffer.stamps[pos], buffer.items[pos]))
+        for buffer, (matched_stamp, _) in zip(self._buffers, found):
+            buffer.drop_until(matched_stamp)
+        return found
+
+    def _update_stats(self, matched: Sequence):
+        self.matched += 1
+        now = Clock.monotonic_ns()
+        latency = (now - min(receive for _, (receive, _) in matched)) * 1e-9
+        stamps = [stamp for stamp, _ in matched]
+        skew = (max(stamps) - min(stamps)) * 1e-9
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.skew_total += skew
+        self.skew_max = max(self.skew_max, skew)
+
+    def stats(self) -> Dict:
+        """
+        match_rate: share of the received messages emitted in a set
+        latency: seconds between the first receipt of a set and its
+                 emission
+        skew: seconds between the oldest and newest stamps of a set
+        """
+        received = sum(self.received)
+        matched = self.matched
+        return {
+            "policy": self.policy,
+            "received": dict(zip(self.topics, self.received)),
+            "matched": matched,
+            "dropped": self.dropped,
+            "match_rate": (min(1., matched * len(self.topics) / received)
+                           if received else 0.),
+            "latency_mean": self.latency_total / matched if matched else 0.,
+            "latency_max": self.latency_max,
+            "skew_mean": self.skew_total / matched if matched else 0.,
+            "skew_max": self.skew_max,
+        }
+
+    def unregister(self):
+        for sub in self.subs:
+            if hasattr(sub, "unregister"):
+                sub.unregister()
+            elif self._unsubscribe is not None:
+                self._unsubscribe(sub)
+        self.subs = []
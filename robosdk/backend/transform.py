@@ -0,0 +1,492 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Transform tree of the robot fed by `/tf` and `/tf_static`, shared by the
+sensors of a backend, see `BackendBase.transforms`.
+
+Every frame keeps the time-indexed history of its transform to its
+parent. Lookups walk the tree through the common ancestor of the two
+frames, interpolating every edge (linear translation, SLERP rotation).
+Quaternions are (x, y, z, w) as in ROS; all helpers accept batches.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from robosdk.common.exceptions import TransformError
+
+from .clock import Clock
+from .clock import stamp_to_nsec
+
+__all__ = ("TransformCache", "quaternion_multiply", "quaternion_conjugate",
+           "quaternion_rotate", "quaternion_slerp", "quaternion_matrix")
+
+_IDENTITY = (0., 0., 0., 0., 0., 0., 1.)
+# ns, float seconds of the epoch are precise to a quarter of microsecond
+_ROUNDING = 1000
+
+Stamp = Union[None, float, np.ndarray]
+Value = Tuple[float, float, float, float, float, float, float]
+
+
+def quaternion_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    ax, ay, az, aw = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bx, by, bz, bw = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    return np.stack((
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ), axis=-1)
+
+
+def quaternion_conjugate(q: np.ndarray) -> np.ndarray:
+    q = np.array(q, dtype=np.float64)
+    q[..., :3] *= -1.
+    return q
+
+
+def quaternion_rotate(q: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """ rotate the vectors `v` (..., 3) by `q` (..., 4) """
+    q = np.asarray(q, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    x, y, z, w = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    vx, vy, vz = v[..., 0], v[..., 1], v[..., 2]
+    # v + 2 * (w * (u x v) + u x (u x v)), u the vector part of q
+    uvx, uvy, uvz = y * vz - z * vy, z * vx - x * vz, x * vy - y * vx
+    return np.stack((
+        vx + 2. * (w * uvx + y * uvz - z * uvy),
+        vy + 2. * (w * uvy + z * uvx - x * uvz),
+        vz + 2. * (w * uvz + x * uvy - y * uvx),
+    ), axis=-1)
+
+
+def quaternion_slerp(q0: np.ndarray, q1: np.ndarray,
+                     alpha: Union[float, np.ndarray]) -> np.ndarray:
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.array(q1, dtype=np.float64)
+    alpha = np.asarray(alpha, dtype=np.float64)[..., None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    # shortest path
+    q1 = np.where(dot < 0, -q1, q1)
+    dot = np.clip(np.abs(dot), 0., 1.)
+    theta = np.arccos(dot)
+    sin = np.sin(theta)
+    near = sin < 1e-6
+    safe = np.where(near, 1., sin)
+    w0 = np.where(near, 1. - alpha, np.sin((1. - alpha) * theta) / safe)
+    w1 = np.where(near, alpha, np.sin(alpha * theta) / safe)
+    q = w0 * q0 + w1 * q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def quaternion_matrix(q: np.ndarray) -> np.ndarray:
+    """ homogeneous (4, 4) rotation matrices of `q` """
+    x, y, z, w = np.moveaxis(np.asarray(q, dtype=np.float64), -1, 0)
+    matrix = np.zeros(np.shape(x) + (4, 4))
+    matrix[..., 0, 0] = 1. - 2. * (y * y + z * z)
+    matrix[..., 0, 1] = 2. * (x * y - z * w)
+    matrix[..., 0, 2] = 2. * (x * z + y * w)
+    matrix[..., 1, 0] = 2. * (x * y + z * w)
+    matrix[..., 1, 1] = 1. - 2. * (x * x + z * z)
+    matrix[..., 1, 2] = 2. * (y * z - x * w)
+    matrix[..., 2, 0] = 2. * (x * z - y * w)
+    matrix[..., 2, 1] = 2. * (y * z + x * w)
+    matrix[..., 2, 2] = 1. - 2. * (x * x + y * y)
+    matrix[..., 3, 3] = 1.
+    return matrix
+
+
+def _compose(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ transform `a` applied after `b`, as (..., 7) translation + quat """
+    out = np.empty(np.broadcast(a, b).shape)
+    out[..., :3] = a[..., :3] + quaternion_rotate(a[..., 3:], b[..., :3])
+    out[..., 3:] = quaternion_multiply(a[..., 3:], b[..., 3:])
+    return out
+
+
+def _inverse(a: np.ndarray) -> np.ndarray:
+    out = np.empty(a.shape)
+    out[..., 3:] = quaternion_conjugate(a[..., 3:])
+    out[..., :3] = -quaternion_rotate(out[..., 3:], a[..., :3])
+    return out
+
+
+# scalar versions of the above, much faster than numpy for one transform
+
+def _rotate(x, y, z, w, vx, vy, vz) -> Tuple[float, float, float]:
+    uvx, uvy, uvz = y * vz - z * vy, z * vx - x * vz, x * vy - y * vx
+    return (vx + 2. * (w * uvx + y * uvz - z * uvy),
+            vy + 2. * (w * uvy + z * uvx - x * uvz),
+            vz + 2. * (w * uvz + x * uvy - y * uvx))
+
+
+def _compose_one(a: Value, b: Value) -> Value:
+    ax, ay, az, qx, qy, qz, qw = a
+    bx, by, bz, px, py, pz, pw = b
+    tx, ty, tz = _rotate(qx, qy, qz, qw, bx, by, bz)
+    return (ax + tx, ay + ty, az + tz,
+            qw * px + qx * pw + qy * pz - qz * py,
+            qw * py - qx * pz + qy * pw + qz * px,
+            qw * pz + qx * py - qy * px + qz * pw,
+            qw * pw - qx * px - qy * py - qz * pz)
+
+
+def _inverse_one(a: Value) -> Value:
+    x, y, z, qx, qy, qz, qw = a
+    tx, ty, tz = _rotate(-qx, -qy, -qz, qw, x, y, z)
+    return -tx, -ty, -tz, -qx, -qy, -qz, qw
+
+
+def _interpolate_one(a: Value, b: Value, alpha: float) -> Value:
+    q0, q1 = a[3:], b[3:]
+    dot = sum(u * v for u, v in zip(q0, q1))
+    if dot < 0:
+        q1, dot = tuple(-v for v in q1), -dot
+    theta = math.acos(min(dot, 1.))
+    sin = math.sin(theta)
+    if sin < 1e-6:
+        w0, w1 = 1. - alpha, alpha
+    else:
+        w0 = math.sin((1. - alpha) * theta) / sin
+        w1 = math.sin(alpha * theta) / sin
+    q = [w0 * u + w1 * v for u, v in zip(q0, q1)]
+    norm = math.sqrt(sum(v * v for v in q))
+    return tuple(u + alpha * (v - u) for u, v in zip(a[:3], b[:3])) + tuple(
+        v / norm for v in q)
+
+
+def _frame(name) -> str:
+    return str(name or "").lstrip("/")
+
+
+class _EdgeHistory:
+    """
+    Transforms of `child` in `parent` ordered by stamp (ns), the ones
+    older than `cache_time` behind the newest are dropped.
+    """
+
+    def __init__(self, parent: str, child: str, static: bool = False,
+                 cache_time: float = 10.):
+        self.parent = parent
+        self.child = child
+        self.static = static
+        self.cache_time = int(cache_time * 1e9)
+        self.stamps: List[int] = []
+        self.values: List[Value] = []
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def add(self, stamp: int, value: Value):
+        if self.static:
+            self.stamps, self.values = [stamp], [value]
+        else:
+            inx = bisect.bisect_left(self.stamps, stamp)
+            if inx < len(self.stamps) and self.stamps[inx] == stamp:
+                self.values[inx] = value
+            else:
+                self.stamps.insert(inx, stamp)
+                self.values.insert(inx, value)
+            drop = bisect.bisect_left(
+                self.stamps, self.stamps[-1] - self.cache_time)
+            if drop:
+                del self.stamps[:drop]
+                del self.values[:drop]
+        self._arrays = None
+
+    @property
+    def newest(self) -> int:
+        return self.stamps[-1]
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays
+        if arrays is None:
+            arrays = (np.asarray(self.stamps, dtype=np.int64),
+                      np.asarray(self.values, dtype=np.float64))
+            self._arrays = arrays
+        return arrays
+
+    def _check(self, low: int, high: int, tolerance: int):
+        if (low < self.stamps[0] - tolerance or
+                high > self.stamps[-1] + tolerance):
+            raise TransformError(
+                f"lookup of {self.child} in {self.parent} requires "
+                f"extrapolation, history covers "
+                f"[{self.stamps[0] * 1e-9:.3f}, "
+                f"{self.stamps[-1] * 1e-9:.3f}]")
+
+    def at_one(self, stamp: int, tolerance: int = 0) -> Value:
+        """ transform interpolated at `stamp` """
+        if self.static:
+            return self.values[0]
+        self._check(stamp, stamp, tolerance)
+        stamps = self.stamps
+        right = min(max(bisect.bisect_right(stamps, stamp), 1),
+                    len(stamps) - 1)
+        if not right:
+            return self.values[0]
+        left = right - 1
+        alpha = (stamp - stamps[left]) / (stamps[right] - stamps[left])
+        return _interpolate_one(self.values[left], self.values[right],
+                                min(max(alpha, 0.), 1.))
+
+    def at(self, stamps: np.ndarray, tolerance: int = 0) -> np.ndarray:
+        """ (len(stamps), 7) transforms interpolated at `stamps` """
+        if self.static:
+            return np.broadcast_to(self.values[0], stamps.shape + (7, ))
+        self._check(int(stamps.min()), int(stamps.max()), tolerance)
+        times, values = self.arrays()
+        if len(times) == 1:
+            return np.broadcast_to(values[0], stamps.shape + (7, ))
+        right = np.clip(np.searchsorted(times, stamps, side="right"),
+                        1, len(times) - 1)
+        left = right - 1
+        span = (times[right] - times[left]).astype(np.float64)
+        alpha = np.clip((stamps - times[left]) / span, 0., 1.)
+        v0, v1 = values[left], values[right]
+        out = np.empty(stamps.shape + (7, ))
+        out[..., :3] = v0[..., :3] + alpha[..., None] * (
+            v1[..., :3] - v0[..., :3])
+        out[..., 3:] = quaternion_slerp(v0[..., 3:], v1[..., 3:], alpha)
+        return out
+
+
+class TransformCache:
+    """
+    Time-indexed transform tree, e.g. ::
+
+        translation, rotation = backend.transforms.lookup("map", "laser")
+        points = backend.transforms.transform_points(xy, "map", "laser", t)
+
+    `t` is the robot time in seconds, None for the latest time all
+    the transforms of the chain are known at.
+
+    :param cache_time: seconds of history kept per frame
+    :param tolerance: seconds a lookup may extrapolate beyond the
+                      history, the nearest transform is used
+    """
+
+    def __init__(self, cache_time: float = 10., tolerance: float = 0.,
+                 clock: Clock = None):
+        self.cache_time = float(cache_time)
+        self.tolerance = int(float(tolerance) * 1e9) + _ROUNDING
+        self.clock = clock or Clock()
+        self._edges: Dict[str, _EdgeHistory] = {}
+        self._cond = threading.Condition(threading.RLock())
+        self.subs: List = []
+        self.lookups = 0
+        self.failures = 0
+        # (target, source, stamp) -> (version of the tree, transform)
+        self._memo: Dict[Tuple, Tuple[int, np.ndarray]] = {}
+        self._version = 0
+
+    def set_transform(self, parent: str, child: str, stamp: float,
+                      translation, rotation, static: bool = False):
+        """ transform of `child` in `parent` at `stamp` seconds """
+        value = tuple(float(v) for v in translation) + tuple(
+            float(v) for v in rotation)
+        self._set(_frame(parent), _frame(child),
+                  int(round(float(stamp) * 1e9)), value, static)
+
+    def _set(self, parent: str, child: str, stamp: int,
+             value: Value, static: bool):
+        with self._cond:
+            self._version += 1
+            edge = self._edges.get(child)
+            if (edge is None or edge.parent != parent or
+                    edge.static != static):
+                edge = _EdgeHistory(parent, child, static=static,
+                                    cache_time=self.cache_time)
+                self._edges[child] = edge
+            edge.add(stamp, value)
+            self._cond.notify_all()
+
+    def add_message(self, msg, static: bool = False):
+        """ add a tf2_msgs/TFMessage or geometry_msgs/TransformStamped """
+        transforms = getattr(msg, "transforms", None)
+        if transforms is None:
+            transforms = [msg] if hasattr(msg, "transform") else []
+        for trans in transforms:
+            t, r = trans.transform.translation, trans.transform.rotation
+            stamp = stamp_to_nsec(trans.header.stamp)
+            if stamp is None:
+                stamp = self.clock.now_ns()
+            self._set(_frame(trans.header.frame_id),
+                      _frame(trans.child_frame_id), stamp,
+                      (float(t.x), float(t.y), float(t.z), float(r.x),
+                       float(r.y), float(r.z), float(r.w)), static)
+
+    def add_static_message(self, msg):
+        self.add_message(msg, static=True)
+
+    def frames(self) -> Dict[str, str]:
+        """ child -> parent of the tree """
+        with self._cond:
+            return {child: e.parent for child, e in self._edges.items()}
+
+    def _chain(self, frame: str) -> List[_EdgeHistory]:
+        chain = []
+        while frame in self._edges and len(chain) < 100:
+            edge = self._edges[frame]
+            chain.append(edge)
+            frame = edge.parent
+        return chain
+
+    def _paths(self, target: str, source: str):
+        source_chain = self._chain(source)
+        target_chain = self._chain(target)
+        target_frames = [target] + [e.parent for e in target_chain]
+        source_frames = [source] + [e.parent for e in source_chain]
+        for inx, frame in enumerate(source_frames):
+            if frame in target_frames:
+                return (source_chain[:inx],
+                        target_chain[:target_frames.index(frame)])
+        raise TransformError(f"{source} and {target} are not connected")
+
+    def _lookup(self, target: str, source: str,
+                t: Stamp) -> np.ndarray:
+        target, source = _frame(target), _frame(source)
+        latest = t is None or np.ndim(t) == 0 and not t
+        if not latest and np.ndim(t):
+            return self._lookup_many(target, source, t)
+        key = (target, source, None if latest else float(t))
+        with self._cond:
+            memo = self._memo.get(key)
+            if memo is not None and memo[0] == self._version:
+                return memo[1]
+            source_path, target_path = self._paths(target, source)
+            edges = source_path + target_path
+            if latest:
+                dynamic = [e.newest for e in edges if not e.static]
+                stamp = min(dynamic) if dynamic else 0
+            else:
+                stamp = int(round(float(t) * 1e9))
+            values = [e.at_one(stamp, self.tolerance) for e in edges]
+            version = self._version
+        source_in_root = target_in_root = _IDENTITY
+        for value in values[:len(source_path)]:
+            source_in_root = _compose_one(value, source_in_root)
+        for value in values[len(source_path):]:
+            target_in_root = _compose_one(value, target_in_root)
+        result = np.array(_compose_one(_inverse_one(target_in_root),
+                                       source_in_root))
+        result.flags.writeable = False
+        with self._cond:
+            if len(self._memo) > 256:
+                self._memo.clear()
+            self._memo[key] = (version, result)
+        return result
+
+    def _lookup_many(self, target: str, source: str,
+                     t: np.ndarray) -> np.ndarray:
+        stamps = np.round(np.asarray(t, dtype=np.float64) * 1e9).astype(
+            np.int64)
+        with self._cond:
+            source_path, target_path = self._paths(target, source)
+            values = [e.at(stamps, self.tolerance)
+                      for e in source_path + target_path]
+        identity = np.array(_IDENTITY)
+        source_in_root = target_in_root = identity
+        for value in values[:len(source_path)]:
+            source_in_root = _compose(value, source_in_root)
+        for value in values[len(source_path):]:
+            target_in_root = _compose(value, target_in_root)
+        result = _compose(_inverse(target_in_root), source_in_root)
+        return np.broadcast_to(result, stamps.shape + (7, ))
+
+    def lookup_raw(self, target: str, source: str,
+                   t: Stamp = None) -> np.ndarray:
+        """ (..., 7) translation + rotation of `source` in `target` """
+        self.lookups += 1
+        try:
+            value = self._lookup(target, source, t)
+        except TransformError:
+            self.failures += 1
+            raise
+        return value
+
+    def lookup(self, target: str, source: str, t: Stamp = None,
+               timeout: float = 0.) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Translation and rotation (x, y, z, w) of frame `source` in frame
+        `target` at time `t`, i.e. mapping points of `source` into
+        `target`, waiting up to `timeout` seconds for the transform.
+        """
+        if timeout > 0:
+            self.wait_for_transform(target, source, t, timeout)
+        value = self.lookup_raw(target, source, t)
+        return value[..., :3], value[..., 3:]
+
+    def lookup_matrix(self, target: str, source: str,
+                      t: Stamp = None) -> np.ndarray:
+        """ homogeneous (4, 4) matrix of `lookup` """
+        value = self.lookup_raw(target, source, t)
+        matrix = quaternion_matrix(value[..., 3:])
+        matrix[..., :3, 3] = value[..., :3]
+        return matrix
+
+    def latest_stamp(self, target: str, source: str) -> Optional[float]:
+        """ seconds of the latest lookup, None if all static """
+        with self._cond:
+            source_path, target_path = self._paths(
+                _frame(target), _frame(source))
+            dynamic = [e.newest for e in source_path + target_path
+                       if not e.static]
+        return min(dynamic) * 1e-9 if dynamic else None
+
+    def can_transform(self, target: str, source: str,
+                      t: Stamp = None) -> bool:
+        try:
+            self._lookup(target, source, t)
+        except TransformError:
+            return False
+        return True
+
+    def wait_for_transform(self, target: str, source: str,
+                           t: Stamp = None, timeout: float = 1.) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self.can_transform(target, source, t):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def transform_points(self, points: np.ndarray, target: str,
+                         source: str, t: Stamp = None) -> np.ndarray:
+        """
+        Points (N, 2 or 3) of frame `source` in frame `target`, `t`
+        is a time or one time per point, e.g. of the beams of a scan.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        xyz = np.zeros(points.shape[:-1] + (3, ))
+        xyz[..., :min(3, points.shape[-1])] = points[..., :3]
+        value = self.lookup_raw(target, source, t)
+        return value[..., :3] + quaternion_rotate(value[..., 3:], xyz)
+
+    def close(self, backend=None):
+        subs, self.subs = self.subs, []
+        if backend is not None and subs:
+            backend.unsubscribe(*subs)
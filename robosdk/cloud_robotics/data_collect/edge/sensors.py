@@ -47,6 +47,9 @@ class _ThreadDataCollect(threading.Thread):
         super(_ThreadDataCollect, self).__init__()
         self._all_msg: List[StreamMgsCls] = []
         self._all_queue: Dict[str, BaseQueue] = {}
+        self._all_sub: Dict = {}
+        self._has_data = threading.Event()
+        self._stop_event = threading.Event()
         self.robot_backend: BackendBase = (robot_backend or
                                            ClassFactory.get_cls(
                                                ClassType.BACKEND, "ros1")())
@@ -57,37 +60,71 @@ class _ThreadDataCollect(threading.Thread):
             return
         if not self.robot_backend.has_connect:
             self.robot_backend.connect(name="anonymous")
-        while 1:
-            self.get_all_data()
-
-            for data in self._all_msg:
-                queue = self._all_queue.get(data.name, None)
-
-                if not isinstance(queue, BaseQueue):
-                    continue
-                msg = queue.get()
-                if msg is None:
-                    continue
-                _data = self.robot_backend.data_transform(
-                    msg, fmt=self.transform_fmt)
-                self.push({"name": data.name, "data": _data})
+        graph = self.robot_backend.topic_graph
+        if graph is not None:
+            # topics are followed through the events of the graph cache
+            graph.on("added", self.add_stream)
+            graph.on("removed", self.remove_stream)
+        self.get_all_data()
+        while not self._stop_event.is_set():
+            if not self._has_data.wait(timeout=1.):
+                if graph is None:
+                    self.get_all_data()
+                continue
+            self._has_data.clear()
+            pending = True
+            while pending:
+                pending = False
+                for name, queue in list(self._all_queue.items()):
+                    msg = queue.get()
+                    if msg is None:
+                        continue
+                    pending = True
+                    _data = self.robot_backend.data_transform(
+                        msg, fmt=self.transform_fmt)
+                    self.push({"name": name, "data": _data})
+        if graph is not None:
+            graph.remove_listener("added", self.add_stream)
+            graph.remove_listener("removed", self.remove_stream)
 
     def get_all_data(self):
         self._all_msg: List = self.robot_backend.get_message_list()
         for msg in self._all_msg:
-            if msg.name in self._all_queue:
-                continue
-            self._all_queue[msg.name] = BaseQueue(keep_when_full=False)
+            self.add_stream(msg)
+
+    def add_stream(self, msg: StreamMgsCls):
+        if msg.name in self._all_queue:
+            return
+        self._all_queue[msg.name] = BaseQueue(keep_when_full=False)
+        if self.robot_backend.msg_subscriber is not None:
             sub = self.robot_backend.msg_subscriber.Subscriber(
                 msg.name, msg.msg_type
             )
             sub.registerCallback(self._put_data, msg.name)
+        else:
+            sub = self.robot_backend.subscribe(
+                msg.name, data_class=msg.msg_type,
+                callback=self._put_data, callback_args={"name": msg.name}
+            )
+        self._all_sub[msg.name] = sub
+
+    def remove_stream(self, msg: StreamMgsCls):
+        sub = self._all_sub.pop(msg.name, None)
+        if hasattr(sub, "unregister"):
+            sub.unregister()
+        self._all_queue.pop(msg.name, None)
 
     def _put_data(self, data, name):
-        self._all_queue[name].put(data)
+        queue = self._all_queue.get(name)
+        if queue is None:
+            return
+        queue.put(data)
+        self._has_data.set()
 
     def close(self):
-        self.join(timeout=20)
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=20)
 
 
 @ClassFactory.register(ClassType.CLOUD_ROBOTICS, "data_collect_rt_client")
@@ -34,18 +34,27 @@ class CapturePhoto(SkillBase):  # noqa
         super(CapturePhoto, self).__init__(name="CapturePhoto", robot=robot)
         self._eval_func = ImagQualityEval(logger=self.logger)
 
+    def _buffered_candidates(self, candidate: int):
+        """ the latest frames of the camera buffer, no waiting """
+        try:
+            frames = self.robot.camera.get_frames(last=candidate)
+        except NotImplementedError:
+            return []
+        return [frame for frame, _ in frames if frame is not None]
+
     def call(self,
              output: str,
              candidate: int = 10,
              eval_method: str = "entropy"):
 
-        candidates = []
-        for _ in range(candidate):
-            rgb, timer = self.robot.camera.get_rgb()
-            if rgb is None:
-                continue
-            candidates.append(rgb)
-            time.sleep(self._cap_time_hold)
+        candidates = self._buffered_candidates(candidate)
+        if not candidates:
+            for _ in range(candidate):
+                rgb, timer = self.robot.camera.get_rgb()
+                if rgb is None:
+                    continue
+                candidates.append(rgb)
+                time.sleep(self._cap_time_hold)
         img_selected = self._eval_func.evaluation(
             candidates, eval_alg=eval_method)
         save_name = os.path.basename(output)
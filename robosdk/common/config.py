@@ -200,13 +200,14 @@ class UserConfig(threading.Thread):
         self._period = int(check_period)
         self.__data__ = self.load(self.cfg_path)
         self._task_id = ""
-        super(UserConfig, self).__init__()
+        # polls for ever, must not keep the interpreter (or the workers
+        # of process pools importing the sdk) from exiting
+        super(UserConfig, self).__init__(daemon=True)
 
     def run(self):
         while 1:
-            if not (self.cfg_path and os.path.isfile(self.cfg_path)):
-                continue
-            self.__data__ = self.load(self.cfg_path)
+            if self.cfg_path and os.path.isfile(self.cfg_path):
+                self.__data__ = self.load(self.cfg_path)
             time.sleep(self._period)
 
     @staticmethod
@@ -255,6 +256,17 @@ class BaseConfig:
             'ROS_MASTER_URI', "http://localhost:11311"
         )
         ROBOT_ID = Context.get('ROBOT_ID', "")
+        # overrides `environment.backend` of the robot config, e.g. memory
+        ROBO_BACKEND = Context.get('ROBO_BACKEND', "")
+        # seconds before an unused publisher of the backend is released
+        PUBLISHER_IDLE_TIMEOUT = float(Context.get(
+            'PUBLISHER_IDLE_TIMEOUT', "300"))
+        # threads of the ros2 executor, 0 for one per cpu
+        ROS2_EXECUTOR_THREADS = int(Context.get(
+            'ROS2_EXECUTOR_THREADS', "0"))
+        # seconds between two refreshes of the topic graph of the backend
+        TOPIC_GRAPH_INTERVAL = float(Context.get(
+            'TOPIC_GRAPH_INTERVAL', "2"))
         MAP_SAVE_URL = Context.get('MAP_SAVE_URL', "")
 
         MAC_TYPE = get_machine_type()
@@ -44,3 +44,8 @@ class CloudError(Exception):
 
     def __str__(self):
         return self.message
+
+
+class TransformError(SensorError):
+    """Transform between two frames unknown at the requested time"""
+    pass
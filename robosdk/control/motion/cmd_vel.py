@@ -30,6 +30,10 @@ class CmdVelMotion(MotionControl):  # noqa
     def connect(self):
         if self.has_connect:
             return
+        self.backend.advertise(
+            self.config.data.target,
+            self.backend.msg_geometry_generator.Twist
+        )
         self.has_connect = True
 
     def set_vel(self, linear: float = 0., rotational: float = 0.):
@@ -13,8 +13,10 @@
 # limitations under the License.
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
 from typing import Any
+from typing import Dict
 from typing import List
 
 from robosdk.backend import BackendBase
@@ -25,11 +27,14 @@ from robosdk.common.config import BaseConfig
 from robosdk.common.config import Config
 from robosdk.common.constant import RoboControlMode
 from robosdk.common.exceptions import SensorError
+from robosdk.sensors.base import SensorBase
 from robosdk.sensors.base import SensorManage
+from robosdk.utils.cache import ReadOnlyDict
 from robosdk.utils.util import MethodSuppress
 from robosdk.utils.util import cancel_on_exception
 
 from .base import RoboBase
+from .snapshot import SensorSnapshot
 
 __all__ = ("Robot", )
 
@@ -66,7 +71,7 @@ class Robot(RoboBase):
             if hasattr(self.config, "environment"):
                 self.backend: BackendBase = ClassFactory.get_cls(
                     ClassType.BACKEND,
-                    self.config.environment.backend
+                    BaseConfig.ROBO_BACKEND or self.config.environment.backend
                 )()
             else:
                 self.backend = None
@@ -75,6 +80,8 @@ class Robot(RoboBase):
             self.backend = BaseConfig.BACKEND
         self._mode: RoboControlMode = RoboControlMode.Lock
         self.use_control = (use_control and "control" in self.config)
+        # captures of `snapshot`, started on first use
+        self._capture_pool: ThreadPoolExecutor = None
 
     @property
     def control_mode(self):
@@ -111,6 +118,9 @@ class Robot(RoboBase):
         self._mode = RoboControlMode.Auto
 
     def close(self):
+        if self._capture_pool is not None:
+            self._capture_pool.shutdown(wait=False)
+            self._capture_pool = None
         if self.backend:
             self.backend.close()
         map(lambda s: s.clear(), self.all_sensors.values())
@@ -148,6 +158,8 @@ class Robot(RoboBase):
             sensor_cfg = Config(_cfg)
             sensor_cfg.update_obj(cfg)
             name = sensor_cfg["name"] or f"{sensor}{inx}"
+            if self.backend:
+                self.backend.register_sensor(sensor, sensor_cfg)
             # noinspection PyBrodException
             try:
                 driver_cls = ClassFactory.get_cls(
@@ -176,6 +188,140 @@ class Robot(RoboBase):
                 self.logger.info(f"skip sensor {sensor} ...")
                 continue
             self.add_sensor_cls(sensor)
+        odom = getattr(self, "odom", None)
+        for lidar in self.all_sensors.get("lidar", {}).values():
+            # scans are deskewed with the default odometry
+            if (odom is not None and hasattr(lidar, "set_pose_source")
+                    and lidar.pose_source is None):
+                lidar.set_pose_source(odom)
+
+    def sensor_stats(self) -> Dict[str, Dict]:
+        """
+        Receive telemetry of every sensor, by kind and name, e.g.
+        `robot.sensor_stats()["camera"]["camera_front_up"]["rgb"]["rate"]`
+        """
+        return {kind: sensors.stats()
+                for kind, sensors in self.all_sensors.items()}
+
+    def sensor_rates(self) -> Dict[str, Dict]:
+        """
+        Configured and effective rates of the streams of every sensor,
+        by kind, name and stream: `origin_hz` the stream is published
+        at, `rate` it is received at, `target_hz` (its `actual_hz`) and
+        `effective_hz` it is processed at.
+        """
+        report = {}
+        for kind, sensors in self.sensor_stats().items():
+            for name, streams in sensors.items():
+                for key, stats in streams.items():
+                    throttle = stats.get("throttle", {})
+                    rates = {
+                        "origin_hz": stats["expected_hz"],
+                        "rate": stats["rate"],
+                        "target_hz": throttle.get("target_hz"),
+                        "effective_hz": stats.get(
+                            "effective_hz", stats["rate"]),
+                    }
+                    report.setdefault(kind, {}).setdefault(
+                        name, {})[key] = rates
+        return report
+
+    def worker_stats(self) -> Dict[str, Dict]:
+        """
+        Queue depth, drops and processing latency of the sensors whose
+        messages are processed by workers, by kind and name.
+        """
+        return {kind: sensors.worker_stats()
+                for kind, sensors in self.all_sensors.items()}
+
+    def _snapshot_sensors(self, sensors: List[str] = None
+                          ) -> Dict[str, SensorBase]:
+        if not sensors:
+            sensors = [kind for kind, manage in self.all_sensors.items()
+                       if len(manage)]
+        drivers = {}
+        for key in sensors:
+            if key in self.all_sensors:
+                driver = getattr(self, key.lower(), None)
+            else:
+                driver = next((manage[key] for manage
+                               in self.all_sensors.values()
+                               if manage[key] is not None), None)
+            if driver is None:
+                raise SensorError(f"sensor {key} not found in "
+                                  f"Robot {self.robot_name}")
+            drivers[key] = driver
+        return drivers
+
+    def _capture(self, name: str, driver: SensorBase, t: float = None,
+                 max_skew: float = None):
+        try:
+            return driver.capture(t, max_skew)
+        except NotImplementedError:
+            self.logger.warning(f"sensor {name} does not support snapshot")
+        except Exception as err:  # noqa
+            self.logger.error(f"capture sensor {name} fail: {err}")
+        return None
+
+    def snapshot(self, sensors: List[str] = None, align: str = "nearest",
+                 max_skew: float = None, t: float = None) -> SensorSnapshot:
+        """
+        Readings of several sensors aligned on one reference stamp,
+        captured in parallel from the buffers of the sensors ::
+
+            snap = robot.snapshot(["camera", "imu", "odom"], max_skew=.05)
+            if not snap.missing:
+                fuse(snap["camera"]["rgb"], snap["imu"], snap["odom"])
+
+        :param sensors: kinds (their default sensor) or names of sensors,
+                        the default sensor of every kind by default
+        :param align: `nearest` reads every sensor the closest to the
+                      reference stamp: `t`, or the newest time all the
+                      sensors have data for; `latest` reads the latest
+                      data of every sensor, the reference is the newest
+                      of their stamps
+        :param max_skew: seconds, the readings further from the reference
+                         stamp are reported missing
+        :param t: reference stamp of `nearest`
+        """
+        if align not in ("nearest", "latest"):
+            raise ValueError("snapshot align should be `nearest` or `latest`")
+        drivers = self._snapshot_sensors(sensors)
+        if align == "nearest" and t is None:
+            latest = [driver.latest_stamp() for driver in drivers.values()]
+            latest = [stamp for stamp in latest if stamp is not None]
+            t = min(latest) if latest else None
+        query = t if align == "nearest" else None
+        if len(drivers) > 1:
+            if self._capture_pool is None:
+                self._capture_pool = ThreadPoolExecutor(
+                    max_workers=8, thread_name_prefix="snapshot")
+            futures = {
+                name: self._capture_pool.submit(
+                    self._capture, name, driver, query, max_skew)
+                for name, driver in drivers.items()
+            }
+            captured = {name: future.result()
+                        for name, future in futures.items()}
+        else:
+            captured = {name: self._capture(name, driver, query, max_skew)
+                        for name, driver in drivers.items()}
+
+        if align == "latest":
+            stamps = [value[1] for value in captured.values() if value]
+            t = max(stamps) if stamps else None
+        data, stamps, skew, missing = {}, {}, {}, []
+        for name, value in captured.items():
+            if value is None or (max_skew is not None and
+                                 abs(value[1] - t) > max_skew):
+                data[name] = None
+                missing.append(name)
+                continue
+            data[name], stamps[name] = value
+            skew[name] = value[1] - t
+        return SensorSnapshot(
+            stamp=t, data=ReadOnlyDict(data), stamps=ReadOnlyDict(stamps),
+            skew=ReadOnlyDict(skew), missing=tuple(missing))
 
     def switch_sensor(self, sensor: str, name: str):
         driver = self.all_sensors[sensor][name]
@@ -0,0 +1,50 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+__all__ = ("SensorSnapshot", )
+
+
+class SensorSnapshot(NamedTuple):
+    """
+    Readings of several sensors aligned on one reference stamp, see
+    `Robot.snapshot`. The bundle, its mappings and arrays are read-only.
+
+    stamp: reference stamp, None if no sensor has data yet
+    data: sensor -> reading, None when missing
+    stamps: sensor -> stamp of the reading
+    skew: sensor -> stamp of the reading minus the reference stamp
+    missing: sensors without data or further than `max_skew`
+    """
+
+    stamp: Optional[float]
+    data: Mapping[str, Any]
+    stamps: Mapping[str, float]
+    skew: Mapping[str, float]
+    missing: Tuple[str, ...]
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.data[item]
+        return tuple.__getitem__(self, item)
+
+    @property
+    def max_skew(self) -> float:
+        """ largest absolute skew of the readings """
+        return max((abs(v) for v in self.skew.values()), default=0.)
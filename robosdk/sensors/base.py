@@ -13,13 +13,21 @@
 # limitations under the License.
 
 import abc
-import copy
 import threading
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Optional
+from typing import Tuple
 
+from robosdk.backend.clock import header_stamp
 from robosdk.common.config import BaseConfig
 from robosdk.common.config import Config
 from robosdk.common.logger import logging
+from robosdk.utils.cache import freeze
+from robosdk.utils.stats import StreamStats
+from robosdk.utils.throttle import RateThrottle
+from robosdk.utils.worker import MessageWorker
 
 __all__ = ("SensorBase", "RosSensorBase", "SensorManage")
 
@@ -36,6 +44,16 @@ class SensorBase(metaclass=abc.ABCMeta):
         self.sensor_name = name
         self.config = config
         self._info = {}
+        # key -> (message stamp, receive time) of the latest message
+        self._stamps: Dict[str, Tuple[float, float]] = {}
+        # key -> receive telemetry of the stream, see `get_stats`
+        self.telemetry: Dict[str, StreamStats] = {}
+        # name -> worker processing the messages of a subscription
+        self._workers: Dict[str, MessageWorker] = {}
+        # name -> decimation of the messages of a subscription
+        self._throttles: Dict[str, RateThrottle] = {}
+        # key -> stamp of the latest message recorded by `_dispatch`
+        self._dispatched: Dict[str, Optional[float]] = {}
         self.has_connect = False
         self.interaction_mode = self.config.get("driver", {}).get("type", "UK")
         self.logger = logging.bind(instance=self.sensor_name, sensor=True)
@@ -44,6 +62,172 @@ class SensorBase(metaclass=abc.ABCMeta):
     def sys_time(self) -> float:
         return self.backend.get_time()
 
+    def _record(self, key: str, receive: float, stamp: Optional[float]):
+        stats = self.telemetry.get(key)
+        if stats is None:
+            section = self.config.get(key) or {}
+            stats = self.telemetry.setdefault(
+                key, StreamStats(section.get("origin_hz")))
+        stats.add(receive, stamp)
+
+    def _stamp_message(self, msg, key: str = "data") -> bool:
+        """
+        Record the header stamp and the receive time of `msg`, messages
+        without header are stamped on receipt. Feeds `telemetry`, unless
+        the receipts are recorded by the callback of `_dispatch`.
+
+        :return: False if `msg` has the stamp of the previous message
+        """
+        receive = self.sys_time
+        stamp = header_stamp(msg)
+        previous = self._stamps.get(key)
+        if (stamp is not None and previous is not None and
+                previous[0] == stamp):
+            # delivered again, e.g. by a synchronized subscription
+            return False
+        self._stamps[key] = (receive if stamp is None else stamp, receive)
+        if key not in self._dispatched:
+            self._record(key, receive, stamp)
+        return True
+
+    def _throttle(self, section: Dict) -> Optional[RateThrottle]:
+        target, origin = section.get("actual_hz"), section.get("origin_hz")
+        mode = section.get("throttle", "time")
+        if not (mode and target) or (origin and target >= origin):
+            return None
+        return RateThrottle(target, origin, mode=mode)
+
+    def _dispatch(self, handler: Callable, section: str,
+                  keys: Tuple[str, ...] = None, name: str = None,
+                  prepare: Callable = None,
+                  record: Callable = None) -> Callable:
+        """
+        Callback of a subscription delivering to `handler`, configured by
+        the `section` of the stream, e.g. ::
+
+            data:
+              actual_hz: 10
+              origin_hz: 200
+              throttle: time
+              worker: {policy: fifo, size: 4, pool: thread, workers: 1}
+
+        When `actual_hz` is under `origin_hz`, the messages are decimated
+        to it on receipt, before any conversion or lock, by stamp
+        (`throttle: time`) or by count (`throttle: count`), `false`
+        to disable, see `robosdk.utils.throttle.RateThrottle`.
+
+        With a `worker`, the callback only queues the messages kept and
+        `handler` runs on a `robosdk.utils.worker.MessageWorker`.
+
+        The callback records the receipt of every message in `telemetry`.
+
+        :param keys: stream of every message of a delivery, `section`
+        :param name: name of the worker and the throttle, `section`
+        :param prepare: picklable function of the messages run by the
+                        `process` pool, its result is passed to `handler`
+        :param record: called with the stamp and the messages of every
+                       delivery before the throttle, for the histories
+                       kept at the full rate of the stream
+        """
+        config = self.config.get(section) or {}
+        throttle = self._throttle(config)
+        options = config.get("worker", None)
+        if not (options or throttle or record):
+            return handler
+        keys = keys or (section, )
+        name = name or section
+        if throttle is not None:
+            self._throttles[name] = throttle
+        deliver = handler
+        if options:
+            if isinstance(options, str):
+                options = {"policy": options}
+            worker = MessageWorker(
+                handler, prepare=prepare, name=f"{self.sensor_name}_{name}",
+                logger=self.logger, **dict(options))
+            self._workers[name] = worker
+            deliver = worker.submit
+        for key in keys:
+            self._dispatched.setdefault(key, None)
+
+        def _receive(*msgs):
+            if not self.has_connect:
+                return
+            receive = self.sys_time
+            first = None
+            for key, msg in zip(keys, msgs):
+                stamp = None if msg is None else header_stamp(msg)
+                if stamp is None or stamp != self._dispatched[key]:
+                    self._dispatched[key] = stamp
+                    self._record(key, receive, stamp)
+                if first is None:
+                    first = receive if stamp is None else stamp
+            if record is not None:
+                record(first, *msgs)
+            if throttle is None or throttle.keep(first):
+                deliver(*msgs)
+
+        return _receive
+
+    def _close_workers(self):
+        for worker in self._workers.values():
+            worker.close()
+
+    def get_stamp(self, key: str = "data") -> float:
+        """
+        Stamp of the latest message of `key`, current time if none.
+        """
+        stamp = self._stamps.get(key)
+        return self.sys_time if stamp is None else stamp[0]
+
+    def latest_stamp(self) -> Optional[float]:
+        """
+        Stamp of the latest message of the stream the least recent, the
+        newest time all the streams have data for. None before any.
+        """
+        stamps = list(self._stamps.values())
+        return min(stamp for stamp, _ in stamps) if stamps else None
+
+    def capture(self, t: float = None,
+                max_skew: float = None) -> Optional[Tuple[Any, float]]:
+        """
+        Read-only reading the closest to `t` as (data, stamp), the latest
+        by default, None without data, see `Robot.snapshot`. Sensors
+        without history return their latest reading.
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Receive rate, latency and jitter of the streams of the sensor,
+        see `robosdk.utils.stats.StreamStats`, and for the decimated ones
+        the `effective_hz` of the messages kept and their `throttle`.
+        """
+        now = self.sys_time
+        stats = {key: value.to_dict(now)
+                 for key, value in list(self.telemetry.items())}
+        for name, throttle in list(self._throttles.items()):
+            if name in stats:
+                stats[name]["throttle"] = throttle.to_dict()
+                stats[name]["effective_hz"] = (
+                    stats[name]["throttle"]["effective_hz"])
+        return stats
+
+    def get_worker_stats(self) -> Dict[str, Dict]:
+        """
+        Queue depth, drops and processing latency of the workers of the
+        sensor, see `_dispatch`.
+        """
+        return {name: worker.stats()
+                for name, worker in list(self._workers.items())}
+
+    @property
+    def stamps(self) -> Dict[str, Dict[str, float]]:
+        return {
+            key: {"stamp": stamp, "receive": receive}
+            for key, (stamp, receive) in self._stamps.items()
+        }
+
     @property
     def info(self):
         """
@@ -73,15 +257,26 @@ class SensorBase(metaclass=abc.ABCMeta):
 
 
 class RosSensorBase(SensorBase):  # noqa
+
+    # called with the stamp of every data message, throttled or not
+    _append_history: Optional[Callable] = None
+
     def __init__(self, name, config: Config = None):
         super(RosSensorBase, self).__init__(name=name, config=config)
         data_topic = self.config.data.target
         parameters = getattr(self.config.data, "subscribe", None) or {}
         self.topic_lock = threading.RLock()
         self.data_sub = self.backend.subscribe(
-            data_topic, callback=self._callback, **parameters)
+            data_topic, callback=self._dispatch(
+                self._callback, "data", record=self._append_history),
+            **parameters)
         self._data: Dict = {}
         self._raw = None
+        # sequence of the latest message, bumped on every receipt
+        self._seq = 0
+        # fmt -> (seq, converted message)
+        self._converted: Dict[str, Tuple[int, Any]] = {}
+        self.convert_stats = {"hits": 0, "conversions": 0, "errors": 0}
 
     def connect(self):
         if self.has_connect:
@@ -102,35 +297,77 @@ class RosSensorBase(SensorBase):  # noqa
             return
         self.has_connect = False
         self.backend.unsubscribe(self.data_sub)
+        self._close_workers()
         self._info[self.sensor_name]["close"] = self.sys_time
 
+    def _convert_latest(self, fmt: str) -> Tuple[Any, float]:
+        """
+        Latest message converted to `fmt` and its stamp. The conversion
+        runs out of `topic_lock` not to hold the delivery of the next
+        messages, and is cached unless one came in the meantime.
+        """
+        with self.topic_lock:
+            raw, seq, stamp = self._raw, self._seq, self.get_stamp()
+            if raw is None:
+                return {}, stamp
+            cached = self._converted.get(fmt)
+            if cached is not None and cached[0] == seq:
+                self.convert_stats["hits"] += 1
+                return cached[1], stamp
+        try:
+            value = freeze(self.backend.data_transform(raw, fmt=fmt))
+        except Exception as e:  # noqa
+            with self.topic_lock:
+                self.convert_stats["errors"] += 1
+            self.logger.error(f"get data from "
+                              f"[{self.sensor_name}] fail: {str(e)}")
+            return {}, stamp
+        with self.topic_lock:
+            self.convert_stats["conversions"] += 1
+            if self._seq == seq:
+                self._converted[fmt] = (seq, value)
+        return value, stamp
+
+    def convert(self, fmt: str = "json") -> Any:
+        """
+        Latest message converted with `backend.data_transform`, once per
+        message and format. The result is shared between the readers
+        and read-only, see `robosdk.utils.cache.freeze`.
+        """
+        return self._convert_latest(fmt)[0]
+
     @property
     def data(self) -> Dict:
-        if self._raw is not None:
-            try:
-                self._data: Dict = self.backend.data_transform(
-                    self._raw, fmt="json"
-                )
-            except Exception as e:  # noqa
-                self.logger.error(f"get data from battery "
-                                  f"[{self.sensor_name}] fail: {str(e)}")
-        else:
-            self._data = {}
+        self._data = self.convert(fmt="json")
         return self._data
 
     def get_data(self):
-        self.topic_lock.acquire()
-        ts = self.sys_time
-        data = copy.deepcopy(self.data)
-        self.topic_lock.release()
-        return data, ts
+        """
+        Latest data and its stamp. The json data is read-only, a
+        `ReadOnlyDict` with tuples for the sequences, see `convert`.
+        """
+        if type(self).data is not RosSensorBase.data:
+            # drivers reading their own representation of the message
+            with self.topic_lock:
+                return self.data, self.get_stamp()
+        self._data, stamp = self._convert_latest("json")
+        return self._data, stamp
+
+    def capture(self, t: float = None,
+                max_skew: float = None) -> Optional[Tuple[Any, float]]:
+        if self._raw is None:
+            return None
+        return self.get_data()
 
     def _callback(self, data):
         if not self.has_connect:
             return
         self._info[self.sensor_name]["count"] += 1
         if data is not None:
-            self._raw = data
+            with self.topic_lock:
+                self._stamp_message(data)
+                self._raw = data
+                self._seq += 1
         else:
             self._info[self.sensor_name]["error"] += 1
 
@@ -165,5 +402,19 @@ class SensorManage:
     def __len__(self) -> int:
         return len(self._all_sensors)
 
+    def values(self):
+        return [sensor for sensor in self._all_sensors.values()
+                if sensor is not None]
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: sensor.get_stats()
+                for name, sensor in self._all_sensors.items()
+                if sensor is not None}
+
+    def worker_stats(self) -> Dict[str, Dict]:
+        return {name: sensor.get_worker_stats()
+                for name, sensor in self._all_sensors.items()
+                if sensor is not None}
+
     def __getitem__(self, item: str) -> SensorBase:
         return self._all_sensors.get(item, None)
@@ -14,6 +14,7 @@
 
 import threading
 from typing import Any
+from typing import List
 from typing import Optional
 from typing import Tuple
 
@@ -43,6 +44,21 @@ class CameraBase(SensorBase):  # noqa
         """
         raise NotImplementedError
 
+    def get_frame_at(self, ts: float, kind: str = "rgb",
+                     max_skew: float = None) -> Optional[Tuple[Any, float]]:
+        """
+        This function returns the recent frame the closest to `ts`.
+        """
+        raise NotImplementedError
+
+    def get_frames(self, since: float = None, last: int = None,
+                   kind: str = "rgb") -> List[Tuple[Any, float]]:
+        """
+        This function returns the recent frames stamped after `since`,
+        or the `last` newest ones.
+        """
+        raise NotImplementedError
+
     def get_intrinsics(self) -> Optional[np.array]:
         """
         This function returns the camera intrinsics.
@@ -64,6 +80,16 @@ class RGBDCameraBase(SensorBase):  # noqa
         """
         raise NotImplementedError
 
+    def get_point_cloud(self, stride: int = 1, roi: Tuple = None,
+                        frame: str = None, color: bool = False,
+                        max_depth: float = None
+                        ) -> Tuple[np.array, Optional[np.array], float]:
+        """
+        This function returns the points of the depth image in meters,
+        their colors if `color` is set, and the stamp of the image.
+        """
+        raise NotImplementedError
+
     def get_rgb_depth(self) -> Tuple[np.array, np.array]:
         """
         This function returns both the RGB and depth
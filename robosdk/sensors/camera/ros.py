@@ -12,13 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
+from functools import partial
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 import numpy as np
+from robosdk.backend.numpify import image_to_numpy
 from robosdk.common.class_factory import ClassFactory
 from robosdk.common.class_factory import ClassType
 from robosdk.common.config import Config
+from robosdk.common.exceptions import SensorError
+from robosdk.utils.cache import freeze
 from robosdk.utils.lazy_imports import LazyImport
+from robosdk.utils.ring_buffer import StampedRingBuffer
 
 from .base import CameraBase
 from .base import RGBDCameraBase
@@ -26,6 +36,62 @@ from .base import RGBDCameraBase
 __all__ = ("RosCameraDriver", "RosRGBDCameraDriver")
 
 
+def _frame_writer():
+    # multiprocessing.shared_memory is only in python >= 3.8, imported
+    # once frames are shared
+    try:
+        from robosdk.utils.frame_bus import SharedFrameWriter
+    except ImportError as err:
+        raise SensorError(f"sharing frames requires python >= 3.8: {err}")
+    return SharedFrameWriter
+
+
+def _swap_channels(img: np.ndarray, src: str, encoding: str) -> np.ndarray:
+    if encoding and encoding != "passthrough" and encoding != src:
+        if {src, encoding} in ({"rgb8", "bgr8"}, {"rgba8", "bgra8"}):
+            img = img[..., [2, 1, 0] + list(range(3, img.shape[2]))]
+        else:
+            raise ValueError(f"convert image from {src} to "
+                             f"{encoding} unsupported without cv_bridge")
+    return np.ascontiguousarray(img)
+
+
+def _decode_compressed(msg, encoding: str = "passthrough") -> np.ndarray:
+    cv2 = LazyImport("cv2")
+    img = cv2.imdecode(np.frombuffer(msg.data, dtype=np.uint8),
+                       cv2.IMREAD_UNCHANGED)
+    if encoding == "rgb8" and img is not None and img.ndim == 3:
+        img = img[..., ::-1]
+    return img
+
+
+def _decode_image(msg, encoding: str = "passthrough",
+                  compressed: bool = False) -> np.ndarray:
+    """ image message to numpy, run by the process pools of the workers """
+    if compressed:
+        return _decode_compressed(msg, encoding)
+    return _swap_channels(image_to_numpy(msg), str(msg.encoding), encoding)
+
+
+def _decode_depth_image(msg, encoding: str = "passthrough",
+                        compressed: bool = False) -> np.ndarray:
+    return np.nan_to_num(_decode_image(msg, encoding, compressed))
+
+
+def _decode_pair(decode_rgb: Callable, decode_depth: Callable, rgb, depth):
+    return decode_rgb(rgb), decode_depth(depth)
+
+
+class _BufferedFrame:
+    """ image message of the frame buffer, decoded on first read """
+
+    __slots__ = ("msg", "frame")
+
+    def __init__(self, msg):
+        self.msg = msg
+        self.frame = None
+
+
 @ClassFactory.register(ClassType.SENSOR, alias="ros_camera_driver")
 class RosCameraDriver(CameraBase):  # noqa
 
@@ -35,19 +101,25 @@ class RosCameraDriver(CameraBase):  # noqa
         rgb_topic = self.config.rgb.target
         rgb_s_p = getattr(self.config.rgb, "subscribe", None) or {}
         info_s_p = getattr(self.config.info, "subscribe", None) or {}
-        self.cv_bridge = bridge.CvBridge()
+        cv_bridge = bridge.CvBridge
+        # backends without ROS (e.g. memory) decode through numpy
+        self.cv_bridge = cv_bridge() if cv_bridge is not None else None
 
         if self.config.rgb.get("is_compressed", False):
-            self._bridge = self.cv_bridge.compressed_imgmsg_to_cv2
+            self._bridge = (self.cv_bridge.compressed_imgmsg_to_cv2
+                            if self.cv_bridge else
+                            self._compressed_imgmsg_to_numpy)
             data_class = self.backend.msg_sensor_generator.CompressedImage
         else:
-            self._bridge = self.cv_bridge.imgmsg_to_cv2
+            self._bridge = (self.cv_bridge.imgmsg_to_cv2
+                            if self.cv_bridge else self._imgmsg_to_numpy)
             data_class = self.backend.msg_sensor_generator.Image
         if "data_class" not in rgb_s_p:
             rgb_s_p["data_class"] = data_class
         self.rgb_sub = self.backend.subscribe(
             rgb_topic,
-            callback=self._rgb_callback,
+            callback=self._dispatch(self._rgb_callback, "rgb",
+                                    prepare=self._prepare("rgb")),
             **rgb_s_p,
         )
         self.backend.get(
@@ -55,39 +127,308 @@ class RosCameraDriver(CameraBase):  # noqa
             callback=self._camera_info_callback, **info_s_p
         )
         self._rgb_data = None
+        self.cv2 = LazyImport("cv2")
+        # (calibration, resolution) -> fixed-point maps of `rectify`
+        self._rect_maps: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        self._max_rect_maps = 4
+        # key -> (message, decoded read-only frame)
+        self._frames: Dict[str, Tuple[Any, np.ndarray]] = {}
+        self.convert_stats = {"hits": 0, "conversions": 0, "errors": 0}
+        self._converters: Dict[str, Callable] = {"rgb": self._decode_rgb}
+        self.frame_buffers: Dict[str, StampedRingBuffer] = {
+            "rgb": StampedRingBuffer(self.config.rgb.get("buffer_size", 16))
+        }
+        # kind -> options of the shared memory frame bus
+        self._shared: Dict[str, Dict] = {}
+        self._shared_writers: Dict[str, Any] = {}
+        self._share_from_config("rgb")
+
+    def _prepare(self, kind: str) -> partial:
+        """ decoding of the `kind` frames by the process pool workers """
+        section = getattr(self.config, kind)
+        decode = _decode_depth_image if kind == "depth" else _decode_image
+        return partial(decode,
+                       encoding=section.get("encoding", "passthrough"),
+                       compressed=bool(section.get("is_compressed", False)))
+
+    def _decode_ahead(self, kind: str, key: str, msg, convert: Callable,
+                      frame: np.ndarray = None):
+        """
+        Decode `msg` before it is published to the readers when the
+        stream `kind` is processed by workers, `frame` if decoded by
+        the process pool.
+        """
+        if frame is not None:
+            self._frames[key] = (msg, freeze(np.asarray(frame)))
+            self.convert_stats["conversions"] += 1
+        elif kind in self._workers:
+            self._decode(key, msg, convert)
+
+    def _share_from_config(self, kind: str):
+        shared = getattr(self.config, kind).get("shared_memory", None)
+        if not shared:
+            return
+        options = dict(shared) if isinstance(shared, dict) else {}
+        self.share_frames(kind, **options)
+
+    def share_frames(self, kind: str = "rgb", name: str = None,
+                     slots: int = 4, slot_bytes: int = 0):
+        """
+        Publish the decoded frames of `kind` to a shared memory ring,
+        read by other processes with
+        `robosdk.utils.frame_bus.SharedFrameReader(name)`.
+
+        :param name: name of the shared memory block, defaults to
+                     `robosdk_<sensor>_<kind>`
+        :param slot_bytes: largest frame, the size of the first one
+                           if unset
+        :return: name of the block
+        """
+        _frame_writer()
+        if name is None:
+            name = f"robosdk_{self.sensor_name}_{kind}"
+        name = name.strip("/").replace("/", "_")
+        self._shared[kind] = {
+            "name": name, "slots": slots, "slot_bytes": slot_bytes}
+        return name
+
+    def _share_frame(self, kind: str, msg, buffered: _BufferedFrame = None):
+        options = self._shared.get(kind)
+        if options is None:
+            return
+        frame = self._decode(kind, msg, self._converters[kind])
+        if frame is None:
+            return
+        if buffered is not None:
+            buffered.frame = frame
+        writer = self._shared_writers.get(kind)
+        if writer is None:
+            writer = _frame_writer()(
+                options["name"], slots=options["slots"],
+                slot_bytes=options["slot_bytes"] or frame.nbytes)
+            self._shared_writers[kind] = writer
+        encoding = str(getattr(msg, "encoding", "") or "")
+        try:
+            writer.write(frame, stamp=self.get_stamp(kind),
+                         encoding=encoding)
+        except ValueError as e:
+            self.logger.error(f"share {kind} frame of camera "
+                              f"[{self.sensor_name}] fail: {str(e)}")
+
+    def _close_shared(self):
+        writers, self._shared_writers = self._shared_writers, {}
+        for writer in writers.values():
+            writer.close()
+
+    def _on_frame(self, kind: str, msg):
+        buffered = None
+        buffer = self.frame_buffers.get(kind)
+        stamp = self.get_stamp(kind)
+        latest = None if buffer is None else buffer.latest()
+        if latest is not None and latest[0] == stamp:
+            # same frame from the synchronized subscription
+            return
+        if buffer is not None:
+            buffered = _BufferedFrame(msg)
+            buffer.append(stamp, buffered)
+        self._share_frame(kind, msg, buffered)
+
+    def _buffered(self, kind: str, entry: Tuple[float, _BufferedFrame]):
+        stamp, item = entry
+        if item.frame is None:
+            item.frame = self._decode(
+                f"buffered_{kind}", item.msg, self._converters[kind])
+        return item.frame, stamp
+
+    def get_frame_at(self, ts: float, kind: str = "rgb",
+                     max_skew: float = None) -> Optional[Tuple[Any, float]]:
+        """
+        Buffered frame the closest to `ts`, as (frame, stamp).
+
+        :param kind: stream of the camera, `rgb` or `depth`
+        :param max_skew: seconds, None if the closest frame is further
+        """
+        entry = self.frame_buffers[kind].nearest(ts, max_skew=max_skew)
+        return None if entry is None else self._buffered(kind, entry)
+
+    def capture(self, t: float = None,
+                max_skew: float = None) -> Optional[Tuple[Any, float]]:
+        buffer = self.frame_buffers["rgb"]
+        entry = (buffer.latest() if t is None
+                 else buffer.nearest(t, max_skew=max_skew))
+        return None if entry is None else self._buffered("rgb", entry)
+
+    def get_frames(self, since: float = None, last: int = None,
+                   kind: str = "rgb") -> List[Tuple[Any, float]]:
+        """
+        Buffered frames as (frame, stamp), oldest first: the ones stamped
+        after `since`, or the `last` newest, or all of them.
+        """
+        buffer = self.frame_buffers[kind]
+        if since is not None:
+            entries = buffer.since(since)
+            if last is not None:
+                entries = entries[-last:] if last > 0 else []
+        else:
+            entries = buffer.last(buffer.capacity if last is None else last)
+        return [self._buffered(kind, entry) for entry in entries]
+
+    def _decode(self, key: str, msg, convert: Callable):
+        """
+        Frame of `msg` decoded by `convert`, at most once per message.
+        The frame is shared between the readers and read-only.
+        """
+        if msg is None:
+            return None
+        cached = self._frames.get(key)
+        if cached is not None and cached[0] is msg:
+            self.convert_stats["hits"] += 1
+            return cached[1]
+        try:
+            frame = convert(msg)
+        except Exception as e:  # noqa
+            self.convert_stats["errors"] += 1
+            self.logger.error(f"get {key} data from camera "
+                              f"[{self.sensor_name}] fail: {str(e)}")
+            return None
+        if frame is not None:
+            frame = freeze(np.asarray(frame))
+        self.convert_stats["conversions"] += 1
+        self._frames[key] = (msg, frame)
+        return frame
+
+    def _decode_synced(self, key: str, msg, convert: Callable):
+        """
+        Frame of a synchronized pair, shared with the latest frame of
+        `key` when it is the same message, cached apart otherwise so
+        that readers of the latest and of the pairs do not evict each
+        other.
+        """
+        cached = self._frames.get(key)
+        if cached is not None and msg is not None and cached[0] is msg:
+            self.convert_stats["hits"] += 1
+            return cached[1]
+        return self._decode(f"rgbd_{key}", msg, convert)
+
+    def _decode_rgb(self, msg):
+        # if (self.config.rgb.encoding == "bgr8" and
+        #         BaseConfig.MAC_TYPE.startswith("aarch")):
+        #     return img[:, :, ::-1]
+        return self._bridge(msg, self.config.rgb.encoding)
 
     @property
     def rgb(self):
-        if self.rgb_data is not None:
-            try:
-                self._rgb_data = self._bridge(
-                    self.rgb_data, self.config.rgb.encoding)
-                # if (self.config.rgb.encoding == "bgr8" and
-                #         BaseConfig.MAC_TYPE.startswith("aarch")):
-                #     self._rgb_data = self._rgb_data[:, :, ::-1]
-            except Exception as e:  # noqa
-                self.logger.error(f"get rgb data from camera "
-                                  f"[{self.sensor_name}] fail: {str(e)}")
-        else:
-            self._rgb_data = None
+        with self.camera_img_lock:
+            self._rgb_data = self._decode(
+                "rgb", self.rgb_data, self._decode_rgb)
         return self._rgb_data
 
-    def get_rgb(self):
+    def _imgmsg_to_numpy(self, msg, encoding: str = "passthrough"):
+        img = self.backend.data_transform(msg, fmt="numpy")
+        return _swap_channels(img, str(msg.encoding), encoding)
+
+    def _compressed_imgmsg_to_numpy(self, msg, encoding: str = "passthrough"):
+        return _decode_compressed(msg, encoding)
+
+    def _rectify_maps(self, size: Tuple[int, int]
+                      ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Fixed-point maps of `cv2.remap` rectifying the images of `size`
+        (width, height), built once per calibration and resolution, the
+        intrinsics being given for the resolution of the camera info.
+        """
+        with self.camera_info_lock:
+            info = self.camera_info
+        if info is None:
+            return None
+        model = str(getattr(info, "distortion_model", "") or "")
+        k = np.array(info.K, dtype=np.float64).reshape((3, 3))
+        d = np.array(info.D, dtype=np.float64)
+        r = np.array(info.R, dtype=np.float64).reshape((3, 3))
+        p = np.array(info.P, dtype=np.float64).reshape((3, 4))[:, :3]
+        key = (k.tobytes(), d.tobytes(), r.tobytes(), p.tobytes(),
+               model, tuple(size))
+        maps = self._rect_maps.get(key)
+        if maps is not None:
+            return maps
+        width, height = size
+        scale = np.diag([width / float(getattr(info, "width", 0) or width),
+                         height / float(getattr(info, "height", 0) or height),
+                         1.])
+        if not r.any():
+            r = np.eye(3)
+        # rectified to the projection of P, to K when P is unset
+        new_k = scale @ (p if p.any() else k)
+        k = scale @ k
+        if model in ("equidistant", "fisheye"):
+            maps = self.cv2.fisheye.initUndistortRectifyMap(
+                k, d[:4], r, new_k, (width, height), self.cv2.CV_16SC2)
+        else:
+            maps = self.cv2.initUndistortRectifyMap(
+                k, d, r, new_k, (width, height), self.cv2.CV_16SC2)
+        maps = tuple(freeze(m) for m in maps)
+        if len(self._rect_maps) >= self._max_rect_maps:
+            self._rect_maps.clear()
+        self._rect_maps[key] = maps
+        # rectified with the previous calibration
+        self._frames.pop("rectified_rgb", None)
+        return maps
+
+    def rectify(self, image: np.ndarray,
+                interpolation: int = None) -> Optional[np.ndarray]:
+        """
+        Undistorted and rectified `image` of the camera, at its own
+        resolution, through lookup tables computed once from the camera
+        info. None without camera info.
+
+        :param interpolation: of `cv2.remap`, bilinear by default
+        """
+        maps = self._rectify_maps((image.shape[1], image.shape[0]))
+        if maps is None:
+            return None
+        if interpolation is None:
+            interpolation = self.cv2.INTER_LINEAR
+        return self.cv2.remap(image, maps[0], maps[1], interpolation)
+
+    def _rectify_rgb(self, msg):
+        rgb = self._decode("rgb", msg, self._decode_rgb)
+        return None if rgb is None else self.rectify(rgb)
+
+    def get_rgb(self, copy: bool = False, rectified: bool = False):
         """
         This function returns the RGB image perceived by the camera.
+
+        :param copy: return a writeable copy instead of the shared
+                     read-only frame
+        :param rectified: undistorted and rectified with the camera
+                          info, once per frame for all the readers
         """
-        self.camera_img_lock.acquire()
-        ts = self.sys_time
-        rgb = copy.deepcopy(self.rgb)
-        self.camera_img_lock.release()
+        with self.camera_img_lock:
+            ts = self.get_stamp("rgb")
+            if not rectified:
+                rgb = self.rgb
+            elif self.camera_info is None:
+                self.logger.warning(f"no camera info of [{self.sensor_name}] "
+                                    f"to rectify the image")
+                return None, ts
+            else:
+                rgb = self._decode(
+                    "rectified_rgb", self.rgb_data, self._rectify_rgb)
+        if copy and rgb is not None:
+            rgb = rgb.copy()
         return rgb, ts
 
-    def _rgb_callback(self, rgb):
+    def _rgb_callback(self, rgb, frame: np.ndarray = None):
         if not self.has_connect:
             return
         self._info["rgb"]["count"] += 1
         if rgb is not None:
+            if not self._stamp_message(rgb, key="rgb"):
+                # same frame from the synchronized subscription
+                return
+            self._decode_ahead("rgb", "rgb", rgb, self._decode_rgb, frame)
             self.rgb_data = rgb
+            self._on_frame("rgb", rgb)
         else:
             self._info["rgb"]["error"] += 1
 
@@ -119,6 +460,8 @@ class RosCameraDriver(CameraBase):  # noqa
         self.has_connect = False
         self._info["rgb"]["close"] = self.sys_time
         self.backend.unsubscribe(self.rgb_sub)
+        self._close_workers()
+        self._close_shared()
 
 
 @ClassFactory.register(ClassType.SENSOR, alias="ros_rgbd_camera_driver")
@@ -126,7 +469,6 @@ class RosRGBDCameraDriver(RGBDCameraBase, RosCameraDriver):  # noqa
 
     def __init__(self, name, config: Config = None):
         super(RosRGBDCameraDriver, self).__init__(name=name, config=config)
-        self.cv2 = LazyImport("cv2")
         self.sync = self.backend.msg_subscriber
         self.rgb_depth = [None, None]
         depth_topic = self.config.depth.target
@@ -135,44 +477,184 @@ class RosRGBDCameraDriver(RGBDCameraBase, RosCameraDriver):  # noqa
             dep_s_p["data_class"] = self.backend.msg_sensor_generator.Image
 
         self.depth_sub = self.backend.subscribe(
-            depth_topic, callback=self._dep_callback, **dep_s_p)
+            depth_topic, callback=self._dispatch(
+                self._dep_callback, "depth", prepare=self._prepare("depth")),
+            **dep_s_p)
         self._dep_data = None
+        self._rgbd_msgs = (None, None)
+        self._converters["depth"] = self._decode_depth
+        self._rays: Dict[Tuple, np.ndarray] = {}
+        self._max_rays = 8
+        self.frame_buffers["depth"] = StampedRingBuffer(
+            self.config.depth.get("buffer_size", 16))
+        self._share_from_config("depth")
+        # processed by the workers of the rgb stream, if any
         self.sync_sub = self.backend.subscribe(
             self.config.rgb.target,
             depth_topic,
-            callback=self._rgbd_callback
+            callback=self._dispatch(
+                self._rgbd_callback, "rgb", keys=("rgb", ), name="rgbd",
+                prepare=partial(_decode_pair, self._prepare("rgb"),
+                                self._prepare("depth")))
         )
 
-    def _dep_callback(self, depth):
+    def _dep_callback(self, depth, frame: np.ndarray = None):
         if not self.has_connect:
             return
         self._info["depth"]["count"] += 1
         if depth is not None:
+            if not self._stamp_message(depth, key="depth"):
+                return
+            self._decode_ahead("depth", "dep", depth, self._decode_dep, frame)
             self.dep_data = depth
+            self._on_frame("depth", depth)
         else:
             self._info["depth"]["error"] += 1
 
-    def _rgbd_callback(self, rgb, depth):
+    def _rgbd_callback(self, rgb, depth, frames: Tuple = (None, None)):
         if not self.has_connect:
             return
-        self._rgb_callback(rgb)
-        self._dep_callback(depth)
-        rgb, _ = self.get_rgb()
-        depth, _ = self.get_depth()
-        self.rgb_depth = [rgb, depth]
+        self._rgb_callback(rgb, frames[0])
+        self._dep_callback(depth, frames[1])
+        # decoded on read, see `get_rgb_depth`
+        self._rgbd_msgs = (rgb, depth)
+
+    def _decode_dep(self, msg):
+        return np.nan_to_num(self._bridge(msg, self.config.depth.encoding))
+
+    def _decode_depth(self, msg):
+        depth = self._decode("dep", msg, self._decode_dep)
+        if depth is None:
+            return None
+        if self.config.depth.map_factor:
+            return depth / self.config.depth.map_factor
+        return self.cv2.normalize(depth, None, 0, 255, self.cv2.NORM_MINMAX)
+
+    def _decode_metric(self, msg):
+        depth = self._decode("dep", msg, self._decode_dep)
+        if depth is None:
+            return None
+        scale = self.config.depth.get("depth_scale", 0)
+        if self.config.depth.map_factor:
+            scale = 1. / self.config.depth.map_factor
+        elif not scale:
+            # 16UC1 images are in millimeters, 32FC1 in meters
+            scale = .001 if depth.dtype == np.uint16 else 1.
+        return depth.astype(np.float32) * np.float32(scale)
+
+    @staticmethod
+    def _window(shape: Tuple, stride: int, roi=None) -> Tuple[slice, slice]:
+        height, width = shape[:2]
+        if roi is None:
+            return slice(0, height, stride), slice(0, width, stride)
+        x, y, w, h = (int(v) for v in roi)
+        x, y = min(max(x, 0), width), min(max(y, 0), height)
+        return (slice(y, min(y + h, height), stride),
+                slice(x, min(x + w, width), stride))
+
+    def _ray_grid(self, shape: Tuple,
+                  window: Tuple[slice, slice]) -> Optional[np.ndarray]:
+        """
+        Rays (x/z, y/z, 1) of the pixels of `window`, built from the
+        projection matrix once per intrinsics and sampling.
+        """
+        with self.camera_info_lock:
+            proj, info = self.camera_P, self.camera_info
+        if proj is None:
+            return None
+        rows, cols = window
+        key = (proj.tobytes(), shape[:2], rows.start, rows.stop,
+               cols.start, cols.stop, rows.step)
+        rays = self._rays.get(key)
+        if rays is not None:
+            return rays
+        # intrinsics given for the info resolution, scaled to the depth's
+        height, width = shape[:2]
+        scale_x = width / float(getattr(info, "width", 0) or width)
+        scale_y = height / float(getattr(info, "height", 0) or height)
+        fx, cx = proj[0, 0] * scale_x, proj[0, 2] * scale_x
+        fy, cy = proj[1, 1] * scale_y, proj[1, 2] * scale_y
+        u = np.arange(width, dtype=np.float32)[cols]
+        v = np.arange(height, dtype=np.float32)[rows]
+        rays = np.ones((len(v), len(u), 3), dtype=np.float32)
+        rays[..., 0] = ((u - cx) / fx)[None, :]
+        rays[..., 1] = ((v - cy) / fy)[:, None]
+        rays.flags.writeable = False
+        if len(self._rays) >= self._max_rays:
+            self._rays.clear()
+        self._rays[key] = rays
+        return rays
+
+    def capture(self, t: float = None,
+                max_skew: float = None) -> Optional[Tuple[Any, float]]:
+        """ rgb frame the closest to `t` and the depth the closest to it """
+        rgb = super(RosRGBDCameraDriver, self).capture(t, max_skew)
+        if rgb is None:
+            return None
+        depth = self.get_frame_at(rgb[1], "depth", max_skew=max_skew)
+        return freeze({
+            "rgb": rgb[0], "depth": None if depth is None else depth[0]
+        }), rgb[1]
+
+    def get_point_cloud(self, stride: int = 1, roi: Tuple = None,
+                        frame: str = None, color: bool = False,
+                        max_depth: float = None):
+        """
+        Points of the latest depth image, in the optical frame of the
+        camera or, with `frame`, in that frame (e.g. the base frame of
+        the robot) through the transforms of the backend.
+
+        :param stride: sample every `stride`-th row and column
+        :param roi: (x, y, width, height) window of the depth image
+        :param frame: frame to express the points in
+        :param color: also return the color of every point, the depth
+                      should be aligned to the color image
+        :param max_depth: drop the points further than it, in meters
+        :return: points (N, 3) in meters, colors (N, 3) or None, stamp
+        """
+        with self.camera_depth_lock:
+            msg = self.dep_data
+            ts = self.get_stamp("depth")
+            depth = self._decode("metric", msg, self._decode_metric)
+        if depth is None:
+            return None, None, ts
+        window = self._window(depth.shape, max(1, int(stride)), roi)
+        rays = self._ray_grid(depth.shape, window)
+        if rays is None:
+            self.logger.warning(f"no camera info of [{self.sensor_name}] "
+                                f"to build the point cloud")
+            return None, None, ts
+        sample = depth[window]
+        valid = sample > 0
+        if max_depth is not None:
+            valid &= sample <= max_depth
+        points = sample[valid][:, None] * rays[valid]
+        colors = None
+        if color:
+            rgb_msg, depth_msg = self._rgbd_msgs
+            with self.camera_img_lock:
+                rgb = (self._decode_synced("rgb", rgb_msg, self._decode_rgb)
+                       if depth_msg is msg else
+                       self._decode("rgb", self.rgb_data, self._decode_rgb))
+            if rgb is not None:
+                rows, cols = window
+                y = np.arange(depth.shape[0])[rows] * rgb.shape[0]
+                x = np.arange(depth.shape[1])[cols] * rgb.shape[1]
+                colors = rgb[np.ix_(y // depth.shape[0],
+                                    x // depth.shape[1])][valid]
+        if frame:
+            source = (getattr(msg.header, "frame_id", "") or
+                      self.config.depth.get("frame_id", ""))
+            if source and source != frame:
+                points = self.backend.transforms.transform_points(
+                    points, frame, source, ts).astype(np.float32)
+        return points, colors, ts
 
     @property
     def dep(self):
-        if self.dep_data is not None:
-            try:
-                self._dep_data = self._bridge(
-                    self.dep_data, self.config.depth.encoding)
-                self._dep_data = np.nan_to_num(self._dep_data)
-            except Exception as e:  # noqa
-                self.logger.error(f"get depth data from camera "
-                                  f"[{self.sensor_name}] fail: {str(e)}")
-        else:
-            self._dep_data = None
+        with self.camera_depth_lock:
+            self._dep_data = self._decode(
+                "dep", self.dep_data, self._decode_dep)
         return self._dep_data
 
     def connect(self):
@@ -204,25 +686,39 @@ class RosRGBDCameraDriver(RGBDCameraBase, RosCameraDriver):  # noqa
         self.backend.unsubscribe(
             self.rgb_sub, self.depth_sub
         )
+        self._close_workers()
+        self._close_shared()
 
-    def get_depth(self):
+    def get_depth(self, copy: bool = False):
         """
         This function returns the depth image perceived by the camera.
 
         The depth image is in meters.
 
+        :param copy: return a writeable copy instead of the shared
+                     read-only frame
         :rtype: np.ndarray or None
         """
-        self.camera_depth_lock.acquire()
-        ts = self.sys_time
-        depth = copy.deepcopy(self.dep)
-        self.camera_depth_lock.release()
-        if self.config.depth.map_factor:
-            depth = depth / self.config.depth.map_factor
-        else:
-            depth = self.cv2.normalize(depth, depth, 0, 255,
-                                       self.cv2.NORM_MINMAX)
+        with self.camera_depth_lock:
+            ts = self.get_stamp("depth")
+            depth = self._decode("depth", self.dep_data, self._decode_depth)
+        if copy and depth is not None:
+            depth = depth.copy()
         return depth, ts
 
-    def get_rgb_depth(self):
+    def get_rgb_depth(self, copy: bool = False):
+        """
+        The latest synchronized RGB and depth images, decoded on the
+        first read of every pair.
+        """
+        rgb_msg, depth_msg = self._rgbd_msgs
+        with self.camera_img_lock:
+            rgb = self._decode_synced("rgb", rgb_msg, self._decode_rgb)
+        with self.camera_depth_lock:
+            depth = self._decode_synced("depth", depth_msg,
+                                        self._decode_depth)
+        if copy:
+            rgb = None if rgb is None else rgb.copy()
+            depth = None if depth is None else depth.copy()
+        self.rgb_depth = [rgb, depth]
         return self.rgb_depth
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from typing import Any
+from typing import Dict
 from typing import Tuple
 
 from robosdk.common.config import Config
@@ -36,3 +37,12 @@ class IMUBase(SensorBase):  # noqa
 
     def get_linear_acceleration(self) -> Tuple[BasePose, Any]:
         raise NotImplementedError
+
+    def window(self, t0: float = None, t1: float = None) -> Dict:
+        raise NotImplementedError
+
+    def resample(self, stamps) -> Dict:
+        raise NotImplementedError
+
+    def preintegrate(self, t0: float, t1: float = None) -> Dict:
+        raise NotImplementedError
@@ -13,18 +13,42 @@
 # limitations under the License.
 
 from typing import Any
+from typing import Dict
+from typing import Optional
 from typing import Tuple
 
+import numpy as np
+from robosdk.backend.transform import quaternion_multiply
+from robosdk.backend.transform import quaternion_rotate
+from robosdk.backend.transform import quaternion_slerp
 from robosdk.common.class_factory import ClassFactory
 from robosdk.common.class_factory import ClassType
 from robosdk.common.config import Config
+from robosdk.common.exceptions import SensorError
 from robosdk.common.schema.pose import BasePose
 from robosdk.sensors.base import RosSensorBase
+from robosdk.utils.cache import freeze
+from robosdk.utils.ring_buffer import ArrayRingBuffer
 
 from .base import IMUBase
 
 __all__ = ("RosIMUDriver", )
 
+# columns of the samples buffer
+_ORIENTATION = slice(0, 4)
+_ANGULAR = slice(4, 7)
+_LINEAR = slice(7, 10)
+
+
+def _cumulative_rotation(dq: np.ndarray) -> np.ndarray:
+    """ prefix products dq[0] * ... * dq[k], in log2(N) numpy steps """
+    q = np.array(dq, dtype=np.float64)
+    step = 1
+    while step < len(q):
+        q[step:] = quaternion_multiply(q[:-step], q[step:])
+        step *= 2
+    return q
+
 
 @ClassFactory.register(ClassType.SENSOR, alias="ros_imu_driver")
 class RosIMUDriver(RosSensorBase, IMUBase):  # noqa
@@ -32,10 +56,127 @@ class RosIMUDriver(RosSensorBase, IMUBase):  # noqa
     def __init__(self, name, config: Config = None):
         super(RosIMUDriver, self).__init__(name=name, config=config)
         self.frame_id = getattr(self.config.data, "frame_id", "") or "base_link"
+        # every sample at full rate, see `window` and `preintegrate`
+        self.samples = ArrayRingBuffer(
+            10, self.config.data.get("buffer_size", 2048))
+
+    def _append_history(self, stamp: float, data):
+        if data is None:
+            return
+        q = data.orientation
+        w = data.angular_velocity
+        a = data.linear_acceleration
+        self.samples.append(stamp, (
+            q.x, q.y, q.z, q.w, w.x, w.y, w.z, a.x, a.y, a.z))
+
+    @staticmethod
+    def _columns(stamps: np.ndarray, values: np.ndarray) -> Dict:
+        return {
+            "stamp": stamps,
+            "orientation": values[:, _ORIENTATION],
+            "angular_velocity": values[:, _ANGULAR],
+            "linear_acceleration": values[:, _LINEAR],
+        }
+
+    def window(self, t0: float = None, t1: float = None) -> Dict:
+        """
+        Samples received between `t0` and `t1`, as arrays of N rows:
+        stamp, orientation (x, y, z, w), angular_velocity and
+        linear_acceleration (x, y, z).
+        """
+        return self._columns(*self.samples.window(t0, t1))
+
+    def resample(self, stamps) -> Dict:
+        """
+        Samples interpolated at `stamps`, linearly for the rates and
+        with SLERP for the orientation.
+        """
+        stamps = np.asarray(stamps, dtype=np.float64)
+        if not len(self.samples):
+            return self._columns(stamps[:0], np.zeros((0, 10)))
+        before, after, alpha = self.samples.bracket(stamps)
+        values = (before * (1. - alpha[..., None]) +
+                  after * alpha[..., None])
+        values[:, _ORIENTATION] = quaternion_slerp(
+            before[:, _ORIENTATION], after[:, _ORIENTATION], alpha)
+        return self._columns(stamps, values)
+
+    def capture(self, t: float = None,
+                max_skew: float = None) -> Optional[Tuple[Dict, float]]:
+        """ sample interpolated at `t`, clamped to the buffered ones """
+        span = self.samples.span()
+        if span is None:
+            return None
+        stamp = span[1] if t is None else min(max(t, span[0]), span[1])
+        sample = self.resample([stamp])
+        return freeze({key: value[0] for key, value in sample.items()
+                       if key != "stamp"}), stamp
+
+    def preintegrate(self, t0: float, t1: float = None) -> Dict:
+        """
+        Motion between `t0` and `t1` (latest sample by default) from the
+        gyroscope and accelerometer, every sample being held until the
+        next one. Expressed in the IMU frame at `t0`, gravity included:
+
+            rotation: quaternion of the frame at `t1`
+            velocity: change of velocity
+            position: change of position, the velocity at `t0` being 0
+
+        Raises SensorError if `t0` is older than the samples kept, see
+        `data.buffer_size`.
+        """
+        found = self.samples.latest()
+        if t1 is None:
+            t1 = found[0] if found else t0
+        stamps, values = self.samples.window()
+        motion = {
+            "dt": max(float(t1 - t0), 0.), "samples": 0,
+            "rotation": np.array([0., 0., 0., 1.]),
+            "velocity": np.zeros(3), "position": np.zeros(3),
+        }
+        if t1 <= t0:
+            return motion
+        if not len(stamps) or t0 < stamps[0]:
+            covers = (f"[{stamps[0]:.3f}, {stamps[-1]:.3f}]"
+                      if len(stamps) else "no sample")
+            raise SensorError(
+                f"preintegration of [{self.sensor_name}] from {t0:.3f} "
+                f"before the samples kept, buffer covers {covers}")
+        # the sample held at `t0` and those until `t1`
+        lo = np.searchsorted(stamps, t0, "right") - 1
+        hi = np.searchsorted(stamps, t1, "left")
+        edges = np.append(np.clip(stamps[lo:hi], t0, t1), t1)
+        dt = np.diff(edges)
+        gyro = values[lo:hi, _ANGULAR]
+        accel = values[lo:hi, _LINEAR]
+
+        half = .5 * np.linalg.norm(gyro, axis=1) * dt
+        scale = np.where(half > 1e-12, np.sin(half) / np.where(
+            half > 1e-12, half, 1.), 1.) * .5 * dt
+        dq = np.empty((len(dt), 4))
+        dq[:, :3] = gyro * scale[:, None]
+        dq[:, 3] = np.cos(half)
+        rotations = _cumulative_rotation(dq)
+        # orientation at the start of every interval
+        starts = np.empty_like(rotations)
+        starts[0] = (0., 0., 0., 1.)
+        starts[1:] = rotations[:-1]
+
+        accel = quaternion_rotate(starts, accel)
+        dv = accel * dt[:, None]
+        velocity = np.cumsum(dv, axis=0) - dv
+        motion.update(
+            samples=int(hi - lo),
+            rotation=rotations[-1],
+            velocity=dv.sum(axis=0),
+            position=np.sum(velocity * dt[:, None] +
+                            .5 * dv * dt[:, None], axis=0),
+        )
+        return motion
 
     def get_orientation(self) -> Tuple[BasePose, Any]:
         orientation = BasePose()
-        ts = self.sys_time
+        ts = self.get_stamp()
         if self._raw is not None:
             data = getattr(self._raw, "orientation", None)
             if data is not None:
@@ -47,7 +188,7 @@ class RosIMUDriver(RosSensorBase, IMUBase):  # noqa
 
     def get_angular_velocity(self) -> Tuple[BasePose, Any]:
         angel = BasePose()
-        ts = self.sys_time
+        ts = self.get_stamp()
         if self._raw is not None:
             data = getattr(self._raw, "angular_velocity", None)
             if data is not None:
@@ -58,7 +199,7 @@ class RosIMUDriver(RosSensorBase, IMUBase):  # noqa
 
     def get_linear_acceleration(self) -> Tuple[BasePose, Any]:
         linear = BasePose()
-        ts = self.sys_time
+        ts = self.get_stamp()
         if self._raw is not None:
             data = getattr(self._raw, "linear_acceleration", None)
             if data is not None:
@@ -12,16 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from copy import deepcopy
+import threading
+import time
 from typing import Any
-from typing import List
+from typing import Dict
 from typing import Tuple
 
 import numpy as np
+from robosdk.backend.numpify import scan_to_numpy
+from robosdk.backend.transform import quaternion_conjugate
+from robosdk.backend.transform import quaternion_multiply
+from robosdk.backend.transform import quaternion_rotate
 from robosdk.common.class_factory import ClassFactory
 from robosdk.common.class_factory import ClassType
 from robosdk.common.config import Config
-from robosdk.utils.lazy_imports import LazyImport
+from robosdk.utils.cache import freeze
 
 from .base import LidarBase
 
@@ -30,64 +35,255 @@ __all__ = ("RosLaserDriver", )
 
 @ClassFactory.register(ClassType.SENSOR, alias="ros_laser_driver")
 class RosLaserDriver(LidarBase):  # noqa
+    """
+    2-D laser scans to (N, 2) float32 points in the laser frame.
+
+    Optional filters, applied in the callback, from `data.filters`:
+        range: [min, max] meters kept, within the scan limits
+        angle: [min, max] radians kept
+        decimation: keep one beam every `decimation`
+        voxel: side in meters of the grid cells points are averaged in
+        deskew: correct the motion of the robot during the scan, every
+                beam being moved to the laser frame at the scan stamp
+                using the poses of `set_pose_source` (the odometry of
+                the robot) and the `time_increment` of the scan
+
+    With a `data.worker` (see `SensorBase._dispatch`), the scans are
+    converted and filtered out of the callback thread, on a `process`
+    pool the ranges are unpacked by the pool.
+    """
+
+    _max_tables = 8
+    # poses looked up per deskewed scan
+    _deskew_knots = 8
 
     def __init__(self, name, config: Config = None):
         super(RosLaserDriver, self).__init__(name=name, config=config)
+        filters = getattr(self.config.data, "filters", None) or {}
+        self.range_clip = filters.get("range", None)
+        self.angle_crop = filters.get("angle", None)
+        self.decimation = max(1, int(filters.get("decimation", 1) or 1))
+        self.voxel = float(filters.get("voxel", 0) or 0)
+        self.deskew = bool(filters.get("deskew", False))
+        self.pose_source = None
+        # (translation, rotation) of the laser in the base of the poses
+        self._extrinsic = None
+        # (angle_min, angle_increment, n) -> (cos, sin, beams kept)
+        self._tables: Dict[Tuple, Tuple[np.ndarray, ...]] = {}
+        # scratch (n, 2) of the beams, and two outputs used in turn
+        self._xy = np.empty((0, 2), dtype=np.float32)
+        self._out = [np.empty((0, 2), dtype=np.float32) for _ in range(2)]
+        self._out_inx = 0
+        self.scan_stats = {
+            "scans": 0, "points": 0, "time_last": 0.,
+            "time_total": 0., "time_max": 0., "deskewed": 0,
+            "deskew_errors": 0, "deskew_shift": 0.
+        }
+        # scratch buffers of the conversion, for workers running it
+        self._scan_lock = threading.Lock()
         parameters = getattr(self.config.data, "subscribe", None) or {}
         self.lidar_sub = self.backend.subscribe(
             self.config.data.target,
-            callback=self._callback,
+            callback=self._dispatch(
+                self._callback, "data", prepare=scan_to_numpy),
             **parameters
         )
-        self._tf = LazyImport("tf")
         self._base_link = getattr(self.config.data, "base_link", "laser")
         self._map_frame = getattr(self.config.data, "map_frame", "map")
 
-    def quat2mat(self, data: np.ndarray):
+    def quat2mat(self, data: np.ndarray, t: float = None):
+        """
+        Points of the laser frame in the map frame at `t`, latest by
+        default. A 4th column of `data` is kept, zeros otherwise.
+        """
+        transforms = self.backend.transforms
+        transforms.wait_for_transform(
+            self._map_frame, self._base_link, t, timeout=10.)
+        points = np.zeros((len(data), 4))
+        points[:, :3] = transforms.transform_points(
+            data[:, :3], self._map_frame, self._base_link, t)
+        if data.shape[1] > 3:
+            points[:, 3] = data[:, 3]
+        return points
 
-        listener = self._tf.TransformListener()
-        listener.waitForTransform(
-            self._base_link, self._map_frame,
-            self.backend.client.Time(0),
-            timeout=self.backend.client.Duration(10.)
-        )
+    def _table(self, angle_min: float, increment: float, n: int):
+        key = (angle_min, increment, n)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        thetas = angle_min + increment * np.arange(n, dtype=np.float64)
+        keep = np.zeros(n, dtype=bool)
+        keep[::self.decimation] = True
+        if self.angle_crop:
+            low, high = self.angle_crop
+            keep &= (thetas >= low) & (thetas <= high)
+        table = (np.cos(thetas).astype(np.float32),
+                 np.sin(thetas).astype(np.float32), keep)
+        if len(self._tables) >= self._max_tables:
+            self._tables.clear()
+        self._tables[key] = table
+        return table
 
-        trans, rotation = listener.lookupTransform(
-            self._map_frame, self._base_link,
-            self.backend.client.Time(0),
-        )
-        rotation = self._tf.transformations.quaternion_matrix(rotation)
-        shape = data.shape
-        s = 4 - shape[1]
-        if s > 0:
-            data = np.hstack((data, np.zeros((shape[0], s))))
-        elif s < 0:
-            data = data[..., : 4]
-        points = rotation.dot(data.T).T
-        points[..., 0] += trans[0]
-        points[..., 1] += trans[1]
-        points[..., 2] += trans[2]
+    def set_pose_source(self, source):
+        """
+        Odometry driver (see `OdometryBase.poses_at`) the scans are
+        deskewed with, set by the robot to its default odometry.
+        """
+        self.pose_source = source
+        self._extrinsic = None
 
-        return points
+    def _laser_extrinsic(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._extrinsic is None:
+            base = getattr(self.pose_source, "_base_link", "base_link")
+            try:
+                value = self.backend.transforms.lookup_raw(
+                    base, self._base_link)
+            except Exception as err:  # noqa
+                self.logger.debug(f"laser in {base} unknown, "
+                                  f"deskew in the laser frame: {err}")
+                value = np.array([0., 0., 0., 0., 0., 0., 1.])
+            self._extrinsic = (value[:3], value[3:])
+        return self._extrinsic
 
-    def _callback(self, laser_scan):
-        self._raw = deepcopy(laser_scan)
-        theta_left, theta_step, dist_min, dist_max, distances = (
-            laser_scan.angle_min, laser_scan.angle_increment,
-            laser_scan.range_min, laser_scan.range_max,
-            np.array(laser_scan.ranges)
-        )
-        # generate the range of angles
-        thetas = theta_left + theta_step * np.arange(len(distances))
+    def _deskew(self, points: np.ndarray, beams: np.ndarray,
+                laser_scan) -> np.ndarray:
+        """
+        Move the `points` of the `beams` to the laser frame at the stamp
+        of the scan. The motion of the robot is looked up at a few knots
+        of the scan and interpolated at every beam.
+        """
+        increment = laser_scan.time_increment
+        if not increment and laser_scan.scan_time:
+            increment = laser_scan.scan_time / max(len(laser_scan.ranges), 1)
+        if not increment or not len(points):
+            return points
+        stamp = self.get_stamp()
+        offsets = beams * increment
+        knots = np.linspace(offsets[0], offsets[-1],
+                            min(self._deskew_knots, len(offsets)))
+        stamps = np.append(stamp + knots, stamp)
+        latest = self.pose_source.latest_stamp()
+        if latest is not None and stamps[-2] > latest:
+            # scan newer than the poses, corrected with the motion of
+            # the same span before the latest pose (constant velocity)
+            stamps -= stamps[-2] - latest
+        poses = self.pose_source.poses_at(stamps)
+        ref_q = quaternion_conjugate(poses[-1, 3:])
+        # motion of the base between the knots and the scan stamp
+        rotation = quaternion_multiply(ref_q, poses[:-1, 3:])
+        translation = quaternion_rotate(ref_q, poses[:-1, :3] - poses[-1, :3])
+
+        # the same motion seen from the laser: mount^-1 * motion * mount
+        offset, mount = self._laser_extrinsic()
+        unmount = quaternion_conjugate(mount)
+        translation = quaternion_rotate(unmount, quaternion_rotate(
+            rotation, offset) + translation - offset)
+        rotation = quaternion_multiply(
+            unmount, quaternion_multiply(rotation, mount))
+
+        # per beam, linear between the knots
+        x, y, z, w = (np.interp(offsets, knots, rotation[:, i])
+                      for i in range(4))
+        # rotation matrix of the interpolated (not unit) quaternions,
+        # restricted to the plane z = 0 of the laser
+        scale = 2. / (x * x + y * y + z * z + w * w)
+        px, py = points[:, 0], points[:, 1]
+        corrected = np.empty_like(points)
+        corrected[:, 0] = ((1. - scale * (y * y + z * z)) * px +
+                           scale * (x * y - z * w) * py +
+                           np.interp(offsets, knots, translation[:, 0]))
+        corrected[:, 1] = (scale * (x * y + z * w) * px +
+                           (1. - scale * (x * x + z * z)) * py +
+                           np.interp(offsets, knots, translation[:, 1]))
+        self.scan_stats["deskewed"] += 1
+        # largest correction of the scan, meters
+        moved = np.square(corrected - points).sum(axis=1)
+        self.scan_stats["deskew_shift"] = float(np.sqrt(moved.max()))
+        return corrected
 
-        # filter out the angles with inappropriate distances
-        valid = (distances >= dist_min) & (distances <= dist_max)
-        xs: List[float] = distances[valid] * np.cos(thetas[valid])
-        ys: List[float] = distances[valid] * np.sin(thetas[valid])
-        self.points = np.array(list(zip(xs, ys))).astype(np.float32)
+    def _output(self, size: int) -> np.ndarray:
+        # the previous scan stays untouched for the readers of its view
+        self._out_inx = 1 - self._out_inx
+        out = self._out[self._out_inx]
+        if len(out) < size:
+            out = np.empty((size, 2), dtype=np.float32)
+            self._out[self._out_inx] = out
+        return out[:size]
 
-        if hasattr(laser_scan, "intensities"):
-            self.intensity = np.asarray(self._raw.intensities)
+    def _voxel_filter(self, points: np.ndarray, intensity: np.ndarray):
+        cells = np.floor(points / self.voxel).astype(np.int64)
+        _, inverse, counts = np.unique(
+            cells, axis=0, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+        sums = np.zeros((len(counts), 2), dtype=np.float64)
+        np.add.at(sums, inverse, points)
+        points = (sums / counts[:, None]).astype(np.float32)
+        if intensity is not None and len(intensity):
+            intensity = (np.bincount(inverse, weights=intensity) /
+                         counts).astype(np.float32)
+        return points, intensity
+
+    def _callback(self, laser_scan, arrays: Dict[str, np.ndarray] = None):
+        with self._scan_lock:
+            self._convert(laser_scan, arrays)
+
+    def _convert(self, laser_scan, arrays: Dict[str, np.ndarray] = None):
+        start = time.perf_counter()
+        self._stamp_message(laser_scan)
+        self._raw = laser_scan
+        if arrays is None:
+            arrays = scan_to_numpy(laser_scan)
+        distances = arrays["ranges"]
+        n = len(distances)
+        cos, sin, keep = self._table(
+            laser_scan.angle_min, laser_scan.angle_increment, n)
+
+        dist_min, dist_max = laser_scan.range_min, laser_scan.range_max
+        if self.range_clip:
+            dist_min = max(dist_min, self.range_clip[0])
+            dist_max = min(dist_max, self.range_clip[1])
+        # filter out the beams with inappropriate distances (nan included)
+        valid = (distances >= dist_min) & (distances <= dist_max) & keep
+
+        if len(self._xy) < n:
+            self._xy = np.empty((n, 2), dtype=np.float32)
+        xy = self._xy[:n]
+        np.multiply(distances, cos, out=xy[:, 0])
+        np.multiply(distances, sin, out=xy[:, 1])
+        intensity = arrays["intensities"]
+        intensity = intensity[valid] if len(intensity) == n else None
+
+        if self.deskew and self.pose_source is not None:
+            beams = np.flatnonzero(valid)
+            points = xy[beams]
+            try:
+                points = self._deskew(points, beams, laser_scan)
+            except Exception as err:  # noqa
+                self.scan_stats["deskew_errors"] += 1
+                self.logger.debug(f"deskew scan fail: {err}")
+            if self.voxel > 0:
+                points, intensity = self._voxel_filter(points, intensity)
+            out = self._output(len(points))
+            out[...] = points
+        elif self.voxel > 0:
+            points, intensity = self._voxel_filter(xy[valid], intensity)
+            out = self._output(len(points))
+            out[...] = points
+        else:
+            out = self._output(int(np.count_nonzero(valid)))
+            np.compress(valid, xy, axis=0, out=out)
+        out.flags.writeable = False
+        with self.data_lock:
+            self.points = out
+            self.intensity = intensity
+
+        elapsed = time.perf_counter() - start
+        stats = self.scan_stats
+        stats["scans"] += 1
+        stats["points"] = len(out)
+        stats["time_last"] = elapsed
+        stats["time_total"] += elapsed
+        stats["time_max"] = max(stats["time_max"], elapsed)
 
     def connect(self):
         if self.has_connect:
@@ -96,13 +292,31 @@ class RosLaserDriver(LidarBase):  # noqa
             return
         self.has_connect = True
 
+    def close(self):
+        if not self.has_connect:
+            return
+        self.has_connect = False
+        self.backend.unsubscribe(self.lidar_sub)
+        self._close_workers()
+
     @property
     def data(self) -> np.ndarray:
         return self.points
 
-    def get_points(self) -> Tuple[np.ndarray, Any]:
-        self.data_lock.acquire()
-        ts = self.sys_time
-        data = deepcopy(self.data)
-        self.data_lock.release()
+    def capture(self, t: float = None, max_skew: float = None):
+        points, ts = self.get_points()
+        if points is None:
+            return None
+        return freeze(points), ts
+
+    def get_points(self, copy: bool = True) -> Tuple[np.ndarray, Any]:
+        """
+        Points of the latest scan. Without `copy` the read-only view of
+        the driver buffer is returned, it is reused two scans later.
+        """
+        with self.data_lock:
+            ts = self.get_stamp()
+            data = self.data
+        if copy and data is not None:
+            data = data.copy()
         return data, ts
@@ -49,7 +49,7 @@ class RosMappingDriver(MapBase):  # noqa
 
     def get_data(self) -> Tuple[PgmMap, Any]:
         self.data_lock.acquire()
-        ts = self.sys_time
+        ts = self.get_stamp()
         data = copy.deepcopy(self.map_info)
         self.data_lock.release()
         return data, ts
@@ -75,13 +75,12 @@ class RosMappingDriver(MapBase):  # noqa
             self.config.data.map, callback=self._update_map, **parameters)
 
     def _update_map(self, msg):
+        self._stamp_message(msg)
         self._raw_map = msg
         info = msg.info
 
         height, width = int(info.height), int(info.width)
-        _data = np.flipud(
-            np.reshape(np.array(msg.data), (height, width))
-        )
+        _data = np.flipud(self.backend.data_transform(msg, fmt="numpy"))
         self.map_data = np.zeros([height, width, 3])
         self.map_data[_data == PgmItem.FREE.value] = PgmColor.FREE.value
         self.map_data[_data == PgmItem.OBSTACLE.value] = PgmColor.OBSTACLE.value
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
 from robosdk.common.config import Config
 from robosdk.common.schema.pose import BasePose
 from robosdk.sensors.base import SensorBase
@@ -30,3 +31,10 @@ class OdometryBase(SensorBase):  # noqa
 
     def set_curr_state(self, state: BasePose, **kwargs) -> BasePose:
         raise NotImplementedError
+
+    def poses_at(self, stamps) -> np.ndarray:
+        """
+        Poses (N, 7) of the robot at `stamps`: translation and rotation
+        (x, y, z, w), interpolated in the pose history.
+        """
+        raise NotImplementedError
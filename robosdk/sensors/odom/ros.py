@@ -12,17 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import threading
 from typing import Any
+from typing import Optional
 from typing import Tuple
 
 import numpy as np
+from robosdk.backend.transform import quaternion_matrix
+from robosdk.backend.transform import quaternion_slerp
 from robosdk.common.class_factory import ClassFactory
 from robosdk.common.class_factory import ClassType
 from robosdk.common.config import Config
 from robosdk.common.schema.pose import BasePose
 from robosdk.sensors.base import RosSensorBase
+from robosdk.utils.cache import freeze
 from robosdk.utils.lazy_imports import LazyImport
+from robosdk.utils.ring_buffer import ArrayRingBuffer
 
 from .base import OdometryBase
 
@@ -49,7 +53,7 @@ class RosOdometryBase(OdometryBase):  # noqa
 
     def _transfrom(self, value: str, sub_value: str):
         pose = BasePose()
-        ts = self.sys_time
+        ts = self.get_stamp()
         v = getattr(self.pose, value, None)
         if not (v and hasattr(v, sub_value)):
             return pose, ts
@@ -69,7 +73,7 @@ class RosOdometryBase(OdometryBase):  # noqa
     def quat2mat(self, data: np.ndarray, base_position: np.ndarray = None):
         position, _ = self.get_position()
         orientation, _ = self.get_orientation()
-        rotation = self._transformer.quaternion_matrix((
+        rotation = quaternion_matrix((
             orientation.x,
             orientation.y,
             orientation.z,
@@ -142,6 +146,42 @@ class RosOdomDriver(RosSensorBase, RosOdometryBase):  # noqa
 
     def __init__(self, name, config: Config = None):
         super(RosOdomDriver, self).__init__(name=name, config=config)
+        # (x, y, z, qx, qy, qz, qw) of every message, see `poses_at`
+        self.poses = ArrayRingBuffer(
+            7, self.config.data.get("buffer_size", 512))
+
+    def _append_history(self, stamp: float, data):
+        if data is None:
+            return
+        pose = getattr(data, "pose", None)
+        # Odometry holds a PoseWithCovariance
+        pose = getattr(pose, "pose", pose)
+        if pose is None:
+            return
+        p, q = pose.position, pose.orientation
+        self.poses.append(stamp, (p.x, p.y, p.z, q.x, q.y, q.z, q.w))
+
+    def poses_at(self, stamps) -> np.ndarray:
+        """
+        Poses interpolated in the history of the received messages,
+        clamped to the oldest and newest ones.
+        """
+        if not len(self.poses):
+            raise ValueError(f"no pose received by {self.sensor_name}")
+        before, after, alpha = self.poses.bracket(stamps)
+        poses = (before * (1. - alpha[..., None]) +
+                 after * alpha[..., None])
+        poses[..., 3:] = quaternion_slerp(
+            before[..., 3:], after[..., 3:], alpha)
+        return poses
+
+    def capture(self, t: float = None, max_skew: float = None):
+        """ pose (x, y, z, qx, qy, qz, qw) interpolated at `t` """
+        span = self.poses.span()
+        if span is None:
+            return None
+        stamp = span[1] if t is None else min(max(t, span[0]), span[1])
+        return freeze(self.poses_at([stamp])[0]), stamp
 
     @property
     def pose(self):
@@ -156,61 +196,92 @@ class RosOdomDriver(RosSensorBase, RosOdometryBase):  # noqa
 
 @ClassFactory.register(ClassType.SENSOR, alias="ros_tf_driver")
 class RosTFDriver(RosOdometryBase):  # noqa
+    """
+    Pose of `base_link` in `map_frame` read from the transform cache of
+    the backend.
+    """
 
     def __init__(self, name, config: Config = None):
         super(RosTFDriver, self).__init__(name=name, config=config)
-        self._tf = LazyImport("tf2_ros")
         self._orientation = None
         self._position = None
         self._raw = None
 
     def get_position(self) -> Tuple[BasePose, Any]:
         pose = BasePose()
-        ts = self.sys_time
+        self._get_pose()
+        ts = self.get_stamp()
 
         if self._position is None:
             return pose, ts
-        pose.x = self._position.x
-        pose.y = self._position.y
-        pose.z = self._position.z
+        pose.x, pose.y, pose.z = self._position
         return pose, ts
 
     def get_orientation(self) -> Tuple[BasePose, Any]:
         orientation = BasePose()
-        ts = self.sys_time
+        self._get_pose()
+        ts = self.get_stamp()
 
-        if not self._orientation:
+        if self._orientation is None:
             return orientation, ts
-        orientation.x = self._orientation.x
-        orientation.y = self._orientation.y
-        orientation.z = self._orientation.z
-        orientation.w = self._orientation.w
+        (orientation.x, orientation.y,
+         orientation.z, orientation.w) = self._orientation
         return orientation, ts
 
     def _get_pose(self):
-        while 1:
-            buffer = self._tf.Buffer()
-            _ = self._tf.TransformListener(buffer)
-            trans = self.backend.msg_geometry_generator.TransformStamped()
+        if not self.has_connect:
+            return
+        try:
+            value = self.backend.transforms.lookup_raw(
+                self._map_frame, self._base_link)
+        except Exception as err:  # noqa
+            self.logger.debug(f"lookup Transform fail: {err}")
+            return
+        if value is self._raw:
+            return
+        receive = self.sys_time
+        latest = self.backend.transforms.latest_stamp(
+            self._map_frame, self._base_link)
+        self._stamps["data"] = (receive if not latest else latest, receive)
+        self._position = tuple(float(v) for v in value[:3])
+        self._orientation = tuple(float(v) for v in value[3:])
+        self._raw = value
+
+    def latest_stamp(self) -> Optional[float]:
+        try:
+            return self.backend.transforms.latest_stamp(
+                self._map_frame, self._base_link)
+        except Exception:  # noqa
+            return None
+
+    def poses_at(self, stamps) -> np.ndarray:
+        """ poses interpolated in the transform cache of the backend """
+        return self.backend.transforms.lookup_raw(
+            self._map_frame, self._base_link,
+            np.asarray(stamps, dtype=np.float64))
+
+    def capture(self, t: float = None, max_skew: float = None):
+        """ pose (x, y, z, qx, qy, qz, qw) interpolated at `t` """
+        if t is not None:
             try:
-                trans = buffer.lookup_transform(
-                    self._map_frame, self._base_link,
-                    self.backend.client.Time(0),
-                    timeout=self.backend.client.Duration(10.)
-                )
+                pose = self.backend.transforms.lookup_raw(
+                    self._map_frame, self._base_link, t)
             except Exception as err:  # noqa
-                self.logger.error(f"lookup Transform fail: {err}")
-                self.backend.client.sleep(.1)
-            self._position = trans.transform.translation
-            self._orientation = trans.transform.rotation
-            self._raw = trans
+                self.logger.debug(f"lookup Transform at {t} fail: {err}")
+            else:
+                return freeze(pose), t
+        pose = self.pose
+        return None if pose is None else (freeze(pose), self.get_stamp())
 
     @property
     def pose(self):
+        """ translation and rotation (x, y, z, w) of the latest pose """
+        self._get_pose()
         return self._raw
 
     def connect(self):
         if self.has_connect:
             return
         self.has_connect = True
-        threading.Thread(target=self._get_pose, daemon=True).start()
+        # start listening to the transforms
+        _ = self.backend.transforms
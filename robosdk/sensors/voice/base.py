@@ -14,6 +14,7 @@
 
 import threading
 from typing import Any
+from typing import Iterator
 from typing import Tuple
 
 import numpy as np
@@ -34,5 +35,13 @@ class VoiceBase(SensorBase):  # noqa
     def get_data(self) -> Tuple[np.ndarray, Any]:
         raise NotImplementedError
 
+    def chunks(self, duration_ms: float = 100,
+               timeout: float = None) -> Iterator[np.ndarray]:
+        raise NotImplementedError
+
+    def speech_segments(self, chunk_ms: float = 300, timeout: float = None,
+                        **kwargs) -> Iterator[np.ndarray]:
+        raise NotImplementedError
+
     def say(self, data: np.ndarray):
         raise NotImplementedError
@@ -12,7 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+from typing import AsyncIterator
 from typing import Dict
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
 
 import numpy as np
 from robosdk.common.class_factory import ClassFactory
@@ -20,8 +25,10 @@ from robosdk.common.class_factory import ClassType
 from robosdk.common.config import Config
 from robosdk.sensors.base import RosSensorBase
 from robosdk.utils.lazy_imports import LazyImport
+from robosdk.utils.ring_buffer import SampleRingBuffer
 
 from .base import VoiceBase
+from .vad import EnergyVAD
 
 __all__ = ("RosVoiceDriver", )
 
@@ -40,6 +47,14 @@ class RosVoiceDriver(RosSensorBase, VoiceBase):  # noqa
                 callback=self._voice_info_callback,
                 **info_s_p
             )
+        self.sample_rate = int(self.config.data.get("sample_rate", 16000))
+        self.channels = int(self.config.data.get("channels", 1))
+        # continuous stream of the received samples, see `chunks`
+        self.audio = SampleRingBuffer(
+            self.sample_rate * self.channels *
+            float(self.config.data.get("buffer_seconds", 10)))
+        # samples skipped by the readers too slow to keep up
+        self.overruns = 0
 
     def _voice_info_callback(self, info):
         if info is not None:
@@ -56,11 +71,115 @@ class RosVoiceDriver(RosSensorBase, VoiceBase):  # noqa
 
     @property
     def data(self) -> np.ndarray:
+        if self._raw is None:
+            return np.zeros(0, dtype=np.int16)
         return np.frombuffer(
             self._raw.data, dtype=np.int16)
 
+    def _append_history(self, stamp: float, data):
+        if data is not None:
+            self.audio.write(np.frombuffer(data.data, dtype=np.int16))
+
+    def connect(self):
+        self.audio.reset()
+        super(RosVoiceDriver, self).connect()
+
     def close(self):
         super(RosVoiceDriver, self).close()
+        self.audio.close()
+
+    def _chunk_size(self, duration_ms: float) -> int:
+        size = max(1, int(self.sample_rate * duration_ms / 1000.)
+                   ) * self.channels
+        if size > self.audio.capacity:
+            raise ValueError(f"chunks of {duration_ms} ms longer than the "
+                             f"buffer_seconds of [{self.sensor_name}]")
+        return size
+
+    def _next_chunk(self, cursor: int, size: int, timeout: float = None
+                    ) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Position and chunk from `cursor`, or from the oldest sample kept
+        if overwritten.
+        """
+        while True:
+            if not self.audio.wait(cursor + size, timeout):
+                return cursor, None
+            chunk = self.audio.read(cursor, size)
+            if chunk is not None:
+                break
+            # overwritten, resume from the oldest samples
+            oldest = self.audio.oldest
+            if oldest > cursor:
+                self.overruns += oldest - cursor
+                cursor = oldest
+        if self.channels > 1:
+            chunk = chunk.reshape(-1, self.channels)
+        return cursor, chunk
+
+    def chunks(self, duration_ms: float = 100,
+               timeout: float = None) -> Iterator[np.ndarray]:
+        """
+        Consecutive chunks of `duration_ms` of the audio received from
+        now on, (samples, ) int16 or (samples, channels) if interleaved.
+        Ends when the sensor is closed or no audio came for `timeout`
+        seconds.
+        """
+        size = self._chunk_size(duration_ms)
+        cursor = self.audio.position
+        while True:
+            cursor, chunk = self._next_chunk(cursor, size, timeout)
+            if chunk is None:
+                return
+            cursor += size
+            yield chunk
+
+    async def achunks(self, duration_ms: float = 100,
+                      timeout: float = None) -> AsyncIterator[np.ndarray]:
+        """
+        Same as `chunks`, waiting for the audio in the default executor
+        of the running loop ::
+
+            async for chunk in robot.voice.achunks(200):
+                ...
+        """
+        # the running loop, get_running_loop needs python 3.7
+        loop = asyncio.get_event_loop()
+        size = self._chunk_size(duration_ms)
+        cursor = self.audio.position
+        while True:
+            cursor, chunk = await loop.run_in_executor(
+                None, self._next_chunk, cursor, size, timeout)
+            if chunk is None:
+                return
+            cursor += size
+            yield chunk
+
+    def _vad(self, **kwargs) -> EnergyVAD:
+        return EnergyVAD(sample_rate=self.sample_rate,
+                         channels=self.channels, **kwargs)
+
+    def speech_segments(self, chunk_ms: float = 300, timeout: float = None,
+                        **kwargs) -> Iterator[np.ndarray]:
+        """
+        Utterances of the audio received from now on, silence being
+        dropped, see `EnergyVAD` for the `kwargs`.
+        """
+        vad = self._vad(**kwargs)
+        for chunk in self.chunks(chunk_ms, timeout=timeout):
+            yield from vad.feed(chunk)
+        yield from vad.flush()
+
+    async def aspeech_segments(self, chunk_ms: float = 300,
+                               timeout: float = None,
+                               **kwargs) -> AsyncIterator[np.ndarray]:
+        """ same as `speech_segments`, asynchronously """
+        vad = self._vad(**kwargs)
+        async for chunk in self.achunks(chunk_ms, timeout=timeout):
+            for segment in vad.feed(chunk):
+                yield segment
+        for segment in vad.flush():
+            yield segment
 
     def say(self, data: np.ndarray):
         data_buffer = data.tobytes()
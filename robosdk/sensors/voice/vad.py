@@ -0,0 +1,158 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+import numpy as np
+
+__all__ = ("EnergyVAD", )
+
+
+class EnergyVAD:
+    """
+    Voice activity segmentation from the energy of short frames. A
+    frame is speech when its energy (dBFS) exceeds both the noise floor
+    by `threshold_db` and `min_energy_db`; the noise floor follows the
+    energy of the silent frames.
+
+    Samples are fed in blocks of any size, complete segments are
+    returned as soon as `hangover_ms` of silence closes them ::
+
+        vad = EnergyVAD(sample_rate=16000)
+        for chunk in voice.chunks(300):
+            for segment in vad.feed(chunk):
+                asr(segment)
+
+    :param sample_rate: samples per second (and per channel)
+    :param channels: interleaved channels, mixed down for the analysis
+    :param frame_ms: length of the analysis frames
+    :param threshold_db: margin over the noise floor of speech frames
+    :param min_energy_db: energy under which frames are silent
+    :param min_speech_ms: shorter segments are dropped
+    :param max_speech_ms: longer segments are cut
+    :param hangover_ms: silence closing a segment
+    :param padding_ms: audio kept before the first speech frame
+    """
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1,
+                 frame_ms: int = 30, threshold_db: float = 10.,
+                 min_energy_db: float = -50., min_speech_ms: int = 200,
+                 max_speech_ms: int = 15000, hangover_ms: int = 300,
+                 padding_ms: int = 150, noise_adapt: float = .1):
+        self.channels = max(1, int(channels))
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.threshold_db = threshold_db
+        self.min_energy_db = min_energy_db
+        self.min_speech = int(np.ceil(min_speech_ms / frame_ms))
+        self.max_speech = int(np.ceil(max_speech_ms / frame_ms))
+        self.hangover = max(1, int(np.ceil(hangover_ms / frame_ms)))
+        self.padding = int(padding_ms / frame_ms) * self.frame_size
+        self.noise_adapt = noise_adapt
+        self.noise_db = None
+        self.reset()
+
+    def reset(self):
+        self._pending = np.zeros((0, self.channels), dtype=np.int16)
+        self._history = self._pending
+        self._segment: List[np.ndarray] = []
+        self._speech = 0
+        self._silence = 0
+        self.in_speech = False
+
+    def energy(self, frames: np.ndarray) -> np.ndarray:
+        """ energy in dBFS of int16 `frames` (N, frame_size) """
+        power = np.mean(np.square(frames, dtype=np.float64), axis=1)
+        return 10. * np.log10(power / 32768. ** 2 + 1e-12)
+
+    def _classify(self, energy: np.ndarray) -> np.ndarray:
+        if self.noise_db is None:
+            self.noise_db = float(np.percentile(energy, 10))
+        speech = energy > max(self.noise_db + self.threshold_db,
+                              self.min_energy_db)
+        if not speech.all():
+            self.noise_db += self.noise_adapt * (
+                float(np.mean(energy[~speech])) - self.noise_db)
+        return speech
+
+    def _close(self) -> List[np.ndarray]:
+        segment, speech = self._segment, self._speech
+        self._segment = []
+        self._speech = self._silence = 0
+        self.in_speech = False
+        if speech < self.min_speech:
+            return []
+        audio = np.concatenate(segment)
+        return [audio if self.channels > 1 else audio[:, 0]]
+
+    def _keep(self, samples: np.ndarray):
+        if self.padding:
+            self._history = np.concatenate(
+                (self._history, samples))[-self.padding:]
+
+    def feed(self, samples: np.ndarray) -> List[np.ndarray]:
+        """ segments completed by `samples` (int16, interleaved) """
+        samples = np.asarray(samples, dtype=np.int16).reshape(
+            -1, self.channels)
+        pending = np.concatenate((self._pending, samples))
+        count = len(pending) // self.frame_size
+        size = count * self.frame_size
+        self._pending = pending[size:]
+        if not count:
+            return []
+        audio = pending[:size]
+        mono = audio.mean(axis=1) if self.channels > 1 else audio[:, 0]
+        speech = self._classify(
+            self.energy(mono.reshape(count, self.frame_size)))
+
+        # runs of speech / silence frames
+        bounds = np.flatnonzero(np.diff(speech)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [count]))
+        segments = []
+        for start, end in zip(starts, ends):
+            while start < end:
+                if speech[start]:
+                    if not self.in_speech:
+                        self.in_speech = True
+                        self._segment = [self._history]
+                        self._history = self._history[:0]
+                    take = min(end - start, self.max_speech - self._speech)
+                    self._speech += take
+                    self._silence = 0
+                    self._segment.append(audio[
+                        start * self.frame_size:
+                        (start + take) * self.frame_size])
+                    start += take
+                    if self._speech >= self.max_speech:
+                        segments.extend(self._close())
+                    continue
+                take = end - start
+                if self.in_speech:
+                    take = min(take, self.hangover - self._silence)
+                    self._silence += take
+                    self._segment.append(audio[
+                        start * self.frame_size:
+                        (start + take) * self.frame_size])
+                    if self._silence >= self.hangover:
+                        segments.extend(self._close())
+                else:
+                    self._keep(audio[start * self.frame_size:
+                                     end * self.frame_size])
+                start += take
+        return segments
+
+    def flush(self) -> List[np.ndarray]:
+        """ the segment in progress, at the end of the stream """
+        self._pending = self._pending[:0]
+        return self._close() if self.in_speech else []
@@ -15,11 +15,14 @@
 import json
 import tempfile
 from contextlib import ContextDecorator
+from copy import deepcopy
 from pathlib import Path
 from typing import Any
 from typing import AnyStr
 
-__all__ = ("FileCache",)
+import numpy as np
+
+__all__ = ("FileCache", "ReadOnlyDict", "freeze")
 
 
 class FileCache(ContextDecorator):
@@ -65,6 +68,43 @@ class FileCache(ContextDecorator):
     __str__ = __repr__
 
 
+class ReadOnlyDict(dict):
+    """
+    dict which can not be modified, `copy()` and `deepcopy` give a
+    mutable dict.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {deepcopy(k, memo): deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def freeze(value: Any) -> Any:
+    """
+    Read-only version of a converted message: dicts become
+    `ReadOnlyDict`, lists tuples and numpy arrays non-writeable views.
+    """
+    if isinstance(value, dict):
+        return ReadOnlyDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, np.ndarray):
+        value = value.view()
+        value.flags.writeable = False
+    return value
+
+
 def test_file_cache():
     with FileCache() as cache:
         cache.update("a")
@@ -0,0 +1,309 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Ring of frames in a named `multiprocessing.shared_memory` block, written
+by one process and read, without serialization, by local consumers.
+
+Layout: a header, the metadata of every slot, then the slots. Each slot
+is versioned seqlock-style: its `seq` is odd while the writer fills it,
+readers retry when it is odd or changed during their read.
+"""
+
+import os
+import time
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+__all__ = ("SharedFrame", "SharedFrameWriter", "SharedFrameReader")
+
+_MAGIC = b"RSFB"
+_VERSION = 1
+_MAX_DIMS = 4
+_ALIGN = 64
+
+# blocks created by the writers of this process
+_created = set()
+
+_HEADER = np.dtype([
+    ("magic", "S4"), ("version", "<u4"), ("slots", "<u4"), ("pid", "<u4"),
+    ("slot_bytes", "<u8"), ("count", "<u8"),
+])
+_META = np.dtype([
+    ("seq", "<u8"), ("index", "<u8"), ("stamp", "<f8"), ("nbytes", "<u8"),
+    ("ndim", "<u4"), ("shape", "<u4", (_MAX_DIMS, )),
+    ("dtype", "S8"), ("encoding", "S16"),
+])
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # running under another user
+        return True
+    return True
+
+
+def _unlink_stale(name: str):
+    """
+    Remove the block `name` left by a writer which did not exit cleanly,
+    raise FileExistsError if it is not a frame bus or its writer runs.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        header = np.ndarray((), dtype=_HEADER, buffer=block.buf)
+        magic, pid = bytes(header["magic"]), int(header["pid"])
+        del header
+    finally:
+        block.close()
+    if magic != _MAGIC:
+        raise FileExistsError(f"shared memory {name} is not a frame bus")
+    if pid and _is_alive(pid):
+        raise FileExistsError(f"frame bus {name} is written by process {pid}")
+    block.unlink()
+
+
+class SharedFrame:
+    """
+    Frame read from the bus. `data` is a view on the shared memory, it
+    stays valid until the writer wraps around the ring, see
+    `SharedFrameReader.is_valid`.
+    """
+
+    __slots__ = ("data", "stamp", "index", "encoding", "slot", "seq")
+
+    def __init__(self, data: np.ndarray, stamp: float, index: int,
+                 encoding: str, slot: int, seq: int):
+        self.data = data
+        self.stamp = stamp
+        self.index = index
+        self.encoding = encoding
+        self.slot = slot
+        self.seq = seq
+
+
+class _SharedRing:
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.header = np.ndarray((), dtype=_HEADER, buffer=shm.buf)
+
+    def _map(self):
+        slots = int(self.header["slots"])
+        self.slots = slots
+        self.slot_bytes = int(self.header["slot_bytes"])
+        self.meta = np.ndarray((slots, ), dtype=_META, buffer=self.shm.buf,
+                               offset=_aligned(_HEADER.itemsize))
+        self.data_offset = _aligned(_HEADER.itemsize +
+                                    _META.itemsize * slots)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def count(self) -> int:
+        """ number of frames written """
+        return int(self.header["count"])
+
+    def _slot_view(self, slot: int, nbytes: int) -> np.ndarray:
+        return np.ndarray((nbytes, ), dtype=np.uint8, buffer=self.shm.buf,
+                          offset=self.data_offset + slot * self.slot_bytes)
+
+    def _release(self):
+        self.header = self.meta = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # frames still viewed, unmapped once they are collected
+            pass
+
+
+class SharedFrameWriter(_SharedRing):
+    """
+    Writer of a frame ring, creates the shared memory block `name`. A
+    block of the same name is only replaced when its writer is gone.
+
+    :param slots: frames kept in the ring, readers holding views have
+                  `slots - 1` frames to use them
+    :param slot_bytes: largest frame in bytes
+    """
+
+    def __init__(self, name: str, slot_bytes: int, slots: int = 4):
+        slots = max(2, int(slots))
+        slot_bytes = _aligned(int(slot_bytes))
+        size = (_aligned(_HEADER.itemsize + _META.itemsize * slots) +
+                slot_bytes * slots)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True,
+                                             size=size)
+        except FileExistsError:
+            _unlink_stale(name)
+            shm = shared_memory.SharedMemory(name=name, create=True,
+                                             size=size)
+        _created.add(name)
+        super(SharedFrameWriter, self).__init__(shm)
+        self.header["slots"] = slots
+        self.header["slot_bytes"] = slot_bytes
+        self.header["count"] = 0
+        self.header["version"] = _VERSION
+        self.header["pid"] = os.getpid()
+        self._map()
+        self.meta[:] = np.zeros(slots, dtype=_META)
+        self.header["magic"] = _MAGIC
+
+    def write(self, frame: np.ndarray, stamp: float = 0.,
+              encoding: str = "") -> int:
+        """ append `frame`, return its index on the bus """
+        frame = np.ascontiguousarray(frame)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"frame of {frame.nbytes} bytes larger than "
+                             f"the slots of {self.name} ({self.slot_bytes})")
+        if frame.ndim > _MAX_DIMS:
+            raise ValueError(f"frame of {frame.ndim} dimensions unsupported")
+        index = self.count
+        slot = index % self.slots
+        meta = self.meta[slot]
+        seq = int(meta["seq"])
+        meta["seq"] = seq + 1
+        self._slot_view(slot, frame.nbytes)[:] = frame.reshape(-1).view(
+            np.uint8)
+        meta["index"] = index
+        meta["stamp"] = stamp
+        meta["nbytes"] = frame.nbytes
+        meta["ndim"] = frame.ndim
+        meta["shape"] = list(frame.shape) + [0] * (_MAX_DIMS - frame.ndim)
+        meta["dtype"] = frame.dtype.str.encode()
+        meta["encoding"] = (encoding or "").encode()[:16]
+        meta["seq"] = seq + 2
+        self.header["count"] = index + 1
+        return index
+
+    def close(self):
+        self._release()
+        _created.discard(self.shm.name.lstrip("/"))
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedFrameReader(_SharedRing):
+    """
+    Reader of the frame ring `name`, e.g. in a perception process ::
+
+        reader = SharedFrameReader("x20_camera_rgb")
+        frame = reader.read()
+        if frame is not None:
+            model(frame.data)
+
+    Frames are numpy views on the shared memory unless `copy` is set.
+    """
+
+    def __init__(self, name: str):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # python < 3.13 tracks the block and unlinks it on exit
+            shm = shared_memory.SharedMemory(name=name)
+            if name not in _created:
+                resource_tracker.unregister(
+                    getattr(shm, "_name", "/" + name), "shared_memory")
+        super(SharedFrameReader, self).__init__(shm)
+        if bytes(self.header["magic"]) != _MAGIC:
+            shm.close()
+            raise ValueError(f"{name} is not a frame bus")
+        self._map()
+        self.last_index = -1
+
+    def _read_slot(self, slot: int, copy: bool) -> Optional[SharedFrame]:
+        meta = self.meta[slot]
+        for _ in range(100):
+            seq = int(meta["seq"])
+            if seq % 2:
+                # being written
+                time.sleep(.0001)
+                continue
+            nbytes = int(meta["nbytes"])
+            ndim = int(meta["ndim"])
+            shape = tuple(int(v) for v in meta["shape"][:ndim])
+            dtype = np.dtype(bytes(meta["dtype"]).decode())
+            data = self._slot_view(slot, nbytes).view(dtype).reshape(shape)
+            if copy:
+                data = data.copy()
+            else:
+                data.flags.writeable = False
+            frame = SharedFrame(
+                data, stamp=float(meta["stamp"]), index=int(meta["index"]),
+                encoding=bytes(meta["encoding"]).decode(), slot=slot,
+                seq=seq)
+            if int(meta["seq"]) == seq:
+                return frame
+        return None
+
+    def read(self, index: int = None, copy: bool = False
+             ) -> Optional[SharedFrame]:
+        """
+        Frame `index` of the bus, the latest by default. None if nothing
+        is written or the frame has been overwritten.
+        """
+        count = self.count
+        if not count:
+            return None
+        if index is None:
+            index = count - 1
+        if index >= count or index < count - self.slots:
+            return None
+        frame = self._read_slot(index % self.slots, copy)
+        if frame is None or frame.index != index:
+            return None
+        self.last_index = index
+        return frame
+
+    def next(self, timeout: float = 1., copy: bool = False,
+             interval: float = .001) -> Optional[SharedFrame]:
+        """
+        The first frame newer than the last read one, waiting up to
+        `timeout` seconds. Frames overwritten in the meantime are skipped.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            count = self.count
+            if count > self.last_index + 1:
+                index = max(self.last_index + 1, count - self.slots + 1)
+                frame = self.read(index, copy=copy)
+                if frame is not None:
+                    return frame
+                # being written or overwritten, or left mid-write by a
+                # writer which died
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(interval)
+
+    def is_valid(self, frame: SharedFrame) -> bool:
+        """ whether the view of `frame` has not been overwritten yet """
+        return int(self.meta[frame.slot]["seq"]) == frame.seq
+
+    def close(self):
+        self._release()
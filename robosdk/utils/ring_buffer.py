@@ -0,0 +1,304 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+
+__all__ = ("StampedRingBuffer", "ArrayRingBuffer", "SampleRingBuffer")
+
+
+class StampedRingBuffer:
+    """
+    Fixed-capacity ring of (stamp, item) ordered by stamp, the oldest
+    entries are overwritten. Queries return the stored items, nothing
+    is copied.
+
+    Items older than the newest one are rejected, see `out_of_order`.
+
+    :param capacity: number of entries kept
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.capacity = max(1, int(capacity))
+        self._stamps = np.zeros(self.capacity, dtype=np.float64)
+        self._items: List[Any] = [None] * self.capacity
+        self._start = 0
+        self._size = 0
+        self._lock = threading.RLock()
+        self.out_of_order = 0
+
+    def __len__(self):
+        return self._size
+
+    def _slot(self, inx: int) -> int:
+        return (self._start + inx) % self.capacity
+
+    def append(self, stamp: float, item: Any) -> bool:
+        with self._lock:
+            if self._size and stamp < self._stamps[self._slot(self._size - 1)]:
+                self.out_of_order += 1
+                return False
+            if self._size < self.capacity:
+                slot = self._slot(self._size)
+                self._size += 1
+            else:
+                slot = self._start
+                self._start = self._slot(1)
+            self._stamps[slot] = stamp
+            self._items[slot] = item
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._items = [None] * self.capacity
+            self._start = self._size = 0
+
+    def _bisect(self, stamp: float, right: bool = False) -> int:
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self._stamps[self._slot(mid)]
+            if value < stamp or (right and value == stamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _entry(self, inx: int) -> Tuple[float, Any]:
+        slot = self._slot(inx)
+        return float(self._stamps[slot]), self._items[slot]
+
+    def latest(self) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            return self._entry(self._size - 1) if self._size else None
+
+    def nearest(self, stamp: float,
+                max_skew: float = None) -> Optional[Tuple[float, Any]]:
+        """
+        Entry closest to `stamp`, None if empty or further than
+        `max_skew` seconds.
+        """
+        with self._lock:
+            if not self._size:
+                return None
+            inx = self._bisect(stamp)
+            if inx == self._size:
+                inx -= 1
+            elif inx and (stamp - self._stamps[self._slot(inx - 1)] <=
+                          self._stamps[self._slot(inx)] - stamp):
+                inx -= 1
+            found = self._entry(inx)
+        if max_skew is not None and abs(found[0] - stamp) > max_skew:
+            return None
+        return found
+
+    def since(self, stamp: float,
+              inclusive: bool = False) -> List[Tuple[float, Any]]:
+        """ entries stamped after `stamp`, oldest first """
+        with self._lock:
+            inx = self._bisect(stamp, right=not inclusive)
+            return [self._entry(i) for i in range(inx, self._size)]
+
+    def last(self, n: int) -> List[Tuple[float, Any]]:
+        """ the `n` newest entries, oldest first """
+        with self._lock:
+            n = min(max(int(n), 0), self._size)
+            return [self._entry(i) for i in range(self._size - n, self._size)]
+
+
+class ArrayRingBuffer:
+    """
+    Fixed-capacity ring of stamped rows of `width` float64 values, for
+    high-rate signals such as IMU samples or poses. Rows are written
+    twice, `capacity` apart, so that the entries are always one
+    contiguous slice ordered by stamp and queries are numpy operations.
+
+    Rows older than the newest one are rejected, see `out_of_order`.
+
+    :param width: number of values of a row
+    :param capacity: number of rows kept
+    """
+
+    def __init__(self, width: int, capacity: int = 1024):
+        self.width = int(width)
+        self.capacity = max(1, int(capacity))
+        self._stamps = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._values = np.zeros((2 * self.capacity, self.width),
+                                dtype=np.float64)
+        self._pos = -1
+        self._size = 0
+        self._lock = threading.RLock()
+        self.out_of_order = 0
+
+    def __len__(self):
+        return self._size
+
+    def _slice(self) -> slice:
+        end = self._pos + self.capacity + 1
+        return slice(end - self._size, end)
+
+    def append(self, stamp: float, row: Sequence[float]) -> bool:
+        with self._lock:
+            if self._size and stamp < self._stamps[self._pos]:
+                self.out_of_order += 1
+                return False
+            pos = (self._pos + 1) % self.capacity
+            self._stamps[pos] = self._stamps[pos + self.capacity] = stamp
+            self._values[pos] = self._values[pos + self.capacity] = row
+            self._pos = pos
+            self._size = min(self._size + 1, self.capacity)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._pos = -1
+            self._size = 0
+
+    def latest(self) -> Optional[Tuple[float, np.ndarray]]:
+        with self._lock:
+            if not self._size:
+                return None
+            return (float(self._stamps[self._pos]),
+                    self._values[self._pos].copy())
+
+    def span(self) -> Optional[Tuple[float, float]]:
+        """ stamps of the oldest and newest rows """
+        with self._lock:
+            if not self._size:
+                return None
+            whole = self._slice()
+            return (float(self._stamps[whole.start]),
+                    float(self._stamps[whole.stop - 1]))
+
+    def window(self, t0: float = None, t1: float = None,
+               inclusive: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy of the stamps and rows between `t0` and `t1`, bounds
+        included unless `inclusive` is False, all by default.
+        """
+        side = "left" if inclusive else "right"
+        with self._lock:
+            whole = self._slice()
+            stamps = self._stamps[whole]
+            lo = 0 if t0 is None else np.searchsorted(stamps, t0, side)
+            hi = (len(stamps) if t1 is None else np.searchsorted(
+                stamps, t1, "right" if inclusive else "left"))
+            return (stamps[lo:hi].copy(),
+                    self._values[whole][lo:hi].copy())
+
+    def bracket(self, stamps: Sequence[float]
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rows before and after every stamp of `stamps` and the weight
+        of the latter, stamps are clamped to the oldest and newest rows.
+        """
+        stamps = np.asarray(stamps, dtype=np.float64)
+        with self._lock:
+            if not self._size:
+                raise ValueError("no entry to interpolate")
+            whole = self._slice()
+            known = self._stamps[whole]
+            last = len(known) - 1
+            after = np.clip(np.searchsorted(known, stamps, "right"),
+                            1, max(last, 1))
+            before = after - 1
+            after = np.minimum(after, last)
+            span = known[after] - known[before]
+            alpha = np.clip((stamps - known[before]) /
+                            np.where(span > 0, span, np.inf), 0., 1.)
+            values = self._values[whole]
+            return values[before], values[after], alpha
+
+    def interpolate(self, stamps: Sequence[float]) -> np.ndarray:
+        """ rows linearly interpolated at `stamps` """
+        before, after, alpha = self.bracket(stamps)
+        alpha = alpha[..., None]
+        return before * (1. - alpha) + after * alpha
+
+
+class SampleRingBuffer:
+    """
+    Ring of a continuous stream of samples, e.g. audio. Samples are
+    addressed by their absolute position in the stream, so that every
+    reader keeps its own cursor and knows what it missed.
+
+    :param capacity: number of samples kept
+    :param dtype: type of the samples
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        self.capacity = max(1, int(capacity))
+        self._data = np.zeros(self.capacity, dtype=dtype)
+        self._cond = threading.Condition()
+        # samples written since the creation
+        self.position = 0
+        self.closed = False
+
+    @property
+    def oldest(self) -> int:
+        """ position of the oldest sample kept """
+        return max(0, self.position - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        samples = np.asarray(samples, dtype=self._data.dtype).reshape(-1)
+        total = len(samples)
+        if total > self.capacity:
+            samples = samples[-self.capacity:]
+        size = len(samples)
+        with self._cond:
+            start = (self.position + total - size) % self.capacity
+            first = min(size, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            self._data[:size - first] = samples[first:]
+            self.position += total
+            self._cond.notify_all()
+
+    def read(self, start: int, size: int) -> Optional[np.ndarray]:
+        """
+        Copy of the `size` samples from `start`, None if they are not
+        written yet or already overwritten.
+        """
+        with self._cond:
+            if start < self.oldest or start + size > self.position:
+                return None
+            begin = start % self.capacity
+            end = begin + size
+            if end <= self.capacity:
+                return self._data[begin:end].copy()
+            return np.concatenate((self._data[begin:],
+                                   self._data[:end - self.capacity]))
+
+    def wait(self, position: int, timeout: float = None) -> bool:
+        """ wait until `position` samples are written """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self.position >= position or self.closed, timeout)
+            return self.position >= position
+
+    def close(self):
+        """ wake up and stop the waiting readers """
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def reset(self):
+        with self._cond:
+            self.position = 0
+            self.closed = False
@@ -0,0 +1,141 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import threading
+from typing import Dict
+from typing import List
+
+__all__ = ("LogHistogram", "StreamStats")
+
+
+class LogHistogram:
+    """
+    Histogram of positive durations in fixed memory, with bins evenly
+    spaced in log scale between `low` and `high` seconds. Values out of
+    the range are counted in the first or last bin.
+
+    :param bins_per_decade: resolution, 10 bins per decade is about 26%
+    """
+
+    def __init__(self, low: float = 1e-5, high: float = 100.,
+                 bins_per_decade: int = 10):
+        self.low = low
+        self.scale = bins_per_decade / math.log(10.)
+        self.counts: List[int] = [0] * (
+            int(math.ceil(math.log(high / low) * self.scale)) + 1)
+        self.count = 0
+        self.total = 0.
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        inx = (int(math.log(value / self.low) * self.scale)
+               if value > self.low else 0)
+        self.counts[min(inx, len(self.counts) - 1)] += 1
+
+    def percentile(self, q: float) -> float:
+        """ upper bound of the bin holding the `q` (0-100) percentile """
+        if not self.count:
+            return 0.
+        rank = q / 100. * self.count
+        seen = 0
+        for inx, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.low * math.exp((inx + 1) / self.scale),
+                           self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class StreamStats:
+    """
+    Receive telemetry of a message stream:
+
+        rate: messages per second, averaged over the last ~20 messages
+        latency: receive time minus header stamp, its minimum may be
+                 negative when the clocks of the publisher and of the
+                 robot are not synchronized
+        interval: time between two receipts
+        jitter: difference between two consecutive intervals
+
+    :param expected_hz: rate the stream is published at, if known
+    """
+
+    def __init__(self, expected_hz: float = None):
+        self.expected_hz = expected_hz
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.latency = LogHistogram()
+        self.interval = LogHistogram()
+        self.jitter = LogHistogram()
+        self._interval = None
+        self._mean_interval = None
+        self._lock = threading.Lock()
+
+    def add(self, receive: float, stamp: float = None):
+        with self._lock:
+            self.count += 1
+            if stamp is not None:
+                self.latency.add(receive - stamp)
+            if self.last is None:
+                self.first = receive
+            else:
+                interval = receive - self.last
+                self.interval.add(interval)
+                if self._interval is not None:
+                    self.jitter.add(abs(interval - self._interval))
+                self._interval = interval
+                self._mean_interval = (
+                    interval if self._mean_interval is None else
+                    self._mean_interval + .05 * (
+                        interval - self._mean_interval))
+            self.last = receive
+
+    def to_dict(self, now: float = None) -> Dict:
+        with self._lock:
+            mean = self._mean_interval
+            span = (self.last - self.first) if self.count > 1 else 0.
+            return {
+                "count": self.count,
+                "rate": 1. / mean if mean else 0.,
+                "rate_mean": (self.count - 1) / span if span else 0.,
+                "expected_hz": self.expected_hz,
+                "age": (now - self.last
+                        if now is not None and self.last is not None
+                        else None),
+                "latency": self.latency.to_dict(),
+                "interval": self.interval.to_dict(),
+                "jitter": self.jitter.to_dict(),
+            }
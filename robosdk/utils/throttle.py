@@ -0,0 +1,98 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from typing import Dict
+
+__all__ = ("RateThrottle", )
+
+
+class RateThrottle:
+    """
+    Decimation of a stream published at `origin_hz` to `target_hz`,
+    decided on the stamps of the messages:
+
+        time: keep the first message due every 1 / target_hz seconds,
+              the ones up to half a source period early included so
+              that jittered sources are not aliased
+        count: keep one message every round(origin_hz / target_hz)
+
+    Only the state of the latest decision is kept, `keep` takes no lock.
+    """
+
+    modes = ("time", "count")
+
+    def __init__(self, target_hz: float, origin_hz: float = None,
+                 mode: str = "time"):
+        if mode not in self.modes:
+            raise ValueError(f"throttle mode should be one of {self.modes}")
+        if not target_hz or target_hz <= 0:
+            raise ValueError(f"throttle rate should be positive: {target_hz}")
+        if mode == "count" and not origin_hz:
+            # unknown source rate, no count to keep one message in
+            mode = "time"
+        self.mode = mode
+        self.target_hz = float(target_hz)
+        self.origin_hz = float(origin_hz) if origin_hz else None
+        self.period = 1. / self.target_hz
+        self.slack = .5 / self.origin_hz if self.origin_hz else 0.
+        self.every = (max(1, int(round(self.origin_hz / self.target_hz)))
+                      if self.origin_hz else 1)
+        self.received = 0
+        self.kept = 0
+        self._due = -math.inf
+        self._first = None
+        self._last = None
+        self._mean_interval = None
+
+    def keep(self, stamp: float) -> bool:
+        """ whether the message stamped `stamp` passes """
+        self.received += 1
+        if self.mode == "count":
+            if (self.received - 1) % self.every:
+                return False
+        else:
+            if stamp < self._due - self.slack:
+                if stamp >= self._due - 2 * self.period:
+                    return False
+                # stamps going back (e.g. replayed logs), start over
+                self._due = -math.inf
+            # one period after the due time, or after the stamp when the
+            # source paused, keeps the average rate on the target
+            self._due = (self._due + self.period
+                         if stamp - self._due < self.period
+                         else stamp + self.period)
+        self.kept += 1
+        if self._last is None:
+            self._first = stamp
+        else:
+            interval = stamp - self._last
+            self._mean_interval = (
+                interval if self._mean_interval is None else
+                self._mean_interval + .2 * (interval - self._mean_interval))
+        self._last = stamp
+        return True
+
+    def to_dict(self) -> Dict:
+        mean = self._mean_interval
+        span = (self._last - self._first) if self.kept > 1 else 0.
+        return {
+            "mode": self.mode,
+            "target_hz": self.target_hz,
+            "origin_hz": self.origin_hz,
+            "received": self.received,
+            "kept": self.kept,
+            "effective_hz": 1. / mean if mean else 0.,
+            "effective_mean_hz": (self.kept - 1) / span if span else 0.,
+        }
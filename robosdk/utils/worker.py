@@ -0,0 +1,206 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+from robosdk.utils.stats import LogHistogram
+
+__all__ = ("MessageWorker", )
+
+# workers -> process pool shared by the message workers
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            # spawned, forking a process running middleware threads
+            # may leave their locks held in the children
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"))
+            _process_pools[workers] = pool
+        return pool
+
+
+class MessageWorker:
+    """
+    Bounded slot between a subscription callback and the processing of
+    its messages: `submit` only queues the messages of a delivery, the
+    `handler` runs on the threads of the worker. When the processing
+    does not keep up, messages are dropped according to `policy`:
+
+        latest: a single pending delivery, replaced by the newest one
+        fifo: up to `size` pending deliveries, the oldest dropped
+        every: one delivery every `every` received, queued as in fifo
+
+    With the `process` pool, the picklable `prepare` (a module level
+    function) is called with the messages in a process of a pool shared
+    by the workers, and its result is passed to the handler after the
+    messages. It pays off for decoding heavier than the pickling of the
+    messages, e.g. of compressed images. The processes are spawned, the
+    main module of the program should be import-safe (`__main__` guard).
+
+    :param workers: threads running the handler, and processes of the
+                    pool, the handler should be thread-safe when above 1
+    """
+
+    policies = ("latest", "fifo", "every")
+    pools = ("thread", "process")
+
+    def __init__(self, handler: Callable, prepare: Callable = None,
+                 policy: str = "latest", size: int = None, every: int = 1,
+                 pool: str = "thread", workers: int = 1,
+                 name: str = "worker", logger=None):
+        if policy not in self.policies:
+            raise ValueError(f"worker policy should be one of {self.policies}")
+        if pool not in self.pools:
+            raise ValueError(f"worker pool should be one of {self.pools}")
+        if pool == "process" and prepare is None:
+            raise ValueError(f"worker {name} can not run on a process pool")
+        if pool == "process" and sys.version_info < (3, 7):
+            # the pool can not be spawned, and forked children may
+            # inherit locks held by the middleware threads
+            raise ValueError(f"worker {name} process pool "
+                             f"requires python >= 3.7")
+        self.handler = handler
+        self.prepare = prepare
+        self.policy = policy
+        self.pool = pool
+        self.name = name
+        self.logger = logger
+        self.size = 1 if policy == "latest" else max(1, int(size or 10))
+        self.every = max(1, int(every)) if policy == "every" else 1
+        self.workers = max(1, int(workers))
+        self._executor = (_process_pool(self.workers)
+                          if pool == "process" else None)
+        self.received = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0
+        # time queued, time processing, and from the submit to the end
+        self.wait = LogHistogram()
+        self.duration = LogHistogram()
+        self.latency = LogHistogram()
+        self._slot = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}_{inx}",
+                             daemon=True)
+            for inx in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __len__(self):
+        return len(self._slot)
+
+    def submit(self, *msgs) -> bool:
+        """ queue a delivery, False when it is skipped """
+        now = time.perf_counter()
+        with self._cond:
+            if self._closed:
+                return False
+            self.received += 1
+            if (self.received - 1) % self.every:
+                self.skipped += 1
+                return False
+            if len(self._slot) >= self.size:
+                self._slot.popleft()
+                self.dropped += 1
+            self._slot.append((now, msgs))
+            self._cond.notify()
+        return True
+
+    def _process(self, msgs) -> Any:
+        if self._executor is None:
+            return self.handler(*msgs)
+        prepared = self._executor.submit(self.prepare, *msgs).result()
+        return self.handler(*msgs, prepared)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._slot and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                queued, msgs = self._slot.popleft()
+                self.busy += 1
+            start = time.perf_counter()
+            failed = False
+            try:
+                self._process(msgs)
+            except Exception as err:  # noqa
+                failed = True
+                if self.logger is not None:
+                    self.logger.error(f"worker {self.name} fail: {err}")
+            end = time.perf_counter()
+            with self._cond:
+                self.busy -= 1
+                self.processed += 1
+                self.errors += failed
+                self.wait.add(start - queued)
+                self.duration.add(end - start)
+                self.latency.add(end - queued)
+
+    def stats(self) -> Dict:
+        """
+        Counters of the deliveries: `depth` pending ones, `skipped` by
+        the `every` policy, `dropped` when the slot was full, and the
+        histograms of their wait, processing and total latency.
+        """
+        with self._cond:
+            return {
+                "policy": self.policy,
+                "pool": self.pool,
+                "size": self.size,
+                "depth": len(self._slot),
+                "busy": self.busy,
+                "received": self.received,
+                "skipped": self.skipped,
+                "dropped": self.dropped,
+                "processed": self.processed,
+                "errors": self.errors,
+                "wait": self.wait.to_dict(),
+                "duration": self.duration.to_dict(),
+                "latency": self.latency.to_dict(),
+            }
+
+    def close(self, timeout: float = 1.):
+        """ stop the threads, the pending deliveries are dropped """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self.dropped += len(self._slot)
+            self._slot.clear()
+            self._cond.notify_all()
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join(timeout)
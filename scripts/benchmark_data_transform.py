@@ -0,0 +1,82 @@
+# Copyright 2021 The KubeEdge Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro benchmark of `Ros1Backend.data_transform(fmt="json")`.
+
+Compares the per-message-class compiled converters with a walk that
+parses the field types of every message on each call, which is how
+the conversion worked before.
+
+    python scripts/benchmark_data_transform.py --number 20000
+"""
+
+import argparse
+import timeit
+
+from robosdk.backend.ros1 import Ros1Backend
+
+
+def reference_walk(message, backend=Ros1Backend):
+    result = {}
+    for name, field_type in backend._get_message_fields(message):  # noqa
+        value = getattr(message, name)
+        if field_type in backend.ros_primitive_types:
+            value = str(value)
+        elif field_type in backend.ros_time_types:
+            value = backend._convert_from_ros_time(value)  # noqa
+        elif backend._is_ros_binary_type(field_type):  # noqa
+            value = list(value)
+        elif backend._is_field_type_a_primitive_array(field_type):  # noqa
+            value = list(value)
+        elif backend._is_field_type_an_array(field_type):  # noqa
+            value = [reference_walk(v) if hasattr(v, "__slots__") else v
+                     for v in value]
+        else:
+            value = reference_walk(value)
+        result[name] = value
+    return result
+
+
+def sample_messages():
+    from nav_msgs.msg import Odometry
+    from sensor_msgs.msg import Imu
+    from sensor_msgs.msg import LaserScan
+
+    scan = LaserScan()
+    scan.ranges = [1.0] * 720
+    scan.intensities = [100.0] * 720
+    return {"Odometry": Odometry(), "Imu": Imu(), "LaserScan": scan}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'message':<12}{'walk (us)':>12}{'compiled (us)':>16}{'x':>8}")
+    for name, msg in sample_messages().items():
+        assert reference_walk(msg) == Ros1Backend.data_transform(msg, "json")
+        walk = timeit.timeit(lambda: reference_walk(msg), number=args.number)
+        compiled = timeit.timeit(
+            lambda: Ros1Backend.data_transform(msg, fmt="json"),
+            number=args.number
+        )
+        print(f"{name:<12}{walk / args.number * 1e6:>12.2f}"
+              f"{compiled / args.number * 1e6:>16.2f}"
+              f"{walk / compiled:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()